@@ -7,18 +7,28 @@ from .shinglegenerator import ShingleGenerator, WordShingleGenerator
 from .sieve import Sieve
 from .document import Document, InMemoryDocument
 from .corpus import Corpus, InMemoryCorpus, AccessLoggedCorpus
-from .dictionary import Dictionary, InMemoryDictionary
+from .dictionary import Dictionary, InMemoryDictionary, FrontCodedDictionary, PerfectHashDictionary
 from .posting import Posting
-from .postinglist import PostingList, InMemoryPostingList, CompressedInMemoryPostingList
-from .invertedindex import InvertedIndex, InMemoryInvertedIndex, DummyInMemoryInvertedIndex, AccessLoggedInvertedIndex
+from .bitstream import BitReader, BitWriter
+from .roaringbitmap import RoaringBitmap
+from .postinglist import PostingList, InMemoryPostingList, CompressedInMemoryPostingList, ArrayPostingList, BitmapPostingList, PForDeltaPostingList, EliasGammaPostingList
+from .invertedindex import InvertedIndex, InMemoryInvertedIndex, DummyInMemoryInvertedIndex, AccessLoggedInvertedIndex, MemoryMappedInvertedIndex
+from .spimiindexer import SpimiIndexer
 from .stringfinder import Trie, StringFinder
+from .doublearraytrie import DoubleArrayTrie
+from .dawg import Dawg
 from .suffixarray import SuffixArray
+from .suffixsorter import SuffixSorter
+from .bitvector import BitVector
+from .waveletmatrix import WaveletMatrix
+from .fmindex import FMIndex
 from .postingsmerger import PostingsMerger
 from .simplesearchengine import SimpleSearchEngine
 from .ranker import Ranker, SimpleRanker
 from .betterranker import BetterRanker
 from .naivebayesclassifier import NaiveBayesClassifier
 from .variablebytecodec import VariableByteCodec
+from .pfordeltacodec import PForDeltaCodec
 from .expressioncomposer import ExpressionComposer
 from .shallowcaseextractor import ShallowCaseExtractor
 from .documentpipeline import DocumentPipeline
@@ -30,6 +40,8 @@ from .editsearchengine import EditSearchEngine
 from .booleansearchengine import BooleanSearchEngine
 from .wildcardexpander import WildcardExpander
 from .eliasgammacodec import EliasGammaCodec
+from .eliasdeltacodec import EliasDeltaCodec
+from .golombricecodec import GolombRiceCodec
 from .bloomfilter import BloomFilter
 from .vectorizer import Vectorizer
 from .rocchioclassifier import RocchioClassifier
@@ -0,0 +1,135 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from typing import Optional
+
+
+class BitWriter:
+    """
+    Appends a stream of bits to a byte buffer, most significant bit first. Useful for codes that
+    don't align with byte boundaries, e.g., Elias gamma codes.
+
+    Bits are accumulated in a Python integer and moved to the buffer a few bytes at a time. Call
+    flush() when done writing, to pad the last byte with zeros and move it to the buffer.
+    """
+
+    # We move bits to the buffer once we have accumulated at least this many.
+    __flush_threshold = 64
+
+    __slots__ = ("__destination", "__accumulator", "__count", "__written")
+
+    def __init__(self, destination: Optional[bytearray] = None):
+        self.__destination = bytearray() if destination is None else destination  # Where the complete bytes go.
+        self.__accumulator = 0  # Bits that have not yet been moved to the buffer.
+        self.__count = 0  # The number of bits in the accumulator.
+        self.__written = 0  # The number of bits written in total.
+
+    def __len__(self):
+        return self.__written
+
+    def write(self, value: int, width: int) -> None:
+        """
+        Appends the lowest width bits of the given value to the stream.
+        """
+        assert width >= 0
+        assert 0 <= value < (1 << width)
+        self.__accumulator = (self.__accumulator << width) | value
+        self.__count += width
+        self.__written += width
+        if self.__count >= __class__.__flush_threshold:
+            remaining = self.__count & 7
+            self.__destination.extend((self.__accumulator >> remaining).to_bytes(self.__count >> 3, "big"))
+            self.__accumulator &= (1 << remaining) - 1
+            self.__count = remaining
+
+    def flush(self) -> None:
+        """
+        Moves all accumulated bits to the buffer, padding with zeros up to the next byte boundary.
+        Writing more bits after flushing starts a new byte.
+        """
+        padding = -self.__count & 7
+        self.__destination.extend((self.__accumulator << padding).to_bytes((self.__count + padding) >> 3, "big"))
+        self.__written += padding
+        self.__accumulator, self.__count = 0, 0
+
+    def get_buffer(self) -> bytearray:
+        """
+        Returns the buffer that the bits are written to. Only complete bytes have been moved there,
+        unless flush() has been called.
+        """
+        return self.__destination
+
+    def get_bytes(self) -> bytes:
+        """
+        Returns a copy of everything written so far, with the last byte padded with zeros. Doesn't
+        affect the state of the writer.
+        """
+        padding = -self.__count & 7
+        return bytes(self.__destination) + (self.__accumulator << padding).to_bytes((self.__count + padding) >> 3, "big")
+
+
+class BitReader:
+    """
+    Reads back a stream of bits from a byte buffer, most significant bit first, as written by
+    a BitWriter. The buffer is consumed a few bytes at a time.
+    """
+
+    # The number of bytes we consume from the buffer at a time.
+    __refill_size = 8
+
+    __slots__ = ("__source", "__where", "__accumulator", "__count")
+
+    def __init__(self, source: bytes, start: int = 0):
+        assert source is not None
+        assert start >= 0
+        self.__source = source  # The buffer we read from.
+        self.__where = start  # The position of the next byte to consume from the buffer.
+        self.__accumulator = 0  # Bits that have been consumed from the buffer but not yet read.
+        self.__count = 0  # The number of bits in the accumulator.
+
+    def read(self, width: int) -> int:
+        """
+        Reads the next width bits from the stream, and returns them as an unsigned integer.
+        """
+        if self.__count < width:
+            self.__refill(width)
+        self.__count -= width
+        value = self.__accumulator >> self.__count
+        self.__accumulator &= (1 << self.__count) - 1
+        return value
+
+    def read_unary(self) -> int:
+        """
+        Reads a run of 1-bits terminated by a 0-bit from the stream, and returns the length of the
+        run. The terminating 0-bit is consumed, too.
+        """
+        ones = 0
+        while True:
+            if self.__count == 0:
+                self.__refill(1)
+            zeros = ~self.__accumulator & ((1 << self.__count) - 1)
+            if zeros:
+                run = self.__count - zeros.bit_length()
+                self.__count -= run + 1
+                self.__accumulator &= (1 << self.__count) - 1
+                return ones + run
+            ones += self.__count
+            self.__accumulator, self.__count = 0, 0
+
+    def align(self) -> None:
+        """
+        Skips ahead to the next byte boundary, i.e., past any padding that BitWriter.flush() added.
+        """
+        self.__count &= ~7
+        self.__accumulator &= (1 << self.__count) - 1
+
+    def __refill(self, width: int) -> None:
+        """
+        Consumes bytes from the buffer until the accumulator holds at least the given number of bits.
+        """
+        while self.__count < width:
+            chunk = self.__source[self.__where:self.__where + __class__.__refill_size]
+            assert len(chunk) > 0, "Buffer ended prematurely."
+            self.__accumulator = (self.__accumulator << (8 * len(chunk))) | int.from_bytes(chunk, "big")
+            self.__count += 8 * len(chunk)
+            self.__where += len(chunk)
@@ -0,0 +1,112 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Tuple
+
+
+class BitVector:
+    """
+    An immutable sequence of bits that supports rank and select queries in (close to) constant time.
+    Useful as a building block for succinct data structures, e.g., wavelet trees and FM-indexes.
+
+    The bits are packed into a byte buffer, most significant bit first. For every block of 512 bits we
+    keep the number of set bits in front of the block, i.e., an overhead of 32 bits per 512 bits. A rank
+    query then looks up the count for the block and counts the set bits in at most 64 bytes.
+    """
+
+    # The number of bits per block that we keep counts for. Must be a multiple of 8.
+    __block_size = 512
+
+    # Maps the bits to the digits we parse them as.
+    __digits = bytes.maketrans(b"\0\1", b"01")
+
+    __slots__ = ("__bits", "__counts", "__length")
+
+    def __init__(self, bits: Iterable[int]):
+        digits = bytes(1 if bit else 0 for bit in bits)
+        padding = -len(digits) & 7
+        value = int(digits.translate(__class__.__digits) + b"0" * padding, 2) if digits else 0
+        self.__bits = value.to_bytes((len(digits) + padding) >> 3, "big") + b"\0"  # Padded, so that rank queries can always read the byte at the given position.
+        self.__length = len(digits)
+        self.__counts = array("I", [0])  # Per block, the number of set bits in front of the block.
+        step = __class__.__block_size >> 3
+        for start in range(0, len(self.__bits), step):
+            self.__counts.append(self.__counts[-1] + int.from_bytes(self.__bits[start:start + step], "big").bit_count())
+
+    def __len__(self):
+        return self.__length
+
+    def __getitem__(self, i: int) -> int:
+        assert 0 <= i < self.__length
+        return (self.__bits[i >> 3] >> (7 - (i & 7))) & 1
+
+    def count(self) -> int:
+        """
+        Returns the number of set bits.
+        """
+        return self.__counts[-1]
+
+    def rank1(self, i: int) -> int:
+        """
+        Returns the number of set bits in front of position i, i.e., among the first i bits.
+        """
+        assert 0 <= i <= self.__length
+        block = i // __class__.__block_size
+        start = block * (__class__.__block_size >> 3)
+        return self.__counts[block] + (int.from_bytes(self.__bits[start:(i >> 3) + 1], "big") >> (8 - (i & 7))).bit_count()
+
+    def access(self, i: int) -> Tuple[int, int]:
+        """
+        Returns the bit at position i, and the number of set bits in front of it. Cheaper than asking
+        for the two separately.
+        """
+        assert 0 <= i < self.__length
+        block = i // __class__.__block_size
+        start = block * (__class__.__block_size >> 3)
+        value = int.from_bytes(self.__bits[start:(i >> 3) + 1], "big") >> (7 - (i & 7))
+        return (value & 1, self.__counts[block] + (value >> 1).bit_count())
+
+    def rank0(self, i: int) -> int:
+        """
+        Returns the number of unset bits in front of position i, i.e., among the first i bits.
+        """
+        return i - self.rank1(i)
+
+    def select1(self, k: int) -> int:
+        """
+        Returns the position of the k-th set bit, counting from zero. We binary search for the block
+        that contains the bit, and then scan the bytes in the block.
+        """
+        assert 0 <= k < self.count()
+        block = bisect_right(self.__counts, k) - 1
+        return self.__select(k - self.__counts[block], block, 0)
+
+    def select0(self, k: int) -> int:
+        """
+        Returns the position of the k-th unset bit, counting from zero. Same as select1(), but the
+        number of unset bits in front of a block is derived from the number of set bits.
+        """
+        assert 0 <= k < self.__length - self.count()
+        size = __class__.__block_size
+        block = bisect_right(range(len(self.__counts)), k, key=lambda b: b * size - self.__counts[b]) - 1
+        return self.__select(k - (block * size - self.__counts[block]), block, 255)
+
+    def __select(self, remaining: int, block: int, flip: int) -> int:
+        """
+        Scans the bytes from the given block onwards, and returns the position of the bit that has the given
+        number of matching bits in front of it in the scanned bytes. Bits match if they're set after
+        flipping them with the given mask.
+        """
+        where = block * (__class__.__block_size >> 3)
+        while True:
+            byte = self.__bits[where] ^ flip
+            ones = byte.bit_count()
+            if remaining < ones:
+                break
+            remaining -= ones
+            where += 1
+        for _ in range(ones - remaining - 1):  # Clear the matching bits after the one we want.
+            byte &= byte - 1
+        return (where << 3) + 8 - (byte & -byte).bit_length()
@@ -7,7 +7,8 @@
 # pylint: disable=invalid-name
 
 import ast
-from typing import Iterator, Dict, Any
+from collections import Counter, OrderedDict
+from typing import Iterator, Dict, Any, List, Hashable, Tuple
 from .corpus import Corpus
 from .posting import Posting
 from .postingsmerger import PostingsMerger
@@ -30,9 +31,13 @@ class BooleanSearchEngine:
     if reserved Python keywords are used in the expressions. For example, using
     'and' instead of 'AND' as the operator name will barf, so will using 'class'
     as a naked literal (you would have to quote it.)
+
+    Since query traffic tends to be repetitive, the parsed, validated and optimized ASTs
+    are kept in a cache that holds the most recently used ones. A cache size of zero
+    disables the cache.
     """
 
-    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex, cache_size: int = 1000):
 
         # We return back matching documents to the client.
         self._corpus = corpus
@@ -47,6 +52,13 @@ class BooleanSearchEngine:
             "ANDNOT": PostingsMerger.difference,
         }
 
+        # Operators that can process more than two operands at once, more efficiently than
+        # by chaining the binary operators above.
+        self._multiway_operators = {
+            "AND":    PostingsMerger.intersection_many,
+            "OR":     PostingsMerger.union_many,
+        }
+
         # How we estimate costs when optimizing evaluation order.
         self._estimators = {
             "AND":    min,
@@ -54,6 +66,14 @@ class BooleanSearchEngine:
             "ANDNOT": sum,
         }
 
+        # Counters that track the effects of our optimizations, across queries.
+        self._statistics = Counter()
+
+        # Maps an (expression, optimize) pair to the resulting AST, in least recently used order.
+        assert cache_size >= 0
+        self._cache_size = cache_size
+        self._cache: OrderedDict[Tuple[str, bool], ast.AST] = OrderedDict()
+
     def _validate(self, tree: ast.AST) -> None:
         """
         Recursively validates that the given AST has the expected structure and looks sane.
@@ -124,21 +144,125 @@ class BooleanSearchEngine:
         tree structure in a semantics-preserving manner. Then, given the simplified
         AST, reorder any terms and clauses.
         """
+        before = self._count_postings(tree)
         tree = self._simplify(tree)
+        self._statistics["postings_avoided"] += before - self._count_postings(tree)
         self._reorder(tree)
         return tree
 
-    def _simplify(self, tree: ast.AST) -> ast.AST:
+    def _simplify(self, tree: ast.AST, operator: str = None) -> ast.AST:
         """
-        For now, no simplifications take place and this is a placeholder.
+        Simplifies and rewrites the given AST in a semantics-preserving manner, bottom-up.
+
+        String literals are split into one node per term, so that terms can be reordered and
+        compared individually. Then, in an expression like AND(AND(a, b), AND(c, d)) we flatten
+        the nested operators into a single AND(a, b, c, d) so that literals across ANDs can be
+        reordered. Repeated operands are removed, e.g., OR(a, b, a) becomes OR(a, b). And we use
+        the absorptive law from Boolean algebra to simplify expressions like OR(AND(a, b), a) and
+        AND(OR(a, b), a) to just a. Operators left with a single operand are replaced by that operand.
 
-        Many optimizing and semantics-preserving simplifications are possible. For example,
-        in an expression like AND(AND(a, b), AND(c, d)) we could simplify it to a single AND
-        so that literals across ANDs could be reordered and we'd end up with something more
-        optimized like AND(c, a, b, d). Or, we could use the absorptive law and other laws
-        from Boolean algebra to simplify expressions like OR(AND(a, b), a) to just a.
+        Returns the simplified AST, which may or may not be the same object as the given one.
         """
-        return tree
+        match tree:
+
+            # A top-level expression.
+            case ast.Expression(body=(ast.Call() | ast.Name())):
+                tree.body = self._simplify(tree.body)
+                return tree
+
+            # A top-level expression with just a string literal.
+            case ast.Expression(body=ast.Constant()):
+                tree.body = self._simplify(tree.body, "AND")
+                return tree
+
+            # An AND or OR operator with some arguments. Simplify the arguments first.
+            case ast.Call(func=ast.Name(id=("AND" | "OR") as operator)):
+                arguments = []
+                for argument in tree.args:
+                    simplified = self._simplify(argument, operator)
+                    if isinstance(simplified, ast.Call) and simplified.func.id == operator:
+                        if isinstance(argument, ast.Call):
+                            self._statistics["flattened"] += 1
+                        arguments.extend(simplified.args)
+                    else:
+                        arguments.append(simplified)
+                arguments = self._deduplicate(arguments)
+                arguments = self._absorb(operator, arguments)
+                if len(arguments) == 1:
+                    self._statistics["unwrapped"] += 1
+                    return arguments[0]
+                tree.args = arguments
+                return tree
+
+            # A binary ANDNOT operator.
+            case ast.Call(func=ast.Name(id="ANDNOT")):
+                tree.args = [self._simplify(tree.args[0], "AND"), self._simplify(tree.args[1], "OR")]
+                return tree
+
+            # A string literal, e.g., 'foo' or 'foo bar baz' in the context of some parent operator.
+            case ast.Constant() if operator and tree.terms:
+                leaves = [self._leaf(term) for term in tree.terms]
+                return leaves[0] if len(leaves) == 1 else ast.Call(func=ast.Name(id=operator), args=leaves, keywords=[])
+
+            # A naked (unquoted) string literal, e.g., foo.
+            case ast.Name():
+                return self._leaf(tree.terms[0])
+
+            # Something we leave alone.
+            case _:
+                return tree
+
+    def _deduplicate(self, arguments: List[ast.AST]) -> List[ast.AST]:
+        """
+        Removes repeated operands from the given list of operands to an AND or OR operator,
+        since a AND a = a and a OR a = a. Order is otherwise preserved.
+        """
+        unique = {}
+        for argument in arguments:
+            unique.setdefault(self._key(argument), argument)
+        self._statistics["deduplicated"] += len(arguments) - len(unique)
+        return list(unique.values())
+
+    def _absorb(self, operator: str, arguments: List[ast.AST]) -> List[ast.AST]:
+        """
+        Applies the absorptive law to the given list of operands to an AND or OR operator. For OR,
+        an AND operand is redundant if another operand implies it, e.g., OR(AND(a, b), a) is just
+        OR(a). Dually for AND, where AND(OR(a, b), a) is just AND(a). Assumes no repeated operands.
+        """
+        inner = "AND" if operator == "OR" else "OR"
+        operands = [self._key(argument)[1] if isinstance(argument, ast.Call) and argument.func.id == inner else frozenset([self._key(argument)]) for argument in arguments]
+        kept = [argument for i, argument in enumerate(arguments) if not any(j != i and operands[j] < operands[i] for j in range(len(arguments)))]
+        self._statistics["absorbed"] += len(arguments) - len(kept)
+        return kept
+
+    def _key(self, tree: ast.AST) -> Hashable:
+        """
+        Returns a hashable key for the given simplified AST, such that equivalent subexpressions
+        get equal keys regardless of the order of the operands of any AND or OR operators.
+        """
+        match tree:
+            case ast.Call(func=ast.Name(id=("AND" | "OR") as operator)):
+                return (operator, frozenset(self._key(argument) for argument in tree.args))
+            case ast.Call(func=ast.Name(id=operator)):
+                return (operator, tuple(self._key(argument) for argument in tree.args))
+            case _:
+                return (tree.__class__.__name__, tuple(getattr(tree, "terms", ())))
+
+    @staticmethod
+    def _leaf(term: str) -> ast.AST:
+        """
+        Creates a node that represents a single, already normalized term.
+        """
+        leaf = ast.Name(id=term)
+        leaf.terms = [term]
+        return leaf
+
+    def _count_postings(self, tree: ast.AST) -> int:
+        """
+        Returns the total length of all the posting lists that evaluating the given AST would
+        involve. An upper bound on the number of postings we would have to process.
+        """
+        return sum(self._inverted_index.get_document_frequency(term) for node in ast.walk(tree) for term in getattr(node, "terms", ()))
 
     def _reorder(self, tree: ast.AST, operator: str = None) -> int:
         """
@@ -207,11 +331,7 @@ class BooleanSearchEngine:
 
             # An AND or OR operator with some arguments.
             case ast.Call(func=ast.Name(id=("AND" | "OR") as operator)):
-                lvalue = self._evaluate(tree.args[0], operator)
-                for i in range(1, len(tree.args)):
-                    rvalue = self._evaluate(tree.args[i], operator)
-                    lvalue = self._operators[operator](lvalue, rvalue)
-                return lvalue
+                return self._combine(operator, [self._evaluate(argument, operator) for argument in tree.args])
 
             # A binary ANDNOT operator.
             case ast.Call(func=ast.Name(id="ANDNOT")):
@@ -221,12 +341,7 @@ class BooleanSearchEngine:
 
             # A string literal, e.g., 'foo' or 'foo bar baz' in the context of some parent operator.
             case ast.Constant() if operator:
-                terms = tree.terms
-                lvalue = self._inverted_index.get_postings_iterator(terms[0])
-                for i in range(1, len(terms)):
-                    rvalue = self._inverted_index.get_postings_iterator(terms[i])
-                    lvalue = self._operators[operator](lvalue, rvalue)
-                return lvalue
+                return self._combine(operator, [self._inverted_index.get_postings_iterator(term) for term in tree.terms])
 
             # A naked (unquoted) string literal, e.g., foo.
             case ast.Name():
@@ -236,6 +351,62 @@ class BooleanSearchEngine:
             case _:
                 raise NotImplementedError(f"Unknown node type {tree.__class__.__name__}.")
 
+    def _combine(self, operator: str, operands: List[Iterator[Posting]]) -> Iterator[Posting]:
+        """
+        Combines the given posting lists using the given operator. If there are more than two
+        operands and the operator has a multiway implementation, we use that. Otherwise, we
+        build a left-deep chain of binary operations.
+        """
+        if len(operands) > 2 and operator in self._multiway_operators:
+            return self._multiway_operators[operator](operands)
+        lvalue = operands[0]
+        for rvalue in operands[1:]:
+            lvalue = self._operators[operator](lvalue, rvalue)
+        return lvalue
+
+    def _compile(self, expression: str, optimize: bool) -> ast.AST:
+        """
+        Parses, validates and possibly optimizes the given query expression, and returns the resulting
+        AST ready for evaluation. Consults the cache first, if enabled. Evaluation does not modify the
+        AST, so a cached AST can be evaluated any number of times. Expressions that fail to parse or
+        validate are not cached.
+        """
+        key = (expression, optimize)
+        tree = self._cache.get(key)
+        if tree is not None:
+            self._cache.move_to_end(key)
+            self._statistics["cache_hits"] += 1
+            return tree
+        if self._cache_size:
+            self._statistics["cache_misses"] += 1
+
+        # Parse the expression.
+        tree = ast.parse(expression, mode="eval")
+
+        # Does the AST look kosher? Decorate the AST in-place with terms.
+        self._validate(tree)
+
+        # Optimize the AST for more efficient evaluation?
+        if optimize:
+            tree = self._optimize(tree)
+
+        # Remember it for next time, and evict the least recently used AST if we have to.
+        if self._cache_size:
+            self._cache[key] = tree
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return tree
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Returns counters that track the effects of query optimization, accumulated across all
+        queries evaluated so far. E.g., how many nested operators were flattened, how many
+        repeated or absorbed operands were removed, and how many postings we thereby avoided
+        having to process. Also, how many times the query cache was hit or missed.
+        """
+        return dict(self._statistics)
+
     def evaluate(self, expression: str, options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
         """
         Parses and evaluates the given Boolean query expression.
@@ -249,15 +420,8 @@ class BooleanSearchEngine:
         """
         try:
 
-            # Parse the expression.
-            tree = ast.parse(expression, mode="eval")
-
-            # Does the AST look kosher? Decorate the AST in-place with terms.
-            self._validate(tree)
-
-            # Optimize the AST for more efficient evaluation?
-            if options.get("optimize", True):
-                tree = self._optimize(tree)
+            # Parse, validate and optimize the expression, or reuse what we did last time.
+            tree = self._compile(expression, options.get("optimize", True))
 
             # Evaluate and emit matching documents.
             for posting in self._evaluate(tree):
@@ -0,0 +1,237 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from __future__ import annotations
+from array import array
+from itertools import repeat
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .trie import Trie
+
+
+class Dawg:
+    """
+    A read-only minimal acyclic automaton, a.k.a. a directed acyclic word graph (DAWG). Unlike in a
+    trie, both common prefixes and common suffixes are shared, so dictionaries where lots of strings
+    end the same way need far fewer states. Offers the same interface for traversal as Trie.
+
+    The automaton is built incrementally from sorted strings using the algorithm described in
+    https://aclanthology.org/J00-1002/. Once all the strings that pass through a state have been
+    seen, the state is replaced by an equivalent state we have already seen, if any.
+
+    States with merged suffixes can't hold per-string meta data. Instead, each transition is labeled
+    with the number of strings that the transition skips past, so that the strings get numbered in
+    lexicographical order as we traverse the automaton. The meta data values are kept in a table
+    indexed by these numbers, i.e., we have a minimal perfect hash of the strings.
+
+    The transitions are kept in flat arrays, sorted by state and then by symbol. A node in the
+    automaton is also itself an automaton in this implementation, and just refers to the shared
+    arrays, a state, and the number of the first string below the state.
+    """
+
+    __slots__ = ("__shared", "__state", "__rank")
+
+    def __init__(self, strings: Iterable[Tuple[str, Optional[Any]]] = ()):
+        (self.__shared, self.__state) = __class__.__build(strings)
+        self.__rank = 0
+
+    def __repr__(self):
+        return repr(list(self.strings()))
+
+    def __eq__(self, other):
+        return isinstance(other, __class__) and self.__shared is other.__shared and self.__state == other.__state and self.__rank == other.__rank
+
+    def __hash__(self):
+        return hash((id(self.__shared), self.__state, self.__rank))
+
+    def __contains__(self, string: str):
+        descendant = self.consume(string)
+        return descendant and descendant.is_final()
+
+    def __iter__(self):
+        return self.strings()
+
+    def __getitem__(self, prefix: str):
+        return self.consume(prefix)
+
+    @staticmethod
+    def from_trie(trie: Trie) -> Dawg:
+        """
+        Constructor-like convenience method. Creates and returns a new automaton containing
+        the same strings and meta data values as the given trie.
+        """
+        return Dawg((string, trie.consume(string).get_meta()) for string in trie.strings())
+
+    @staticmethod
+    def from_sorted_strings(strings: Iterable[str]) -> Dawg:
+        """
+        Constructor-like convenience method. Creates and returns a new automaton containing
+        all the given strings, which must be sorted and already normalized.
+        """
+        return Dawg(zip(strings, repeat(None)))
+
+    @staticmethod
+    def from_sorted_strings2(strings: Iterable[Tuple[str, Optional[Any]]]) -> Dawg:
+        """
+        Constructor-like convenience method. Creates and returns a new automaton containing
+        all the given (string, meta) pairs. The strings must be sorted and already normalized.
+
+        Adding the same string more than once is benign and idempotent, as long as their associated
+        meta data values do not differ.
+        """
+        return Dawg(strings)
+
+    def consume(self, prefix: str) -> Optional[Dawg]:
+        """
+        Consumes the given prefix verbatim and returns the resulting descendant node,
+        if any. I.e., if strings that have this prefix have been added to the automaton,
+        then the node corresponding to traversing the prefix is returned. Otherwise, None
+        is returned.
+
+        Assumes that the prefix is already normalized.
+        """
+        (offsets, symbols, targets, ranks, _, _) = self.__shared
+        state, rank = self.__state, self.__rank
+        for symbol in prefix:
+            i = symbols.find(symbol, offsets[state], offsets[state + 1])
+            if i < 0:
+                return None
+            state, rank = targets[i], rank + ranks[i]
+        return self.__at(state, rank)
+
+    def child(self, transition: str) -> Optional[Dawg]:
+        """
+        Returns the immediate child node, given a transition symbol. Returns None if the transition
+        symbol is invalid. Functionally equivalent to consume(transition), but simpler and for the
+        special of a single transition symbol and not a longer string.
+
+        Assumes that the transition symbol is already normalized.
+        """
+        if len(transition) != 1:
+            return None
+        return self.consume(transition)
+
+    def strings(self) -> Iterator[str]:
+        """
+        Yields all strings that are found in or below this node. For simple testing and debugging purposes.
+        The returned strings are emitted back in lexicographical order.
+        """
+        stack = [(self, "")]
+        while stack:
+            node, prefix = stack.pop()
+            if node.is_final():
+                yield prefix
+            for symbol in reversed(node.transitions()):
+                stack.append((node.child(symbol), prefix + symbol))
+
+    def transitions(self) -> List[str]:
+        """
+        Returns the set of symbols that are valid outgoing transitions, i.e., the set of symbols that
+        when consumed by this node would lead to a valid child node. The returned transitions are
+        emitted back in lexicographical order.
+        """
+        (offsets, symbols, _, _, _, _) = self.__shared
+        return list(symbols[offsets[self.__state]:offsets[self.__state + 1]])
+
+    def is_final(self) -> bool:
+        """
+        Returns True iff the current node is a final/terminal state in the automaton, i.e.,
+        if a string has been added to the automaton where the end of the string ends up in
+        this node.
+        """
+        return self.__shared[4][self.__state] == 1
+
+    def has_meta(self) -> bool:
+        """
+        Returns True iff the current node is a final/terminal state that has meta data associated
+        with it.
+        """
+        return self.get_meta() is not None
+
+    def get_meta(self) -> Optional[Any]:
+        """
+        Returns the meta data associated with the final/terminal state, or None if no such meta
+        data exists.
+        """
+        metas = self.__shared[5]
+        return metas[self.__rank] if metas and self.is_final() else None
+
+    def get_state_count(self) -> int:
+        """
+        Returns the number of states in the automaton. For simple testing and debugging purposes.
+        """
+        return len(self.__shared[4])
+
+    def get_transition_count(self) -> int:
+        """
+        Returns the number of transitions in the automaton. For simple testing and debugging purposes.
+        """
+        return len(self.__shared[2])
+
+    def __at(self, state: int, rank: int) -> Dawg:
+        """
+        Returns the node for the given state, sharing the arrays with this node.
+        """
+        node = __class__.__new__(__class__)
+        node.__shared = self.__shared
+        node.__state = state
+        node.__rank = rank
+        return node
+
+    @staticmethod
+    def __build(strings: Iterable[Tuple[str, Optional[Any]]]) -> Tuple[Tuple[array, str, array, array, bytearray, Optional[List[Any]]], int]:
+        """
+        Builds the automaton for the given sorted (string, meta) pairs. Returns the shared arrays, i.e.,
+        where each state's transitions begin, the transitions' symbols, target states and number of
+        strings skipped past, whether each state is final, and the meta data table. Also returns the
+        root state.
+        """
+        offsets, symbols, targets, ranks, finals = array("I", [0]), [], array("I"), array("I"), bytearray()
+        counts: List[int] = []  # The number of strings below each state.
+        register: Dict[Tuple[int, Tuple[Tuple[str, int], ...]], int] = {}  # Maps (final, transitions) to a state.
+
+        def freeze(node: List[Any]) -> int:
+            # Returns an equivalent state if we have one, otherwise the node is added as a new state.
+            key = (node[0], tuple(node[1]))
+            state = register.get(key)
+            if state is None:
+                state = register[key] = len(finals)
+                finals.append(node[0])
+                rank = node[0]
+                for symbol, target in node[1]:
+                    symbols.append(symbol)
+                    targets.append(target)
+                    ranks.append(rank)
+                    rank += counts[target]
+                counts.append(rank)
+                offsets.append(len(targets))
+            return state
+
+        def minimize(depth: int) -> None:
+            # The nodes below the given depth along the path can't get more transitions, so freeze them.
+            while len(path) > depth + 1:
+                node = path.pop()
+                path[-1][1][-1] = (path[-1][1][-1][0], freeze(node))
+
+        # The nodes along the path of the previous string that aren't frozen yet, as [final, transitions].
+        path: List[List[Any]] = [[0, []]]
+        metas, previous = [], ""
+        for string, meta in strings:
+            assert 0 < len(string)
+            if string == previous:
+                assert metas[-1] == meta
+                continue
+            assert previous < string, "Strings must be sorted."
+            common = 0
+            while common < len(previous) and previous[common] == string[common]:
+                common += 1
+            minimize(common)
+            for symbol in string[common:]:
+                node = [0, []]
+                path[-1][1].append((symbol, node))
+                path.append(node)
+            path[-1][0] = 1
+            metas.append(meta)
+            previous = string
+        minimize(0)
+        root = freeze(path[0])
+        return ((offsets, "".join(symbols), targets, ranks, finals, metas if any(meta is not None for meta in metas) else None), root)
@@ -1,9 +1,13 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=unnecessary-pass
 
+import os
+import sys
 from abc import abstractmethod
+from array import array
+from bisect import bisect_right
 import collections.abc
-from typing import Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 
 class Dictionary(collections.abc.Iterable[Tuple[str, int]]):
@@ -79,3 +83,289 @@ class InMemoryDictionary(Dictionary):
 
     def get_term_id(self, term: str) -> Optional[int]:
         return self._terms.get(term, None)
+
+
+class FrontCodedDictionary(Dictionary):
+    """
+    A compact dictionary that keeps its terms sorted, and that stores them in blocks using front
+    coding. See Section 5.2.2 in https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    The first term in each block is kept as is, and every other term in the block is represented
+    as the length of the prefix it shares with the previous term plus the remaining suffix. Lookups
+    binary search over the block heads, and then scan a single block. Iterating over the dictionary
+    yields the terms in sorted order.
+
+    Can be constructed from (term, term identifier) pairs, e.g., from another dictionary. The term
+    identifiers are kept in a side array, unless they coincide with the terms' sorted positions. New
+    terms can be added, but only in sorted order.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, int]] = (), block_size: int = 16):
+        assert block_size > 0
+        self.__block_size = block_size  # The number of terms per block.
+        self.__heads: List[bytes] = []  # The first term in each block, UTF-8 encoded.
+        self.__offsets = array("I")  # Where the remaining terms in each block start in the buffer.
+        self.__data = bytearray()  # The front-coded terms following each block head.
+        self.__last = b""  # The last term added, so that we can front code the next one.
+        self.__term_ids: Optional[array] = None  # The term identifiers in sorted order, or None if they're the same as the positions.
+        self.__size = 0
+        for term, term_id in sorted(terms):
+            self.__append(term.encode("utf-8"), term_id)
+        self.__data = bytearray(self.__data)  # Release any slack that the buffer accumulated while growing.
+
+    def __iter__(self):
+        for block, head in enumerate(self.__heads):
+            rank = block * self.__block_size
+            yield (head.decode("utf-8"), self.__get_term_id(rank))
+            for term in self.__scan(block):
+                rank += 1
+                yield (term.decode("utf-8"), self.__get_term_id(rank))
+
+    def size(self) -> int:
+        return self.__size
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            encoded = term.encode("utf-8")
+            assert self.__size == 0 or encoded > self.__last, "Terms must be added in sorted order."
+            term_id = self.__size
+            self.__append(encoded, term_id)
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        encoded = term.encode("utf-8")
+        block = bisect_right(self.__heads, encoded) - 1
+        if block < 0:
+            return None
+        rank = block * self.__block_size
+        if self.__heads[block] == encoded:
+            return self.__get_term_id(rank)
+        # Inlined version of __scan, since this is the hot path.
+        data, current = self.__data, self.__heads[block]
+        where = self.__offsets[block]
+        end = self.__offsets[block + 1] if block + 1 < len(self.__offsets) else len(data)
+        while where < end:
+            prefix = data[where]
+            if prefix < 128:
+                where += 1
+            else:
+                (prefix, where) = (((prefix & 127) << 8) | data[where + 1], where + 2)
+            length = data[where]
+            if length < 128:
+                where += 1
+            else:
+                (length, where) = (((length & 127) << 8) | data[where + 1], where + 2)
+            current = current[:prefix] + data[where:where + length]
+            where += length
+            rank += 1
+            if current >= encoded:
+                return self.__get_term_id(rank) if current == encoded else None
+        return None
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns an estimate of the number of bytes the dictionary occupies in memory.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self.__heads) + sum(sys.getsizeof(head) for head in self.__heads) + \
+            sys.getsizeof(self.__offsets) + sys.getsizeof(self.__data) + sys.getsizeof(self.__term_ids)
+
+    def __append(self, term: bytes, term_id: int) -> None:
+        """
+        Front codes the given term, and appends it to the last block or starts a new block.
+        """
+        if self.__size % self.__block_size == 0:
+            self.__heads.append(term)
+            self.__offsets.append(len(self.__data))
+        else:
+            prefix = len(os.path.commonprefix((self.__last, term)))
+            __class__.__write_length(prefix, self.__data)
+            __class__.__write_length(len(term) - prefix, self.__data)
+            self.__data.extend(term[prefix:])
+        if self.__term_ids is None and term_id != self.__size:
+            self.__term_ids = array("I", range(self.__size))
+        if self.__term_ids is not None:
+            self.__term_ids.append(term_id)
+        self.__last = term
+        self.__size += 1
+
+    def __scan(self, block: int) -> Iterator[bytes]:
+        """
+        Yields the terms in the given block, except for the head, in sorted order.
+        """
+        data, current = self.__data, self.__heads[block]
+        where = self.__offsets[block]
+        end = self.__offsets[block + 1] if block + 1 < len(self.__offsets) else len(data)
+        while where < end:
+            (prefix, where) = __class__.__read_length(data, where)
+            (length, where) = __class__.__read_length(data, where)
+            current = current[:prefix] + data[where:where + length]
+            where += length
+            yield current
+
+    def __get_term_id(self, rank: int) -> int:
+        return rank if self.__term_ids is None else self.__term_ids[rank]
+
+    @staticmethod
+    def __write_length(length: int, data: bytearray) -> None:
+        """
+        Appends the given length using one byte if it's smaller than 128, or two bytes otherwise.
+        """
+        assert 0 <= length < 32768
+        if length < 128:
+            data.append(length)
+        else:
+            data.extend((128 | (length >> 8), length & 255))
+
+    @staticmethod
+    def __read_length(data: bytearray, where: int) -> Tuple[int, int]:
+        """
+        Reads back a length written by __write_length. Returns the length, and where it ends.
+        """
+        length = data[where]
+        if length < 128:
+            return (length, where + 1)
+        return (((length & 127) << 8) | data[where + 1], where + 2)
+
+
+class PerfectHashDictionary(Dictionary):
+    """
+    A compact dictionary for frozen vocabularies, built from an existing dictionary. Uses a minimal
+    perfect hash function constructed using the CHD (compress, hash and displace) algorithm to map
+    each term to a slot in {0, .., N - 1}, where the slot holds the term identifier. See
+    https://cmph.sourceforge.net/papers/esa09.pdf for details.
+
+    Each slot also holds a 16-bit fingerprint of its term, so that most terms that are not in the
+    vocabulary can be rejected. About 1 in 65536 unknown terms will map to some arbitrary term
+    identifier. Lookups never touch the terms themselves. These are kept front coded on the side,
+    see FrontCodedDictionary, so that the dictionary can be iterated over in sorted order. No new
+    terms can be added.
+
+    This saves memory, not time: A lookup is a handful of arithmetic operations in Python, and is
+    several times slower than looking the term up in a built-in dict.
+
+    The hash function builds on Python's built-in string hash, which is randomized per process.
+    The dictionary is therefore only valid in the process that built it, and cannot be pickled.
+    """
+
+    # The average number of terms per bucket. Larger values mean fewer buckets, but slower construction.
+    __bucket_load = 5
+
+    # How many seeds we try before giving up. Failing with one seed is rare, and only likely for tiny vocabularies.
+    __attempts = 100
+
+    def __init__(self, terms: Iterable[Tuple[str, int]]):
+        terms = list(terms)
+        assert len(set(term for term, _ in terms)) == len(terms), "The terms must be unique."
+        self.__size = len(terms)
+        # The terms in sorted order, for iteration. We get the term identifiers from the hash function, so
+        # the front coded dictionary just numbers the terms by rank and needs no identifiers of its own.
+        self.__terms = FrontCodedDictionary((term, rank) for rank, term in enumerate(sorted(term for term, _ in terms)))
+        for seed in range(__class__.__attempts):
+            # If we're unlucky, retry with different hash values and a slightly different number of buckets.
+            self.__salt = (seed * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF  # Mixed into the string hash, so that each seed gives different hash values.
+            self.__buckets = max(1, -(-self.__size // __class__.__bucket_load)) + seed
+            if self.__build(terms):
+                return
+        raise RuntimeError("Failed to construct a perfect hash function.")
+
+    def __iter__(self):
+        for term, _ in self.__terms:
+            yield (term, self.get_term_id(term))
+
+    def __getstate__(self):
+        raise TypeError("Depends on the per-process string hash, and cannot be pickled.")
+
+    def size(self) -> int:
+        return self.__size
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        assert term_id is not None, "The vocabulary is frozen."
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        n = self.__size
+        if not n:
+            return None
+        # Inlined version of __hash(), since this is called a lot.
+        h = hash(term) ^ self.__salt
+        bucket = h % self.__buckets
+        slot = ((h >> 32) % n + self.__first_displacements[bucket] * ((h & 0xFFFFFFFF) % n) + self.__second_displacements[bucket]) % n
+        return self.__term_ids[slot] if self.__fingerprints[slot] == (h >> 16) & 0xFFFF else None
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns an estimate of the number of bytes the dictionary occupies in memory.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self.__first_displacements) + sys.getsizeof(self.__second_displacements) + \
+            sys.getsizeof(self.__fingerprints) + sys.getsizeof(self.__term_ids) + self.__terms.get_memory_usage()
+
+    def __hash(self, term: str) -> Tuple[int, int, int, int]:
+        """
+        Returns the bucket, the two hash values used for displacement, and the fingerprint of the given
+        term. These are all cut from a single string hash, so that lookups don't need to hash twice.
+        """
+        h = hash(term) ^ self.__salt
+        return (h % self.__buckets, (h >> 32) % self.__size, (h & 0xFFFFFFFF) % self.__size, (h >> 16) & 0xFFFF)
+
+    def __build(self, terms: List[Tuple[str, int]]) -> bool:
+        """
+        Tries to construct the perfect hash function using the current seed. Returns False if we
+        were unlucky with the hash values and should retry with another seed.
+        """
+        self.__first_displacements = array("I", bytes(4 * self.__buckets))  # The d0 part of the displacement pair, per bucket.
+        self.__second_displacements = array("I", bytes(4 * self.__buckets))  # The d1 part of the displacement pair, per bucket.
+        self.__fingerprints = array("H", bytes(2 * self.__size))  # The fingerprint of the term in each slot.
+        self.__term_ids = array("I", bytes(4 * self.__size))  # The identifier of the term in each slot.
+        buckets: List[List[Tuple[int, int, int, int]]] = [[] for _ in range(self.__buckets)]
+        for term, term_id in terms:
+            (bucket, first, second, fingerprint) = self.__hash(term)
+            buckets[bucket].append((first, second, fingerprint, term_id))
+        # Place the largest buckets first, while there are still lots of vacant slots.
+        taken = bytearray(self.__size)
+        order = sorted(range(self.__buckets), key=lambda b: len(buckets[b]), reverse=True)
+        for bucket in (b for b in order if len(buckets[b]) > 1):
+            displaced = self.__displace(buckets[bucket], taken)
+            if displaced is None:
+                return False
+            self.__place(bucket, displaced[0], displaced[1], buckets[bucket], taken)
+        # Buckets holding a single term can simply be displaced onto any vacant slot.
+        vacant = [slot for slot in range(self.__size) if not taken[slot]]
+        for bucket in (b for b in order if len(buckets[b]) == 1):
+            slot = vacant.pop()
+            self.__place(bucket, (0, (slot - buckets[bucket][0][0]) % self.__size), [slot], buckets[bucket], taken)
+        return True
+
+    def __displace(self, bucket: List[Tuple[int, int, int, int]], taken: bytearray) -> Optional[Tuple[Tuple[int, int], List[int]]]:
+        """
+        Finds a displacement pair (d0, d1) that maps all the terms in the bucket to distinct and
+        vacant slots. Returns the displacement pair, and the slots. Returns None if there is no such pair.
+        """
+        n = self.__size
+        if len(set((first, second) for first, second, _, _ in bucket)) < len(bucket):
+            return None
+        for d0 in range(n):
+            bases = [(first + d0 * second) % n for first, second, _, _ in bucket]
+            if len(set(bases)) < len(bases):
+                continue
+            # Overlay the slots as seen from the first term, so that we can look for a suitable d1 in one go.
+            occupied = 0
+            for base in bases:
+                shift = (base - bases[0]) % n
+                occupied |= int.from_bytes(taken[shift:] + taken[:shift], "little")
+            vacant = occupied.to_bytes(n, "little").find(0)
+            if vacant >= 0:
+                d1 = (vacant - bases[0]) % n
+                return ((d0, d1), [(base + d1) % n for base in bases])
+        return None
+
+    def __place(self, bucket: int, displacement: Tuple[int, int], slots: List[int], terms: List[Tuple[int, int, int, int]], taken: bytearray) -> None:
+        """
+        Records the displacement for the given bucket, and fills in the slots that its terms map to.
+        """
+        (self.__first_displacements[bucket], self.__second_displacements[bucket]) = displacement
+        for slot, (_, _, fingerprint, term_id) in zip(slots, terms):
+            taken[slot] = 1
+            self.__fingerprints[slot] = fingerprint
+            self.__term_ids[slot] = term_id
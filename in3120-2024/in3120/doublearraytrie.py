@@ -0,0 +1,338 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from __future__ import annotations
+import ast
+import mmap
+import struct
+from array import array
+from itertools import repeat
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .trie import Trie
+
+
+class DoubleArrayTrie:
+    """
+    A read-only trie encoded into a single contiguous buffer, using the double-array representation
+    described in https://doi.org/10.1109/32.31365. Offers the same interface for traversal as Trie,
+    but without allocating any objects per node.
+
+    Symbols are mapped to small integer codes, in lexicographical order. A state s has an outgoing
+    transition on a symbol with code c iff check[base[s] + c] == s, in which case base[s] + c is the
+    next state. The root is state 0. The special code 0 marks that a state is final/terminal, and
+    for the state that code 0 leads to we reuse the base slot to hold the index of the associated
+    meta data value in the meta table. Index 0 means None.
+
+    The buffer consists of the following regions:
+
+      1. A fixed-size header, see below.
+      2. The alphabet, i.e., the UTF-8 encoded symbols, sorted and concatenated.
+      3. The base array and the check array, both as 32-bit signed integers.
+      4. The meta table, i.e., the offsets of the encoded meta data values, followed by the values.
+
+    Meta data values are limited to what can be written as a Python literal, e.g., numbers, strings,
+    tuples, lists and dicts of these. They are stored as text and read back with ast.literal_eval, so
+    that opening a file from somewhere else can't make us run code. Strings, which are the most common
+    meta data values, skip the parsing step.
+
+    The trie can be written to disk and opened again later, in which case the file is memory-mapped
+    and the operating system pages in the parts of the file that we touch, as we touch them.
+
+    A node in the trie is also itself a trie in this implementation, and just refers to the shared
+    buffer and a state.
+    """
+
+    # Magic bytes, alphabet length in bytes, number of states, and number of meta data values.
+    __header = struct.Struct("<8sQQQ")
+
+    # Bumped when the meta data values stopped being pickled.
+    __magic = b"IN3120D2"
+
+    __slots__ = ("__shared", "__state")
+
+    def __init__(self, buffer: bytes):
+        (magic, alphabet_size, states, metas) = __class__.__header.unpack_from(buffer, 0)
+        if magic != __class__.__magic:
+            raise IOError("Not a double-array trie.")
+        view = memoryview(buffer)
+        where = __class__.__header.size
+        alphabet = bytes(view[where:where + alphabet_size]).decode("utf-8")
+        where += __class__.__aligned(alphabet_size)
+        base = view[where:where + 4 * states].cast("i")
+        where += 4 * states
+        check = view[where:where + 4 * states].cast("i")
+        where += __class__.__aligned(4 * states)
+        offsets = view[where:where + 8 * (metas + 1)].cast("Q")
+        where += 8 * (metas + 1)
+        codes = {symbol: code for code, symbol in enumerate(alphabet, 1)}
+        self.__shared = (base, check, codes, alphabet, offsets, view[where:], buffer)
+        self.__state = 0
+
+    def __repr__(self):
+        return repr(list(self.strings()))
+
+    def __eq__(self, other):
+        return isinstance(other, __class__) and self.__shared is other.__shared and self.__state == other.__state
+
+    def __hash__(self):
+        return hash((id(self.__shared), self.__state))
+
+    def __contains__(self, string: str):
+        descendant = self.consume(string)
+        return descendant and descendant.is_final()
+
+    def __iter__(self):
+        return self.strings()
+
+    def __getitem__(self, prefix: str):
+        return self.consume(prefix)
+
+    @staticmethod
+    def from_trie(trie: Trie) -> DoubleArrayTrie:
+        """
+        Constructor-like convenience method. Creates and returns a new double-array trie containing
+        the same strings and meta data values as the given trie.
+        """
+        return __class__.from_sorted_strings2((string, trie.consume(string).get_meta()) for string in trie.strings())
+
+    @staticmethod
+    def from_sorted_strings(strings: Iterable[str]) -> DoubleArrayTrie:
+        """
+        Constructor-like convenience method. Creates and returns a new double-array trie containing
+        all the given strings, which must be sorted and already normalized.
+        """
+        return __class__.from_sorted_strings2(zip(strings, repeat(None)))
+
+    @staticmethod
+    def from_sorted_strings2(strings: Iterable[Tuple[str, Optional[Any]]]) -> DoubleArrayTrie:
+        """
+        Constructor-like convenience method. Creates and returns a new double-array trie containing
+        all the given (string, meta) pairs. The strings must be sorted and already normalized.
+
+        Adding the same string more than once is benign and idempotent, as long as their associated
+        meta data values do not differ.
+        """
+        pairs: List[Tuple[str, Optional[Any]]] = []
+        for string, meta in strings:
+            assert 0 < len(string)
+            if pairs and pairs[-1][0] == string:
+                assert pairs[-1][1] == meta
+                continue
+            assert not pairs or pairs[-1][0] < string, "Strings must be sorted."
+            pairs.append((string, meta))
+        return __class__(__class__.__build(pairs))
+
+    @staticmethod
+    def open(filename: str) -> DoubleArrayTrie:
+        """
+        Opens a double-array trie that has previously been written to the named file, by
+        memory-mapping the file.
+        """
+        with open(filename, "rb") as file:
+            return __class__(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def write(self, filename: str) -> None:
+        """
+        Writes the complete trie to the named file, so that it can be opened again later. Writing
+        a node that isn't the root writes the complete trie, too.
+        """
+        with open(filename, "wb") as file:
+            file.write(self.__shared[6])
+
+    def consume(self, prefix: str) -> Optional[DoubleArrayTrie]:
+        """
+        Consumes the given prefix verbatim and returns the resulting descendant node,
+        if any. I.e., if strings that have this prefix have been added to the trie, then
+        the trie node corresponding to traversing the prefix is returned. Otherwise, None
+        is returned.
+
+        Assumes that the prefix is already normalized.
+        """
+        (base, check, codes, _, _, _, _) = self.__shared
+        state = self.__state
+        for symbol in prefix:
+            code = codes.get(symbol)
+            if code is None:
+                return None
+            child = base[state] + code
+            if check[child] != state:
+                return None
+            state = child
+        return self.__at(state)
+
+    def child(self, transition: str) -> Optional[DoubleArrayTrie]:
+        """
+        Returns the immediate child node, given a transition symbol. Returns None if the transition
+        symbol is invalid. Functionally equivalent to consume(transition), but simpler and for the
+        special of a single transition symbol and not a longer string.
+
+        Assumes that the transition symbol is already normalized.
+        """
+        (base, check, codes, _, _, _, _) = self.__shared
+        code = codes.get(transition)
+        if code is None:
+            return None
+        child = base[self.__state] + code
+        return self.__at(child) if check[child] == self.__state else None
+
+    def strings(self) -> Iterator[str]:
+        """
+        Yields all strings that are found in or below this node. For simple testing and debugging purposes.
+        The returned strings are emitted back in lexicographical order.
+        """
+        stack = [(self, "")]
+        while stack:
+            node, prefix = stack.pop()
+            if node.is_final():
+                yield prefix
+            for symbol in reversed(node.transitions()):
+                stack.append((node.child(symbol), prefix + symbol))
+
+    def transitions(self) -> List[str]:
+        """
+        Returns the set of symbols that are valid outgoing transitions, i.e., the set of symbols that
+        when consumed by this node would lead to a valid child node. The returned transitions are
+        emitted back in lexicographical order.
+        """
+        (base, check, _, alphabet, _, _, _) = self.__shared
+        state, offset = self.__state, base[self.__state] + 1
+        parents = check[offset:offset + len(alphabet)]
+        return [alphabet[i] for i, parent in enumerate(parents) if parent == state]
+
+    def is_final(self) -> bool:
+        """
+        Returns True iff the current node is a final/terminal state in the trie/automaton, i.e.,
+        if a string has been added to the trie where the end of the string ends up in this node.
+        """
+        (base, check, _, _, _, _, _) = self.__shared
+        return check[base[self.__state]] == self.__state
+
+    def has_meta(self) -> bool:
+        """
+        Returns True iff the current node is a final/terminal state that has meta data associated
+        with it.
+        """
+        return self.get_meta() is not None
+
+    def get_meta(self) -> Optional[Any]:
+        """
+        Returns the meta data associated with the final/terminal state, or None if no such meta
+        data exists.
+        """
+        if not self.is_final():
+            return None
+        (base, _, _, _, offsets, blobs, _) = self.__shared
+        i = base[base[self.__state]]
+        return __class__.__decode_meta(bytes(blobs[offsets[i - 1]:offsets[i]])) if i else None
+
+    def __at(self, state: int) -> DoubleArrayTrie:
+        """
+        Returns the node for the given state, sharing the buffer with this node.
+        """
+        node = __class__.__new__(__class__)
+        node.__shared = self.__shared
+        node.__state = state
+        return node
+
+    @staticmethod
+    def __aligned(size: int) -> int:
+        """
+        Rounds the given size up so that the next region starts on an 8-byte boundary.
+        """
+        return (size + 7) & ~7
+
+    @staticmethod
+    def __encode_meta(meta: Any) -> bytes:
+        """
+        Encodes the given meta data value, so that __decode_meta can read it back without running any code.
+        Strings are stored as is, everything else as a Python literal.
+        """
+        if isinstance(meta, str):
+            return b"s" + meta.encode("utf-8")
+        literal = repr(meta)
+        try:
+            assert ast.literal_eval(literal) == meta
+        except (ValueError, SyntaxError, AssertionError) as error:
+            raise ValueError(f"Meta data values must be Python literals, got {literal}.") from error
+        return b"r" + literal.encode("utf-8")
+
+    @staticmethod
+    def __decode_meta(blob: bytes) -> Any:
+        """
+        Decodes a meta data value encoded by __encode_meta.
+        """
+        value = blob[1:].decode("utf-8")
+        return value if blob[:1] == b"s" else ast.literal_eval(value)
+
+    @staticmethod
+    def __build(pairs: List[Tuple[str, Optional[Any]]]) -> bytearray:
+        """
+        Builds the buffer for the given list of sorted and unique (string, meta) pairs. States
+        are placed breadth-first, each one at the first base that makes room for all its children.
+        """
+        alphabet = "".join(sorted(set().union(*(string for string, _ in pairs))))
+        codes = {symbol: code for code, symbol in enumerate(alphabet, 1)}
+        base, check, used = array("i", [0]), array("i", [-1]), bytearray(1)
+        blobs: Dict[bytes, int] = {}  # Maps an encoded meta data value to its index in the meta table.
+        first_free = 1  # All slots below this one are known to be used.
+        queue = [(0, len(pairs), 0, 0)]  # The range of pairs below a state, their common prefix length, and the state.
+        for begin, end, depth, state in queue:
+            # Infer the outgoing transitions, as (code, begin, end) triples.
+            children = []
+            if begin < end and len(pairs[begin][0]) == depth:
+                children.append((0, begin, begin + 1))
+                begin += 1
+            while begin < end:
+                symbol, i = pairs[begin][0][depth], begin + 1
+                while i < end and pairs[i][0][depth] == symbol:
+                    i += 1
+                children.append((codes[symbol], begin, i))
+                begin = i
+            if not children:
+                continue
+            # Find a base where all the children fit, by trying the free slots for the first child.
+            first = children[0][0]
+            slot = max(first_free, first + 1)
+            while True:
+                found = used.find(0, slot)
+                slot = max(slot, len(used)) if found < 0 else found
+                offset = slot - first
+                if len(used) < offset + len(alphabet) + 1:
+                    grow = max(len(used), offset + len(alphabet) + 1 - len(used))
+                    used.extend(bytes(grow))
+                    base.extend(repeat(0, grow))
+                    check.extend(repeat(-1, grow))
+                if all(not used[offset + code] for code, _, _ in children):
+                    break
+                slot += 1
+            # Claim the slots.
+            base[state] = offset
+            for code, begin, end in children:
+                used[offset + code] = 1
+                check[offset + code] = state
+                if code == 0:
+                    meta = pairs[begin][1]
+                    base[offset] = 0 if meta is None else blobs.setdefault(__class__.__encode_meta(meta), len(blobs) + 1)
+                else:
+                    queue.append((begin, end, depth + 1, offset + code))
+            first_free = used.find(0, first_free)
+            first_free = len(used) if first_free < 0 else first_free
+        # Make sure that transitions() never reads past the end, and lay out the buffer.
+        states = max(len(used), len(alphabet) + 1)
+        padding = states - len(base)
+        base.extend(repeat(0, padding))
+        check.extend(repeat(-1, padding))
+        encoded = alphabet.encode("utf-8")
+        buffer = bytearray(__class__.__header.pack(__class__.__magic, len(encoded), states, len(blobs)))
+        buffer.extend(encoded)
+        buffer.extend(bytes(__class__.__aligned(len(encoded)) - len(encoded)))
+        buffer.extend(base.tobytes())
+        buffer.extend(check.tobytes())
+        buffer.extend(bytes(__class__.__aligned(4 * states) - 4 * states))
+        offsets = array("Q", [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        buffer.extend(offsets.tobytes())
+        for blob in blobs:
+            buffer.extend(blob)
+        return buffer
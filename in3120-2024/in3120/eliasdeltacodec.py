@@ -0,0 +1,50 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from typing import Iterable, List
+from .bitstream import BitReader, BitWriter
+from .eliasgammacodec import EliasGammaCodec
+
+
+class EliasDeltaCodec:
+    """
+    A simple encoder/decoder for Elias delta codes. See Section 5.3.2 in
+    https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    Like gamma codes, but the length of the offset is itself gamma coded instead of unary coded.
+    That makes delta codes shorter than gamma codes for larger numbers.
+    """
+
+    @staticmethod
+    def write(number: int, writer: BitWriter) -> None:
+        """
+        Appends the delta code of the given positive integer to the bit stream.
+        """
+        assert number > 0
+        length = number.bit_length()
+        EliasGammaCodec.write(length, writer)
+        writer.write(number ^ (1 << (length - 1)), length - 1)
+
+    @staticmethod
+    def write_many(numbers: Iterable[int], writer: BitWriter) -> None:
+        """
+        Appends the delta codes of the given positive integers to the bit stream.
+        """
+        for number in numbers:
+            __class__.write(number, writer)
+
+    @staticmethod
+    def read(reader: BitReader) -> int:
+        """
+        Reads the next delta code from the bit stream, and returns the integer it represents.
+        """
+        length = EliasGammaCodec.read(reader) - 1
+        return (1 << length) | reader.read(length)
+
+    @staticmethod
+    def read_many(reader: BitReader, count: int) -> List[int]:
+        """
+        Reads the given number of delta codes from the bit stream, and returns the integers they represent.
+        """
+        read = reader.read
+        return [(1 << length) | read(length) for length in (EliasGammaCodec.read(reader) - 1 for _ in range(count))]
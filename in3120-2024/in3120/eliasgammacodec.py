@@ -1,10 +1,17 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=line-too-long
 
+from typing import Iterable, List
+from .bitstream import BitReader, BitWriter
+
+
 class EliasGammaCodec:
     """
     A simple encoder/decoder for Elias gamma codes. See Section 5.3.2 in
     https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    The encode() and decode() methods work on strings of bits and are only meant for educational
+    purposes. The write() and read() methods and their bulk variants work on real bit streams.
     """
 
     @staticmethod
@@ -36,3 +43,36 @@ class EliasGammaCodec:
         offset = bits[length:]              # The remainder, if any, is the offset.
         binary = '1' + offset               # The 1 that was chopped off in encoding is prepended.
         return int(binary, 2)
+
+    @staticmethod
+    def write(number: int, writer: BitWriter) -> None:
+        """
+        Appends the gamma code of the given positive integer to the bit stream.
+        """
+        assert number > 0
+        length = number.bit_length() - 1
+        writer.write((((1 << length) - 1) << (length + 1)) | (number ^ (1 << length)), 2 * length + 1)
+
+    @staticmethod
+    def write_many(numbers: Iterable[int], writer: BitWriter) -> None:
+        """
+        Appends the gamma codes of the given positive integers to the bit stream.
+        """
+        for number in numbers:
+            __class__.write(number, writer)
+
+    @staticmethod
+    def read(reader: BitReader) -> int:
+        """
+        Reads the next gamma code from the bit stream, and returns the integer it represents.
+        """
+        length = reader.read_unary()
+        return (1 << length) | reader.read(length)
+
+    @staticmethod
+    def read_many(reader: BitReader, count: int) -> List[int]:
+        """
+        Reads the given number of gamma codes from the bit stream, and returns the integers they represent.
+        """
+        read, read_unary = reader.read, reader.read_unary
+        return [(1 << length) | read(length) for length in (read_unary() for _ in range(count))]
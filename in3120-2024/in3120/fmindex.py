@@ -0,0 +1,209 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterator, Iterable, List, Sequence, Tuple
+from collections import Counter
+from .bitvector import BitVector
+from .corpus import Corpus
+from .normalizer import Normalizer
+from .suffixsorter import SuffixSorter
+from .tokenizer import Tokenizer
+from .waveletmatrix import WaveletMatrix
+
+
+class FMIndex:
+    """
+    A compressed alternative to the SuffixArray class, supporting the same kind of phrase prefix searches.
+    See https://doi.org/10.1109/SFCS.2000.892127 for details.
+
+    The searchable content of all documents is concatenated into a single text, where each document is
+    preceded by a separator, and the text is terminated by a unique symbol. Instead of the text and its
+    suffix array, we keep the Burrows-Wheeler transform (BWT) of the text in a wavelet matrix. The BWT
+    lists the symbol in front of each suffix, in suffix order. Rank queries over the BWT let us step from a
+    suffix to the suffix that starts one symbol earlier (LF-mapping), and so we can find the range of
+    suffixes that start with the query by matching it one symbol at a time from the back (backward search).
+    Select queries let us step the other way, and so read the text forwards from where a match is.
+
+    To find out where in the text the matching suffixes start, we keep a sample of the suffix array. A
+    query has to start on a token boundary, so we sample exactly the suffixes that start with a separator
+    or a space. The separator and the space get the smallest codes after the terminator, so the sampled
+    suffixes are all consecutive in the suffix array and no bit vector is needed to tell which ones they
+    are. Where the documents begin is kept in a bit vector, so that we can go from a position in the text
+    to a document with a rank query.
+
+    Per symbol, the index uses about log2(alphabet size) bits for the BWT, and one bit for the document
+    boundaries. Per token, it uses 32 bits for the sample. That's a lot less than the SuffixArray class
+    needs, but searches are slower since every step is a handful of rank queries instead of an array lookup.
+    """
+
+    # Separates the documents in the concatenated text.
+    __separator = "\0"
+
+    # The codes we give the symbols. The other symbols in the text are numbered after these.
+    __terminator_code = 0
+    __separator_code = 1
+    __space_code = 2
+
+    def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer):
+        self.__corpus = corpus
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__document_ids: List[int] = []  # The document identifiers, in the order the documents appear in the text.
+        self.__alphabet: Dict[str, int] = {}  # Maps each symbol in the text to its code.
+        self.__symbols: List[str] = []  # Maps each code back to its symbol.
+        self.__firsts = array("I")  # Per code, the number of suffixes that start with a smaller code. Ends with the total.
+        self.__bwt = WaveletMatrix([], 1)  # The BWT of the text, as codes.
+        self.__samples = array("I")  # The positions of the suffixes that start with a separator or a space, in sorted order.
+        self.__boundaries = BitVector([])  # Per position in the text, whether a separator is there.
+        self.__build_fm_index(fields)
+
+    def __build_fm_index(self, fields: Iterable[str]) -> None:
+        """
+        Builds the FM-index from the set of named fields in the document collection. The full suffix
+        array is only needed while building, to produce the BWT and the samples.
+        """
+        fields = list(fields)
+        contents = []
+        for document in self.__corpus:
+            content = self.__normalize(" ".join(document.get_field(field, "") for field in fields))  # "this subject is great"
+            assert __class__.__separator not in content
+            self.__document_ids.append(document.get_document_id())
+            contents.append(content)
+
+        # Encode the text as integers, in the same order as the symbols. The space always gets its own code.
+        self.__symbols = ["", __class__.__separator, " "] + sorted(set().union(*contents) - {" "})
+        self.__alphabet = {symbol: code for code, symbol in enumerate(self.__symbols) if code >= __class__.__space_code}
+        codes = array("I")
+        for content in contents:
+            codes.append(__class__.__separator_code)
+            codes.extend(map(self.__alphabet.__getitem__, content))
+        codes.append(__class__.__terminator_code)
+        del contents
+
+        # Sort the suffixes, and keep what's in front of each one. The terminator is in front of the whole text.
+        suffixes = SuffixSorter.sort(codes, len(self.__symbols))
+        self.__bwt = WaveletMatrix(array("I", (codes[position - 1] for position in suffixes)), len(self.__symbols))
+        self.__samples = array("I", (position for position in suffixes if __class__.__separator_code <= codes[position] <= __class__.__space_code))
+        self.__boundaries = BitVector(code == __class__.__separator_code for code in codes)
+        del suffixes
+
+        # The suffixes are sorted by their first symbol, so those that start with a given symbol follow those
+        # that start with a smaller one.
+        counts = Counter(codes)
+        self.__firsts = array("I", [0] * (len(self.__symbols) + 1))
+        for code in range(1, len(self.__symbols) + 1):
+            self.__firsts[code] = self.__firsts[code - 1] + counts[code - 1]
+
+    def __normalize(self, buffer: str) -> str:
+        """
+        Produces a normalized version of the given string. Both queries and documents need to be
+        identically processed for lookups to succeed.
+        """
+
+        canonicalized = self.__normalizer.canonicalize(buffer)
+        strings = self.__tokenizer.strings(canonicalized)
+        normalized = [self.__normalizer.normalize(token) for token in strings]
+
+        return " ".join(normalized)
+
+    def __backward_search(self, codes: Sequence[int], begin: int, end: int) -> Tuple[int, int]:
+        """
+        Given the range of suffixes that start with some string, returns the range of suffixes that start
+        with the given codes followed by that string. We prepend the codes one at a time, from the back.
+        If there are no such suffixes, the range is empty.
+        """
+        (bwt, firsts) = (self.__bwt, self.__firsts)
+        for code in reversed(codes):
+            if begin >= end:
+                break
+            begin = firsts[code] + bwt.rank(code, begin)
+            end = firsts[code] + bwt.rank(code, end)
+        return (begin, end)
+
+    def __forward(self, row: int) -> Tuple[int, int]:
+        """
+        Returns the first symbol of the suffix at the given row in the suffix array, and the row of the suffix
+        that starts one symbol later. This is the inverse of the LF-mapping.
+        """
+        code = bisect_right(self.__firsts, row) - 1
+        return (code, self.__bwt.select(code, row - self.__firsts[code]))
+
+    def __continuations(self, boundary: int, codes: List[int], begin: int, end: int) -> Iterator[Tuple[List[int], int]]:
+        """
+        Given the range of suffixes that start with the given boundary code followed by the normalized query (as
+        codes), yields the distinct ways that the last token of the query continues, and how many times each one
+        occurs. E.g., for the query "to the be" we might get the codes for "st" and 3, and for "hemoth" and 1.
+
+        The suffixes with the same continuation are consecutive. Since the codes that end a token are the
+        smallest ones, they also come before the suffixes where the token goes on. So we read the continuation
+        of the first suffix forwards until the token ends, find the range of suffixes that continue the same way
+        with a backward search, and carry on after that range.
+        """
+        ends = self.__firsts[__class__.__space_code + 1]  # The suffixes in front of this one start with the end of a token.
+        row = begin
+        while row < end:
+            current, continuation = row, []
+            for _ in range(len(codes) + 1):
+                (_, current) = self.__forward(current)
+            (code, current) = self.__forward(current)
+            while code > __class__.__space_code:
+                continuation.append(code)
+                (code, current) = self.__forward(current)
+            (first, last) = self.__backward_search([boundary] + codes + continuation, 0, ends)
+            assert first == row
+            yield (continuation, last - first)
+            row = last
+
+    def evaluate(self, query: str, options: dict) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluates the given query, doing a "phrase prefix search".  E.g., for a supplied query phrase like
+        "to the be", we return documents that contain phrases like "to the bearnaise", "to the best",
+        "to the behemoth", and so on. I.e., we require that the query phrase starts on a token boundary in the
+        document, but it doesn't necessarily have to end on one.
+
+        The matching documents are ranked according to how many times the query substring occurs in the document,
+        and only the "best" matches are yielded back to the client. Ties are resolved by document order.
+
+        The client can supply a dictionary of options that controls this query evaluation process: The maximum
+        number of documents to return to the client is controlled via the "hit_count" (int) option.
+
+        The results yielded back to the client are dictionaries having the keys "score" (int) and
+        "document" (Document).
+
+        If the "group_by_continuation" (bool) option is set, we instead find the distinct ways that the last
+        token of the query phrase continues, e.g., "to the best" and "to the behemoth". This is useful for
+        autocompletion. The continuations are ranked according to how many times they occur, and the
+        results are dictionaries having the keys "score" (int) and "continuation" (str).
+        """
+
+        normalized_query = self.__normalize(query)
+        if not normalized_query or any(symbol not in self.__alphabet for symbol in normalized_query):
+            return
+
+        hit_count = options.get('hit_count', 5)
+        codes = [self.__alphabet[symbol] for symbol in normalized_query]
+        begin, end = self.__backward_search(codes, 0, len(self.__bwt))
+
+        # The query has to start on a token boundary, i.e., after a separator or a space. The suffixes that start
+        # with one of these are the ones we have samples for, in the same order.
+        ranges = [(boundary, *self.__backward_search([boundary], begin, end)) for boundary in (__class__.__separator_code, __class__.__space_code)]
+
+        # Find the distinct ways the query continues, most frequent first. Ties are resolved lexicographically.
+        if options.get("group_by_continuation", False):
+            continuations = Counter()
+            for boundary, first, last in ranges:
+                for continuation, score in self.__continuations(boundary, codes, first, last):
+                    continuations[normalized_query + "".join(self.__symbols[code] for code in continuation)] += score
+            for continuation, score in sorted(continuations.items(), key=lambda item: (-item[1], item[0]))[:hit_count]:
+                yield {"score": score, "continuation": continuation}
+            return
+
+        # Look up where the sampled suffixes start, and which documents those positions are in.
+        offset = self.__firsts[__class__.__separator_code]
+        owners = [self.__boundaries.rank1(position + 1) - 1 for _, first, last in ranges for position in self.__samples[first - offset:last - offset]]
+        matches = Counter(sorted(owners))  # {document index: score (count of times the query appears in the doc)}
+
+        for owner, score in matches.most_common(hit_count):
+            yield {"score": score, "document": self.__corpus.get_document(self.__document_ids[owner])}
@@ -0,0 +1,59 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from math import log2
+from typing import Iterable, List
+from .bitstream import BitReader, BitWriter
+
+
+class GolombRiceCodec:
+    """
+    A simple encoder/decoder for Golomb-Rice codes, i.e., Golomb codes where the divisor is a power
+    of two. See https://en.wikipedia.org/wiki/Golomb_coding for details.
+
+    A non-negative integer is split into a quotient and a remainder given the divisor 2^k. The
+    quotient is unary coded, and the remainder is stored using k bits. Good for numbers that are
+    roughly geometrically distributed, e.g., the gaps in a posting list, if k is chosen to match
+    the average gap.
+    """
+
+    @staticmethod
+    def get_parameter(average: float) -> int:
+        """
+        Returns a suitable parameter k for numbers having the given average value.
+        """
+        assert average >= 0
+        return max(0, int(log2(average * 0.69))) if average >= 1 else 0
+
+    @staticmethod
+    def write(number: int, parameter: int, writer: BitWriter) -> None:
+        """
+        Appends the Golomb-Rice code of the given non-negative integer to the bit stream.
+        """
+        assert number >= 0
+        assert parameter >= 0
+        quotient = number >> parameter
+        writer.write((((1 << quotient) - 1) << (parameter + 1)) | (number & ((1 << parameter) - 1)), quotient + 1 + parameter)
+
+    @staticmethod
+    def write_many(numbers: Iterable[int], parameter: int, writer: BitWriter) -> None:
+        """
+        Appends the Golomb-Rice codes of the given non-negative integers to the bit stream.
+        """
+        for number in numbers:
+            __class__.write(number, parameter, writer)
+
+    @staticmethod
+    def read(parameter: int, reader: BitReader) -> int:
+        """
+        Reads the next Golomb-Rice code from the bit stream, and returns the integer it represents.
+        """
+        return (reader.read_unary() << parameter) | reader.read(parameter)
+
+    @staticmethod
+    def read_many(parameter: int, reader: BitReader, count: int) -> List[int]:
+        """
+        Reads the given number of Golomb-Rice codes from the bit stream, and returns the integers they represent.
+        """
+        read, read_unary = reader.read, reader.read_unary
+        return [(read_unary() << parameter) | read(parameter) for _ in range(count)]
@@ -4,16 +4,22 @@
 # pylint: disable=unused-argument
 
 import itertools
+import mmap
+import os
+import struct
 from abc import ABC, abstractmethod
 from collections import Counter
-from typing import Iterable, Iterator, List, Tuple, Dict
-from .dictionary import InMemoryDictionary
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Dict
+from .dictionary import Dictionary, InMemoryDictionary
 from .normalizer import Normalizer
 from .tokenizer import Tokenizer
 from .corpus import Corpus
 from .posting import Posting
-from .postinglist import CompressedInMemoryPostingList, InMemoryPostingList, PostingList
+from .postinglist import BitmapPostingList, CompressedInMemoryPostingList, InMemoryPostingList, PostingList
 from .document import InMemoryDocument # for type hint
+from .variablebytecodec import VariableByteCodec
 
 
 class InvertedIndex(ABC):
@@ -78,17 +84,39 @@ class InMemoryInvertedIndex(InvertedIndex):
     In a serious application we'd have configuration to allow for field-specific NLP,
     scale beyond current memory constraints, have a positional index, and so on.
 
-    If index compression is enabled, only the posting lists are compressed. Dictionary
-    compression is currently not supported.
+    If index compression is enabled, only the posting lists are compressed. The dictionary can
+    be compressed by supplying a factory that converts the dictionary once the index is built,
+    e.g., FrontCodedDictionary.
+
+    The posting list representation can be overridden by supplying a factory, e.g., ArrayPostingList.
+    If so, the compressed flag is ignored.
+
+    If a bitmap threshold is given, posting lists for terms that occur in at least that fraction of
+    the documents are converted to BitmapPostingList when the index is finalized. Very common terms
+    are then both more compact and faster to merge.
+
+    If more than one worker is specified, tokenization and normalization is spread out
+    across a pool of processes. The resulting index is identical to the one we get when
+    indexing on a single core.
     """
 
-    def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer, compressed: bool = False):
+    def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer, compressed: bool = False, workers: int = 1,
+                 posting_list_factory: Optional[Callable[[], PostingList]] = None, bitmap_threshold: float = 0.0,
+                 dictionary_factory: Optional[Callable[[Dictionary], Dictionary]] = None):
+        assert 0.0 <= bitmap_threshold <= 1.0
         self._corpus = corpus
+        self._bitmap_threshold = bitmap_threshold
         self._normalizer = normalizer
         self._tokenizer = tokenizer
         self._posting_lists: List[PostingList] = []
-        self._dictionary = InMemoryDictionary()
-        self._build_index(fields, compressed)
+        self._posting_list_factory = posting_list_factory or (CompressedInMemoryPostingList if compressed else InMemoryPostingList)
+        self._dictionary: Dictionary = InMemoryDictionary()
+        self._dictionary_factory = dictionary_factory
+        if workers > 1:
+            self._build_index_in_parallel(list(fields), compressed, workers)
+        else:
+            self._build_index(fields, compressed)
+        self._finalize_index()
 
     # _postings_lists = [[Posting, Posting, ...], [Posting], [Posting, Posting, Posting, Posting, ...]]
     # Posting = docID, term frequency (amount of times term in doc)
@@ -101,7 +129,8 @@ class InMemoryInvertedIndex(InvertedIndex):
         Kicks off the indexing process. Basically implements a flavor of SPIMI indexing as described in
         https://nlp.stanford.edu/IR-book/html/htmledition/single-pass-in-memory-indexing-1.html but with
         the vastly simplifying assumption that everything fits in memory so we just have a single block
-        and thus no need to merge per-block results.
+        and thus no need to merge per-block results. See SpimiIndexer for an implementation that flushes
+        multiple blocks to disk and merges them.
 
         Note that we currently don't keep track of which field each term occurs in. If we were to allow
         fielded searches (e.g., "find documents that contain 'foo' in the 'title' field") then we would
@@ -129,7 +158,29 @@ class InMemoryInvertedIndex(InvertedIndex):
                 self._append_to_posting_list(term_id, doc_id, term_count, compressed)
             
             doc = next(doc_iterator, None)
-    
+
+    def _build_index_in_parallel(self, fields: List[str], compressed: bool, workers: int) -> None:
+        """
+        Same as _build_index, but partitions the corpus into blocks of consecutive document identifiers
+        and inverts each block in a separate process. This is the "multiple blocks" part of SPIMI, but
+        with the blocks processed side by side instead of one after the other.
+
+        Each block comes back as a term-to-postings mapping where the terms are listed in the order
+        they were first encountered and where the postings are sorted by document identifier. Merging
+        the blocks in order then amounts to appending, and assigns the same term identifiers that the
+        serial path would have assigned.
+        """
+        documents = [(d.get_document_id(), " ".join(d.get_field(f, "") for f in fields)) for d in self._corpus]
+        block_size = max(1, -(-len(documents) // (4 * workers)))  # A few blocks per worker, for load balancing.
+        blocks = [documents[i:i + block_size] for i in range(0, len(documents), block_size)]
+        inverter = partial(_invert_block, normalizer=self._normalizer, tokenizer=self._tokenizer)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for block in executor.map(inverter, blocks):
+                for term, postings in block.items():
+                    term_id = self._add_to_dictionary(term)
+                    for document_id, term_frequency in postings:
+                        self._append_to_posting_list(term_id, document_id, term_frequency, compressed)
+
     def _add_to_dictionary(self, term: str) -> int:
         """
         Adds the given term to the dictionary, if it's not already present. If it's already present,
@@ -145,7 +196,7 @@ class InMemoryInvertedIndex(InvertedIndex):
         """
         
         if term_id >= len(self._posting_lists): # if term doesn't have an associated posting list
-            self._posting_lists.append(InMemoryPostingList())
+            self._posting_lists.append(self._posting_list_factory())
         
         self._posting_lists[term_id].append_posting(Posting(document_id, term_frequency))
 
@@ -155,6 +206,19 @@ class InMemoryInvertedIndex(InvertedIndex):
         implementations that need it with the chance to tie up any loose ends,
         if needed.
         """
+        for posting_list in self._posting_lists:
+            posting_list.finalize_postings()
+        if self._bitmap_threshold > 0.0:
+            minimum_length = self._bitmap_threshold * self._corpus.size()
+            for term_id, posting_list in enumerate(self._posting_lists):
+                if posting_list.get_length() >= minimum_length:
+                    bitmap_posting_list = BitmapPostingList()
+                    for posting in posting_list:
+                        bitmap_posting_list.append_posting(posting)
+                    bitmap_posting_list.finalize_postings()
+                    self._posting_lists[term_id] = bitmap_posting_list
+        if self._dictionary_factory:
+            self._dictionary = self._dictionary_factory(self._dictionary)
 
     def get_terms(self, buffer: str) -> Iterator[str]:
         # In a serious large-scale application there could be field-specific tokenizers.
@@ -169,11 +233,44 @@ class InMemoryInvertedIndex(InvertedIndex):
 
     def get_postings_iterator(self, term: str) -> Iterator[Posting]:
         term_id: int = self._dictionary.get_term_id(term)
-        return self._posting_lists[term_id].get_iterator() if term_id else []
+        return self._posting_lists[term_id].get_iterator() if term_id is not None else iter([])
 
     def get_document_frequency(self, term: str) -> int:
         term_id: int = self._dictionary.get_term_id(term)
-        return len(self._posting_lists[term_id]) if term_id else 0
+        return len(self._posting_lists[term_id]) if term_id is not None else 0
+
+    def get_memory_statistics(self) -> Dict[str, Any]:
+        """
+        Returns some statistics about the memory usage of the posting lists, as estimated
+        by the posting lists themselves. The dictionary is not included. Facilitates comparing
+        the memory footprint of different posting list representations.
+        """
+        postings = sum(len(posting_list) for posting_list in self._posting_lists)
+        size = sum(posting_list.get_memory_usage() for posting_list in self._posting_lists)
+        return {
+            "terms": len(self._posting_lists),
+            "postings": postings,
+            "bytes": size,
+            "bytes_per_posting": size / postings if postings else 0.0,
+        }
+
+
+def _invert_block(documents: List[Tuple[int, str]], normalizer: Normalizer, tokenizer: Tokenizer) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Inverts a single block of (document identifier, content) pairs, as done by the worker processes
+    when building an inverted index in parallel. Must be a module-level function so that it can be
+    pickled and shipped to the workers.
+
+    Processes the content the same way as InMemoryInvertedIndex.get_terms does. The returned mapping
+    lists the terms in the order that they were first encountered in the block.
+    """
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    for document_id, content in documents:
+        tokens = tokenizer.strings(normalizer.canonicalize(content))
+        for term, term_frequency in Counter(normalizer.normalize(t) for t in tokens).items():
+            postings.setdefault(term, []).append((document_id, term_frequency))
+    return postings
+
 
 class DummyInMemoryInvertedIndex(InMemoryInvertedIndex):
     """
@@ -206,6 +303,181 @@ class DummyInMemoryInvertedIndex(InMemoryInvertedIndex):
         return self._document_frequencies.get(self._dictionary.get_term_id(term), 0)
 
 
+class MemoryMappedInvertedIndex(InvertedIndex):
+    """
+    A read-only inverted index that lives in a single binary file, which we memory-map. Opening the
+    index only requires reading a small fixed-size header, and the operating system pages in the parts
+    of the file that we touch, as we touch them. Thus, we can open an index once it has been built
+    without having to rebuild it from the corpus, and the index can be larger than available memory.
+
+    The file consists of four regions:
+
+      1. A fixed-size header, see below.
+      2. The posting lists, compressed. A posting list is encoded the same way as done in
+         CompressedInMemoryPostingList when finalized, i.e., as variable-byte encoded gaps and term
+         frequencies, split into blocks if the list is long enough. The block size follows from the
+         document frequency, so iterators can skip past whole blocks.
+      3. The dictionary, i.e., the UTF-8 encoded terms, sorted and concatenated.
+      4. A table with one fixed-size entry per term, in term order. An entry holds the offset of the
+         term in the dictionary region, the offset of the term's posting list, and the term's document
+         frequency. A final sentinel entry allows us to infer the lengths of the last term and the last
+         posting list.
+
+    Term lookups are done via binary search over the table. Posting lists are decoded directly from
+    the mapped buffer, without copying.
+
+    The same normalizer and tokenizer as were used when building the index must be supplied, so that
+    we can process query strings identically.
+
+    Call close(), or use the index as a context manager, to unmap the file once done with it.
+    """
+
+    # Bumped whenever the file format changes. Files written in another format are rejected.
+    format_version = 2
+
+    # Magic bytes, term count, dictionary offset, and table offset.
+    __header = struct.Struct("<8sQQQ")
+
+    # Term offset, posting list offset, and document frequency.
+    __entry = struct.Struct("<QQQ")
+
+    __magic = b"IN3120I" + bytes([format_version])
+
+    def __init__(self, filename: str, normalizer: Normalizer, tokenizer: Tokenizer):
+        self._normalizer = normalizer
+        self._tokenizer = tokenizer
+        with open(filename, "rb") as file:
+            if os.fstat(file.fileno()).st_size < __class__.__header.size:
+                raise IOError(f"Not an inverted index file: {filename}")
+            self.__buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.__size, self.__dictionary, self.__table) = __class__.__header.unpack_from(self.__buffer, 0)
+        if magic != __class__.__magic:
+            self.__buffer.close()
+            raise IOError(f"Not an inverted index file: {filename}")
+        self.__view = memoryview(self.__buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __repr__(self):
+        return str({term: self.__postings(i) for i, term in enumerate(self.get_indexed_terms())})
+
+    def __entry_at(self, i: int) -> Tuple[int, int, int]:
+        """
+        Returns the (term offset, posting list offset, document frequency) entry for the i-th term.
+        """
+        return __class__.__entry.unpack_from(self.__buffer, self.__table + i * __class__.__entry.size)
+
+    def __term_at(self, i: int) -> bytes:
+        """
+        Returns the i-th term in sorted order, still UTF-8 encoded.
+        """
+        begin = self.__entry_at(i)[0]
+        end = self.__entry_at(i + 1)[0]
+        return self.__buffer[self.__dictionary + begin:self.__dictionary + end]
+
+    def __find(self, term: str) -> Optional[int]:
+        """
+        Does a binary search for the given term. Returns the term's position in sorted order, or None
+        if the term is not in the dictionary. UTF-8 preserves code point order, so we can compare the
+        encoded terms directly.
+        """
+        needle = term.encode("utf-8")
+        low, high = 0, self.__size
+        while low < high:
+            middle = (low + high) // 2
+            if self.__term_at(middle) < needle:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self.__size and self.__term_at(low) == needle else None
+
+    def __postings(self, i: int) -> Iterator[Posting]:
+        """
+        Returns an iterator over the posting list of the i-th term, that decodes straight out of the mapped buffer.
+        """
+        (_, begin, document_frequency) = self.__entry_at(i)
+        end = self.__entry_at(i + 1)[1]
+        block_size = CompressedInMemoryPostingList.get_block_size(document_frequency)
+        return CompressedInMemoryPostingList.CompressedInMemoryPostingListIterator(self.__view[begin:end], document_frequency, block_size)
+
+    def close(self) -> None:
+        """
+        Unmaps the file. The index can't be used afterwards, and posting iterators obtained from it
+        must have been released first.
+        """
+        self.__view.release()
+        self.__buffer.close()
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        tokens = self._tokenizer.strings(self._normalizer.canonicalize(buffer))
+        return (self._normalizer.normalize(t) for t in tokens)
+
+    def get_indexed_terms(self) -> Iterator[str]:
+        # Unlike for other implementations, the vocabulary is listed in sorted order.
+        return (self.__term_at(i).decode("utf-8") for i in range(self.__size))
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        i = self.__find(term)
+        return self.__postings(i) if i is not None else iter([])
+
+    def get_document_frequency(self, term: str) -> int:
+        i = self.__find(term)
+        return self.__entry_at(i)[2] if i is not None else 0
+
+    @staticmethod
+    def write(index: InvertedIndex, filename: str) -> None:
+        """
+        Serializes the given inverted index, e.g., an InMemoryInvertedIndex, to the named file so that
+        it can be opened as a MemoryMappedInvertedIndex later.
+        """
+        def records():
+            for term in sorted(index.get_indexed_terms()):
+                numbers, previous = [], 0
+                for posting in index.get_postings_iterator(term):
+                    numbers += (posting.document_id - previous, posting.term_frequency)
+                    previous = posting.document_id
+                data = bytearray()
+                VariableByteCodec.encode_many(numbers, data)
+                yield (term, index.get_document_frequency(term), data)
+        __class__.write_records(records(), filename)
+
+    @staticmethod
+    def write_records(records: Iterable[Tuple[str, int, bytes]], filename: str) -> None:
+        """
+        Writes the given (term, document frequency, compressed posting list) triples to the named file,
+        so that it can be opened as a MemoryMappedInvertedIndex later. The records must be sorted by term
+        and the posting lists must be encoded as in CompressedInMemoryPostingList, before finalizing. Long
+        posting lists are split into blocks on the way out.
+
+        The posting lists are streamed straight to disk, only the dictionary and the table are buffered
+        up in memory before being appended.
+        """
+        header, entry = __class__.__header, __class__.__entry
+        dictionary, table, size, previous = bytearray(), bytearray(), 0, None
+        with open(filename, "wb") as file:
+            file.write(bytes(header.size))  # Placeholder, filled in when we know the offsets.
+            offset = header.size
+            for term, document_frequency, data in records:
+                encoded = term.encode("utf-8")
+                assert previous is None or previous < encoded, "Records must be sorted by term."
+                table.extend(entry.pack(len(dictionary), offset, document_frequency))
+                dictionary.extend(encoded)
+                data = CompressedInMemoryPostingList.insert_block_headers(data, document_frequency)
+                file.write(data)
+                offset += len(data)
+                size += 1
+                previous = encoded
+            table.extend(entry.pack(len(dictionary), offset, 0))
+            file.write(dictionary)
+            file.write(table)
+            file.seek(0)
+            file.write(header.pack(__class__.__magic, size, offset, offset + len(dictionary)))
+
+
 class AccessLoggedInvertedIndex(InvertedIndex):
     """
     Wraps another inverted index, and keeps an in-memory log of which postings
@@ -228,6 +500,20 @@ class AccessLoggedInvertedIndex(InvertedIndex):
             self._accesses.append((self._term, posting.document_id))
             return posting
 
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips ahead to the first posting having a document identifier greater than or equal
+            to the given one. Only the postings that the wrapped iterator actually returns are
+            logged, so skipped postings don't count as accessed.
+            """
+            advance_to = getattr(self._wrapped, "advance_to", None)
+            if not advance_to:
+                return next((posting for posting in self if posting.document_id >= document_id), None)
+            posting = advance_to(document_id)
+            if posting:
+                self._accesses.append((self._term, posting.document_id))
+            return posting
+
     def __init__(self, wrapped: InvertedIndex):
         self._wrapped = wrapped
         self._accesses = []
@@ -0,0 +1,106 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from collections import Counter
+from struct import Struct
+from typing import List, Sequence, Tuple
+
+
+class PForDeltaCodec:
+    """
+    A simple encoder/decoder for blocks of integers, using frame-of-reference coding and bit
+    packing with exceptions. I.e., a variant of PForDelta as described in https://doi.org/10.1109/ICDE.2006.150
+    and https://doi.org/10.1145/1526709.1526764. Typically applied to blocks of gaps between document
+    identifiers, or to blocks of term frequencies.
+
+    All numbers in a block are stored relative to the smallest one, using a fixed number of bits
+    per number. The number of bits is chosen so that the block becomes as small as possible, which
+    means that a few large numbers might not fit. These exceptions have their low bits stored along
+    with the other numbers, and their high bits and positions stored after the packed numbers.
+
+    Unlike with variable-byte codes, a whole block is decoded in one go. A block holds at most 256
+    numbers, and the encoded block starts with a small fixed-size header.
+    """
+
+    # Block header: Number of numbers minus one, bits per number, number of exceptions, bits per exception, and base.
+    __header = Struct("<BBBBI")
+
+    @staticmethod
+    def encode(numbers: Sequence[int], destination: bytearray) -> int:
+        """
+        Encodes the given block of numbers, and appends the resulting bytes to the given
+        destination buffer. Returns the number of bytes that were appended.
+        """
+        assert destination is not None
+        assert 0 < len(numbers) <= 256
+        base = min(numbers)
+        assert 0 <= base and max(numbers) < (1 << 32)
+        values = [number - base for number in numbers]
+        width = __class__.__get_width(values)
+        exceptions = [(i, value >> width) for i, value in enumerate(values) if value >> width]
+        exception_width = max((high.bit_length() for _, high in exceptions), default=0)
+        start = len(destination)
+        destination.extend(__class__.__header.pack(len(values) - 1, width, len(exceptions), exception_width, base))
+        __class__.__pack(values, width, destination)
+        destination.extend(i for i, _ in exceptions)
+        __class__.__pack([high for _, high in exceptions], exception_width, destination)
+        return len(destination) - start
+
+    @staticmethod
+    def decode(source: bytes, start: int) -> Tuple[List[int], int]:
+        """
+        Starting at the given position in the source buffer, decodes the next block of numbers.
+        Returns a pair comprised of the decoded numbers, and the number of bytes read from the
+        source buffer.
+        """
+        assert source is not None
+        assert start >= 0
+        (length, width, count, exception_width, base) = __class__.__header.unpack_from(source, start)
+        length += 1
+        where = start + __class__.__header.size
+        values = __class__.__unpack(source, where, length, width)
+        where += (length * width + 7) // 8
+        positions = source[where:where + count]
+        where += count
+        for i, high in zip(positions, __class__.__unpack(source, where, count, exception_width)):
+            values[i] |= high << width
+        where += (count * exception_width + 7) // 8
+        if base:
+            values = [value + base for value in values]
+        return (values, where - start)
+
+    @staticmethod
+    def __get_width(values: List[int]) -> int:
+        """
+        Returns the number of bits per number that minimizes the size of the encoded block.
+        """
+        lengths = Counter(value.bit_length() for value in values)
+        best_width, best_size = 0, None
+        for width in range(max(lengths) + 1):
+            exceptions = [(length, count) for length, count in lengths.items() if length > width]
+            exception_width = max((length for length, _ in exceptions), default=width) - width
+            count = sum(count for _, count in exceptions)
+            size = (len(values) * width + 7) // 8 + count + (count * exception_width + 7) // 8
+            if best_size is None or size < best_size:
+                best_width, best_size = width, size
+        return best_width
+
+    @staticmethod
+    def __pack(values: List[int], width: int, destination: bytearray) -> None:
+        """
+        Appends the low bits of the given numbers, the given number of bits each, to the buffer.
+        """
+        packed, mask = 0, (1 << width) - 1
+        for value in reversed(values):
+            packed = (packed << width) | (value & mask)
+        destination.extend(packed.to_bytes((len(values) * width + 7) // 8, "little"))
+
+    @staticmethod
+    def __unpack(source: bytes, start: int, length: int, width: int) -> List[int]:
+        """
+        Reads back the given number of packed numbers from the buffer, the given number of bits each.
+        """
+        if width == 0:
+            return [0] * length
+        packed, mask = int.from_bytes(source[start:start + (length * width + 7) // 8], "little"), (1 << width) - 1
+        return [(packed >> shift) & mask for shift in range(0, length * width, width)]
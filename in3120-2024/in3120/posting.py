@@ -6,8 +6,12 @@ from typing import Dict, Any
 class Posting:
     """
     A very simple posting entry in a non-positional inverted index.
+
+    We might create lots of these, so we use slots instead of a per-instance dictionary.
     """
 
+    __slots__ = ("document_id", "term_frequency")
+
     def __init__(self, document_id: int, term_frequency: int):
         self.document_id = document_id
         self.term_frequency = term_frequency
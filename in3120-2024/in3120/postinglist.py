@@ -1,17 +1,33 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=unnecessary-pass
 
+import sys
 from abc import ABC, abstractmethod
-from typing import Iterator, List
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, islice, repeat
+from math import isqrt
+from struct import Struct
+from typing import Callable, Iterator, List, Optional, Sequence, Union
+from .bitstream import BitReader, BitWriter
+from .eliasgammacodec import EliasGammaCodec
+from .pfordeltacodec import PForDeltaCodec
 from .posting import Posting
+from .roaringbitmap import RoaringBitmap
 from .variablebytecodec import VariableByteCodec
 
 
+# Header preceding each block in a PForDeltaPostingList: The last document identifier in the block, and the size of the block in bytes.
+_block_header = Struct("<II")
+
+
 class PostingList(ABC):
     """
     Abstract base class for a simple posting list.
     """
 
+    __slots__ = ()  # Allow subclasses to do without a per-instance dictionary, if they want to.
+
     def __iter__(self):
         return self.get_iterator()
 
@@ -29,6 +45,11 @@ class PostingList(ABC):
     def get_iterator(self) -> Iterator[Posting]:
         """
         Returns an iterator that can be used to iterate over the posting list.
+
+        Besides being a plain iterator, the iterator might also offer an advance_to(document_id)
+        method that skips ahead to the first posting having a document identifier greater than
+        or equal to the given one, and returns that posting. Or None, if there is no such posting.
+        Clients such as the PostingsMerger make use of this where available.
         """
         pass
 
@@ -51,6 +72,14 @@ class PostingList(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_memory_usage(self) -> int:
+        """
+        Returns an estimate of the number of bytes the posting list occupies in memory,
+        including the postings themselves. Useful for comparing representations.
+        """
+        pass
+
 
 class InMemoryPostingList(PostingList):
     """
@@ -63,6 +92,35 @@ class InMemoryPostingList(PostingList):
     memory-mapped by the operating system.
     """
 
+    class InMemoryPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that can skip ahead in the list of postings, using binary search.
+        """
+
+        def __init__(self, postings: List[Posting]):
+            self.__postings = postings  # The postings we iterate over.
+            self.__where = 0  # The index of the next posting to return.
+
+        def __next__(self) -> Posting:
+            where = self.__where
+            if where < len(self.__postings):
+                self.__where = where + 1
+                return self.__postings[where]
+            raise StopIteration
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips ahead to the first posting having a document identifier greater than or equal
+            to the given one, and returns it. Returns None if there is no such posting.
+            """
+            postings, where = self.__postings, self.__where
+            if where < len(postings) and postings[where].document_id < document_id:
+                where = _gallop(postings, document_id, where + 1, lambda p: p.document_id)
+            self.__where = where + 1
+            return postings[where] if where < len(postings) else None
+
+    __slots__ = ("__postings",)
+
     def __init__(self):
         self.__postings: List[Posting] = []
 
@@ -70,7 +128,7 @@ class InMemoryPostingList(PostingList):
         return len(self.__postings)
 
     def get_iterator(self) -> Iterator[Posting]:
-        return iter(self.__postings)
+        return __class__.InMemoryPostingListIterator(self.__postings)
 
     def append_posting(self, posting: Posting) -> None:
         assert len(self.__postings) == 0 or self.__postings[-1].document_id < posting.document_id
@@ -79,48 +137,120 @@ class InMemoryPostingList(PostingList):
     def finalize_postings(self) -> None:
         pass
 
+    def get_memory_usage(self) -> int:
+        # The list itself, and each posting object with its attributes. Small integers are cached by
+        # the interpreter and thus shared, but document identifiers typically aren't.
+        size = sys.getsizeof(self) + sys.getsizeof(self.__postings)
+        for posting in self.__postings:
+            size += sys.getsizeof(posting) + sys.getsizeof(posting.document_id)
+            size += sys.getsizeof(posting.__dict__) if hasattr(posting, "__dict__") else 0
+        return size
+
 
 class CompressedInMemoryPostingList(PostingList):
     """
     A simple in-memory implementation of a compressed posting list. Combines simple gap encoding
-    with variable-byte encoding. 
+    with variable-byte encoding.
+
+    When finalized, longer posting lists are split into blocks of about sqrt(n) postings each, and
+    every block except the first one is preceded by a small header that holds the size of the block
+    in bytes and the gap up to the block's last document identifier. That allows iterators to skip
+    ahead past whole blocks without decoding them, at the expense of a few extra bytes per block.
     """
 
     class CompressedInMemoryPostingListIterator(Iterator[Posting]):
         """
         A custom iterator that decodes the compressed integers as we traverse the underlying byte
-        array. The decoding logic needs to mirror the encoding logic that happens when postings are
-        appended to the byte array.
+        array, a block at a time. The decoding logic needs to mirror the encoding logic that happens
+        when postings are appended to the byte array.
+
+        The number of postings in the buffer needs to be supplied, so that we know how many numbers we can
+        decode at a time. If the buffer is split into blocks, the block size needs to be supplied so that we
+        can tell block headers from postings. Otherwise the buffer is decoded a fixed number of postings at a
+        time, so that the first posting doesn't cost time proportional to the length of the list.
         """
 
-        def __init__(self, data: bytearray):
+        # Without block headers, we decode this many postings at a time.
+        __chunk_size = 128
+
+        def __init__(self, data: bytearray, length: int, block_size: int = 0):
             self.__data = data  # The buffer holding all the compressed posting data.
+            self.__remaining = length  # The number of postings we haven't decoded yet.
             self.__where = 0  # Our current position in the buffer.
             self.__document_id = 0  # We encoded the gaps, so accumulate them when decoding.
+            self.__block_size = block_size  # The number of postings per block, if the buffer has block headers.
+            self.__document_ids: Sequence[int] = ()  # The document identifiers in the current block.
+            self.__term_frequencies: Sequence[int] = ()  # The term frequencies in the current block.
+            self.__index = 0  # The index of the next posting to return from the current block.
 
         def __next__(self) -> Posting:
-            if self.__where < len(self.__data):
-                (gap, increment) = VariableByteCodec.decode(self.__data, self.__where)
-                self.__where += increment
-                self.__document_id += gap
-                (term_frequency, increment) = VariableByteCodec.decode(self.__data, self.__where)
-                self.__where += increment
-                return Posting(self.__document_id, term_frequency)
-            else:
+            if self.__index == len(self.__document_ids) and not self.__decode_block(0):
                 raise StopIteration
+            index = self.__index
+            self.__index = index + 1
+            return Posting(self.__document_ids[index], self.__term_frequencies[index])
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips ahead to the first posting having a document identifier greater than or equal
+            to the given one, and returns it. Returns None if there is no such posting. Blocks
+            that end before the given document identifier are skipped without being decoded.
+            """
+            document_ids = self.__document_ids
+            if self.__index == len(document_ids) or document_ids[-1] < document_id:
+                if not self.__decode_block(document_id):
+                    return None
+                document_ids = self.__document_ids
+            if document_ids[self.__index] < document_id:
+                self.__index = bisect_left(document_ids, document_id, self.__index + 1)
+            return next(self)
+
+        def __decode_block(self, document_id: int) -> bool:
+            """
+            Decodes the next block whose last document identifier is greater than or equal to the
+            given one. Returns False if there is no such block.
+            """
+            data = self.__data
+            self.__document_ids, self.__term_frequencies, self.__index = (), (), 0
+            while self.__remaining:
+                count = min(self.__block_size or __class__.__chunk_size, self.__remaining)
+                if self.__where > 0 and self.__block_size:
+                    # All blocks but the first one have a header. Only the last block can be short.
+                    ((size, gap), increment) = VariableByteCodec.decode_many(data, self.__where, 2)
+                    self.__where += increment
+                    if self.__document_id + gap < document_id:
+                        self.__where += size
+                        self.__document_id += gap
+                        self.__remaining -= count
+                        continue
+                (numbers, size) = VariableByteCodec.decode_many(data, self.__where, 2 * count)
+                self.__where += size
+                self.__remaining -= count
+                document_ids = list(accumulate(numbers[0::2], initial=self.__document_id))[1:]
+                self.__document_id = document_ids[-1]
+                if self.__document_id >= document_id:
+                    self.__document_ids, self.__term_frequencies = document_ids, numbers[1::2]
+                    return True
+            return False
+
+    # Posting lists shorter than this are not worth splitting into blocks.
+    __minimum_blocked_length = 64
+
+    __slots__ = ("__logical_length", "__previous_document_id", "__data")
 
     def __init__(self):
         self.__logical_length = 0  # The number of posting entries encoded in the byte array.
         self.__previous_document_id = 0  # So that we can gap encode.
-        self.__data = bytearray()  # All posting entries, compressed.
+        self.__data = bytearray()  # All posting entries, compressed. Frozen into bytes when finalized.
 
     def get_length(self) -> int:
         return self.__logical_length
 
     def get_iterator(self) -> Iterator[Posting]:
-        return __class__.CompressedInMemoryPostingListIterator(self.__data)
+        return __class__.CompressedInMemoryPostingListIterator(self.__data, self.__logical_length, self.__get_block_size())
 
     def append_posting(self, posting: Posting) -> None:
+        assert isinstance(self.__data, bytearray), "Posting list has been finalized."
         assert self.__logical_length == 0 or posting.document_id > self.__previous_document_id
         gap = posting.document_id - self.__previous_document_id
         VariableByteCodec.encode(gap, self.__data)
@@ -129,4 +259,501 @@ class CompressedInMemoryPostingList(PostingList):
         self.__previous_document_id = posting.document_id
 
     def finalize_postings(self) -> None:
-        pass
+        if not isinstance(self.__data, bytearray):
+            return
+        # Insert the block headers, if any. The immutable copy also releases any slack that the
+        # buffer might have accumulated while growing.
+        self.__data = __class__.insert_block_headers(self.__data, self.__logical_length)
+
+    def get_memory_usage(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.__data)
+
+    def __get_block_size(self) -> int:
+        """
+        Returns the number of postings per block, or zero if the buffer doesn't have block headers.
+        """
+        return 0 if isinstance(self.__data, bytearray) else __class__.get_block_size(self.__logical_length)
+
+    @staticmethod
+    def get_block_size(length: int) -> int:
+        """
+        Returns the number of postings per block in a finalized posting list of the given length, or zero
+        if such a list isn't split into blocks.
+        """
+        return isqrt(length) if length >= __class__.__minimum_blocked_length else 0
+
+    @staticmethod
+    def insert_block_headers(data: bytes, length: int) -> bytes:
+        """
+        Given a buffer with the given number of postings encoded as gaps and term frequencies, returns the
+        same postings split into blocks as done when finalizing. Decodes one block at a time, so that long
+        posting lists don't have to be decoded in full.
+        """
+        block_size = __class__.get_block_size(length)
+        if not block_size:
+            return bytes(data)
+        blocked, where, previous_document_id = bytearray(), 0, 0
+        for i in range(0, length, block_size):
+            (block, size) = VariableByteCodec.decode_many(data, where, 2 * min(block_size, length - i))
+            last_document_id = previous_document_id + sum(block[0::2])
+            if i:
+                VariableByteCodec.encode_many((size, last_document_id - previous_document_id), blocked)
+            blocked.extend(memoryview(data)[where:where + size])
+            where += size
+            previous_document_id = last_document_id
+        return bytes(blocked)
+
+
+class ArrayPostingList(PostingList):
+    """
+    An in-memory implementation of a posting list that keeps the document identifiers and the
+    term frequencies in two parallel arrays of unsigned integers. I.e., we don't keep an object
+    around per posting, and the memory used per posting is just that of two machine integers.
+    Posting objects are created on the fly, as we iterate.
+
+    Clients that can process postings in bulk, e.g., using NumPy, can get zero-copy access to
+    the underlying arrays.
+    """
+
+    class ArrayPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that creates postings on the fly, and that can skip ahead in the
+        array of document identifiers using binary search.
+        """
+
+        def __init__(self, document_ids: array, term_frequencies: array):
+            self.__document_ids = document_ids
+            self.__term_frequencies = term_frequencies
+            self.__where = 0  # The index of the next posting to return.
+
+        def __next__(self) -> Posting:
+            where = self.__where
+            if where < len(self.__document_ids):
+                self.__where = where + 1
+                return Posting(self.__document_ids[where], self.__term_frequencies[where])
+            raise StopIteration
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips ahead to the first posting having a document identifier greater than or equal
+            to the given one, and returns it. Returns None if there is no such posting.
+            """
+            document_ids, where = self.__document_ids, self.__where
+            if where < len(document_ids) and document_ids[where] < document_id:
+                where = _gallop(document_ids, document_id, where + 1)
+            self.__where = where + 1
+            return Posting(self.__document_ids[where], self.__term_frequencies[where]) if where < len(self.__document_ids) else None
+
+    __slots__ = ("__document_ids", "__term_frequencies")
+
+    def __init__(self):
+        self.__document_ids = array("I")
+        self.__term_frequencies = array("I")
+
+    def get_length(self) -> int:
+        return len(self.__document_ids)
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return __class__.ArrayPostingListIterator(self.__document_ids, self.__term_frequencies)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert len(self.__document_ids) == 0 or self.__document_ids[-1] < posting.document_id
+        self.__document_ids.append(posting.document_id)
+        self.__term_frequencies.append(posting.term_frequency)
+
+    def finalize_postings(self) -> None:
+        # Release any slack that the arrays might have accumulated while growing.
+        self.__document_ids = array("I", self.__document_ids)
+        self.__term_frequencies = array("I", self.__term_frequencies)
+
+    def get_memory_usage(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.__document_ids) + sys.getsizeof(self.__term_frequencies)
+
+    def get_document_ids(self) -> memoryview:
+        """
+        Returns a read-only view of the document identifiers, in posting list order. No postings
+        can be appended while there are views outstanding.
+        """
+        return memoryview(self.__document_ids).toreadonly()
+
+    def get_term_frequencies(self) -> memoryview:
+        """
+        Returns a read-only view of the term frequencies, in posting list order. No postings
+        can be appended while there are views outstanding.
+        """
+        return memoryview(self.__term_frequencies).toreadonly()
+
+
+class BitmapPostingList(PostingList):
+    """
+    An in-memory implementation of a posting list that keeps the document identifiers in a compressed
+    bitmap, and the term frequencies in a side array in document identifier order. Suitable for terms
+    that occur in a large fraction of the documents, where a bitmap is more compact than a list of
+    document identifiers and where posting lists can be merged using bitwise operations.
+
+    Iterators over bitmap posting lists expose the bitmap to the PostingsMerger, as long as iteration
+    hasn't started, so that merging two such posting lists can happen bitwise.
+    """
+
+    class LazyPosting(Posting):
+        """
+        A posting whose term frequency is looked up when it's read, via the supplied function. Merging
+        bitmaps can produce lots of postings whose term frequencies are never read, e.g., when evaluating
+        Boolean queries, and looking them up would cost more than the bitwise merging itself.
+        """
+
+        __slots__ = ("__term_frequency",)
+
+        def __init__(self, document_id: int, term_frequency: Callable[[int], int]):  # pylint: disable=super-init-not-called
+            self.document_id = document_id
+            self.__term_frequency = term_frequency
+
+        @property
+        def term_frequency(self) -> int:
+            """
+            Returns the term frequency, as looked up by the supplied function.
+            """
+            return self.__term_frequency(self.document_id)
+
+    class BitmapPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that creates postings on the fly from a bitmap of document identifiers. The
+        term frequencies are either supplied in document identifier order, or as a function that looks
+        up the term frequency of a given document identifier. In the latter case, as for the results of
+        merging bitmaps, we create LazyPosting objects.
+        """
+
+        def __init__(self, bitmap: RoaringBitmap, term_frequencies: Union[Sequence[int], Callable[[int], int]]):
+            self.__bitmap = bitmap
+            self.__term_frequencies = term_frequencies
+            self.__postings = self.__create_postings(0)  # The postings we have yet to return.
+            self.__next_document_id = 0  # We never go backwards.
+
+        def __next__(self) -> Posting:
+            posting = next(self.__postings)
+            self.__next_document_id = posting.document_id + 1
+            return posting
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips ahead to the first posting having a document identifier greater than or equal
+            to the given one, and returns it. Returns None if there is no such posting.
+            """
+            if document_id > self.__next_document_id:
+                self.__postings = self.__create_postings(document_id)
+                self.__next_document_id = document_id
+            return next(self, None)
+
+        def __create_postings(self, start: int) -> Iterator[Posting]:
+            """
+            Returns an iterator that creates the postings from the given document identifier and onwards.
+            Mapping over the document identifiers keeps the per-posting overhead as low as we can get it.
+            """
+            values, term_frequencies = self.__bitmap.iterate(start), self.__term_frequencies
+            if callable(term_frequencies):
+                return map(BitmapPostingList.LazyPosting, values, repeat(term_frequencies))
+            return map(Posting, values, islice(term_frequencies, self.__bitmap.rank(start) if start else 0, None))
+
+        def get_bitmap(self) -> Optional[RoaringBitmap]:
+            """
+            Returns the bitmap of document identifiers we iterate over, or None if iteration has
+            already started and the bitmap thus no longer reflects the remaining postings.
+            """
+            return None if self.__next_document_id else self.__bitmap
+
+        def get_term_frequencies(self) -> Callable[[int], Optional[int]]:
+            """
+            Returns a function that looks up the term frequency of a given document, or returns None
+            if the document is not in the bitmap. Independent of our own iteration state.
+            """
+            term_frequencies, rank = self.__term_frequencies, self.__bitmap.get_ranker()
+            lazy = callable(term_frequencies)
+
+            def lookup(document_id: int) -> Optional[int]:
+                position = rank(document_id)
+                if position < 0:
+                    return None
+                return term_frequencies(document_id) if lazy else term_frequencies[position]
+
+            return lookup
+
+    __slots__ = ("__document_ids", "__term_frequencies")
+
+    def __init__(self):
+        self.__document_ids = RoaringBitmap()
+        self.__term_frequencies = array("I")
+
+    def get_length(self) -> int:
+        return len(self.__document_ids)
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return __class__.BitmapPostingListIterator(self.__document_ids, self.__term_frequencies)
+
+    def append_posting(self, posting: Posting) -> None:
+        self.__document_ids.append(posting.document_id)
+        self.__term_frequencies.append(posting.term_frequency)
+
+    def finalize_postings(self) -> None:
+        self.__document_ids.optimize()
+        self.__term_frequencies = array("I", self.__term_frequencies)
+
+    def get_memory_usage(self) -> int:
+        return sys.getsizeof(self) + self.__document_ids.get_memory_usage() + sys.getsizeof(self.__term_frequencies)
+
+
+class PForDeltaPostingList(PostingList):
+    """
+    An in-memory implementation of a compressed posting list that encodes its postings in blocks
+    of 128 postings using the PForDeltaCodec. The gaps between the document identifiers and the
+    term frequencies are stored in separate blocks, and each pair of blocks is preceded by a header
+    that holds the block's last document identifier and the size of the block in bytes. Iterators
+    thus decode a whole block at a time, and can skip ahead past whole blocks without decoding them.
+
+    The postings that don't fill up a whole block are variable-byte encoded at the end of the
+    buffer when the posting list is finalized, as for CompressedInMemoryPostingList. Short posting
+    lists, i.e., most of them, therefore pay no overhead for blocks.
+    """
+
+    class PForDeltaPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that decodes one block of postings at a time. The decoding logic needs
+        to mirror the encoding logic that happens when the posting list is built.
+        """
+
+        def __init__(self, data: bytes, blocks: int, pending: Sequence[Posting]):
+            self.__data = data  # The buffer holding all the compressed posting data.
+            self.__where = 0  # Our current position in the buffer.
+            self.__blocks = blocks  # The number of full blocks we have yet to decode.
+            self.__pending = pending  # Postings that have been appended but not yet encoded.
+            self.__previous_document_id = 0  # The last document identifier in the previous block.
+            self.__document_ids: Sequence[int] = ()  # The document identifiers in the current block.
+            self.__term_frequencies: Sequence[int] = ()  # The term frequencies in the current block.
+            self.__index = 0  # The index of the next posting to return from the current block.
+
+        def __next__(self) -> Posting:
+            if self.__index == len(self.__document_ids) and not self.__load_block(0):
+                raise StopIteration
+            index = self.__index
+            self.__index = index + 1
+            return Posting(self.__document_ids[index], self.__term_frequencies[index])
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips ahead to the first posting having a document identifier greater than or equal
+            to the given one, and returns it. Returns None if there is no such posting. Blocks
+            that end before the given document identifier are skipped without being decoded.
+            """
+            document_ids = self.__document_ids
+            if self.__index == len(document_ids) or document_ids[-1] < document_id:
+                if not self.__load_block(document_id):
+                    return None
+                document_ids = self.__document_ids
+            if document_ids[self.__index] < document_id:
+                self.__index = bisect_left(document_ids, document_id, self.__index + 1)
+            return next(self)
+
+        def __load_block(self, document_id: int) -> bool:
+            """
+            Decodes the next block whose last document identifier is greater than or equal to the
+            given one. Returns False if there is no such block.
+            """
+            data, header = self.__data, _block_header
+            self.__document_ids, self.__term_frequencies, self.__index = (), (), 0
+            while self.__blocks:
+                (last_document_id, size) = header.unpack_from(data, self.__where)
+                self.__where += header.size
+                self.__blocks -= 1
+                if last_document_id < document_id:
+                    self.__where += size
+                    self.__previous_document_id = last_document_id
+                    continue
+                (gaps, increment) = PForDeltaCodec.decode(data, self.__where)
+                (term_frequencies, _) = PForDeltaCodec.decode(data, self.__where + increment)
+                self.__where += size
+                self.__document_ids = list(accumulate(gaps, initial=self.__previous_document_id))[1:]
+                self.__term_frequencies = term_frequencies
+                self.__previous_document_id = last_document_id
+                return True
+            if self.__where < len(data) or self.__pending:
+                (document_ids, term_frequencies) = self.__decode_tail()
+                self.__where = len(data)
+                self.__pending = ()
+                if document_ids[-1] >= document_id:
+                    self.__document_ids, self.__term_frequencies = document_ids, term_frequencies
+                    return True
+            return False
+
+        def __decode_tail(self):
+            """
+            Decodes the variable-byte encoded postings at the end of the buffer, and appends
+            any pending postings.
+            """
+            with memoryview(self.__data) as data:
+                (numbers, _) = VariableByteCodec.decode_many(data[self.__where:], 0)  # The tail needs to start at offset zero.
+            document_ids = list(accumulate(numbers[0::2], initial=self.__previous_document_id))[1:]
+            term_frequencies = numbers[1::2]
+            document_ids.extend(posting.document_id for posting in self.__pending)
+            term_frequencies.extend(posting.term_frequency for posting in self.__pending)
+            return (document_ids, term_frequencies)
+
+    # The number of postings per block.
+    __block_length = 128
+
+    __slots__ = ("__length", "__previous_document_id", "__data", "__pending")
+
+    def __init__(self):
+        self.__length = 0  # The number of postings appended so far.
+        self.__previous_document_id = 0  # The last document identifier in the last full block, so that we can gap encode.
+        self.__data = bytearray()  # All encoded blocks, followed by the encoded tail. Frozen into bytes when finalized.
+        self.__pending: List[Posting] = []  # Postings that have not yet been encoded into a block.
+
+    def get_length(self) -> int:
+        return self.__length
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return __class__.PForDeltaPostingListIterator(self.__data, self.__length // __class__.__block_length, self.__pending)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert isinstance(self.__data, bytearray), "Posting list has been finalized."
+        assert self.__length == 0 or posting.document_id > (self.__pending[-1].document_id if self.__pending else self.__previous_document_id)
+        self.__pending.append(posting)
+        self.__length += 1
+        if len(self.__pending) == __class__.__block_length:
+            self.__encode_block()
+
+    def finalize_postings(self) -> None:
+        if not isinstance(self.__data, bytearray):
+            return
+        numbers, previous_document_id = [], self.__previous_document_id
+        for posting in self.__pending:
+            numbers += (posting.document_id - previous_document_id, posting.term_frequency)
+            previous_document_id = posting.document_id
+        VariableByteCodec.encode_many(numbers, self.__data)
+        self.__data = bytes(self.__data)
+        self.__pending = ()
+
+    def get_memory_usage(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.__data) + (sys.getsizeof(self.__pending) if self.__pending else 0)
+
+    def __encode_block(self) -> None:
+        """
+        Encodes the pending postings as a full block, and appends it to the buffer.
+        """
+        block = bytearray()
+        document_ids = [posting.document_id for posting in self.__pending]
+        PForDeltaCodec.encode([b - a for a, b in zip([self.__previous_document_id] + document_ids, document_ids)], block)
+        PForDeltaCodec.encode([posting.term_frequency for posting in self.__pending], block)
+        self.__data.extend(_block_header.pack(document_ids[-1], len(block)))
+        self.__data.extend(block)
+        self.__previous_document_id = document_ids[-1]
+        self.__pending.clear()
+
+
+class EliasGammaPostingList(PostingList):
+    """
+    An in-memory implementation of a compressed posting list that encodes the gaps between the
+    document identifiers and the term frequencies using Elias gamma codes, in a single bit stream.
+    Very compact for small gaps and term frequencies, but slower to decode than byte-aligned codes.
+
+    Gamma codes can't represent zero, so term frequencies must be positive. The first document
+    identifier is encoded relative to -1, so that document 0 can be represented.
+    """
+
+    class EliasGammaPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that decodes the bit stream in chunks of postings, as we go. The decoding
+        logic needs to mirror the encoding logic that happens when postings are appended.
+        """
+
+        # The number of postings we decode at a time.
+        __chunk_size = 128
+
+        def __init__(self, data: bytes, length: int):
+            self.__reader = BitReader(data)  # The bit stream holding all the compressed posting data.
+            self.__remaining = length  # The number of postings we have yet to decode.
+            self.__document_id = -1  # We encoded the gaps, so accumulate them when decoding.
+            self.__document_ids: Sequence[int] = ()  # The document identifiers in the current chunk.
+            self.__term_frequencies: Sequence[int] = ()  # The term frequencies in the current chunk.
+            self.__index = 0  # The index of the next posting to return from the current chunk.
+
+        def __next__(self) -> Posting:
+            if self.__index == len(self.__document_ids) and not self.__decode_chunk():
+                raise StopIteration
+            index = self.__index
+            self.__index = index + 1
+            return Posting(self.__document_ids[index], self.__term_frequencies[index])
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips ahead to the first posting having a document identifier greater than or equal
+            to the given one, and returns it. Returns None if there is no such posting. There are
+            no skip pointers, so every chunk along the way gets decoded.
+            """
+            while self.__index == len(self.__document_ids) or self.__document_ids[-1] < document_id:
+                if not self.__decode_chunk():
+                    return None
+            if self.__document_ids[self.__index] < document_id:
+                self.__index = bisect_left(self.__document_ids, document_id, self.__index + 1)
+            return next(self)
+
+        def __decode_chunk(self) -> bool:
+            """
+            Decodes the next chunk of postings. Returns False if there are no more postings.
+            """
+            count = min(self.__remaining, __class__.__chunk_size)
+            numbers = EliasGammaCodec.read_many(self.__reader, 2 * count)
+            self.__document_ids = list(accumulate(numbers[0::2], initial=self.__document_id))[1:]
+            self.__term_frequencies = numbers[1::2]
+            self.__index = 0
+            self.__remaining -= count
+            if count:
+                self.__document_id = self.__document_ids[-1]
+            return count > 0
+
+    __slots__ = ("__length", "__previous_document_id", "__writer", "__data")
+
+    def __init__(self):
+        self.__length = 0  # The number of postings encoded in the bit stream.
+        self.__previous_document_id = -1  # So that we can gap encode.
+        self.__writer = BitWriter()  # Where we append postings. Goes away when finalized.
+        self.__data = b""  # All posting entries, compressed. Set when finalized.
+
+    def get_length(self) -> int:
+        return self.__length
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return __class__.EliasGammaPostingListIterator(self.__writer.get_bytes() if self.__writer else self.__data, self.__length)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert self.__writer is not None, "Posting list has been finalized."
+        assert posting.document_id > self.__previous_document_id
+        assert posting.term_frequency > 0
+        EliasGammaCodec.write(posting.document_id - self.__previous_document_id, self.__writer)
+        EliasGammaCodec.write(posting.term_frequency, self.__writer)
+        self.__length += 1
+        self.__previous_document_id = posting.document_id
+
+    def finalize_postings(self) -> None:
+        if self.__writer is None:
+            return
+        self.__writer.flush()
+        self.__data = bytes(self.__writer.get_buffer())
+        self.__writer = None
+
+    def get_memory_usage(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.__writer.get_buffer() if self.__writer else self.__data)
+
+
+def _gallop(sequence: Sequence, value: int, start: int, key: Optional[Callable] = None) -> int:
+    """
+    Returns the index of the first item at or after the given start position that is greater than or
+    equal to the given value, or the length of the sequence if there is no such item. The sequence
+    must be sorted. Probes exponentially larger steps ahead before doing a binary search, so that the
+    cost is logarithmic in the distance we skip rather than in the length of the sequence.
+    """
+    low, high, step, length = start, start, 1, len(sequence)
+    while high < length and (key(sequence[high]) if key else sequence[high]) < value:
+        low = high + 1
+        high += step
+        step *= 2
+    return bisect_left(sequence, value, low, min(high, length), key=key)
@@ -1,7 +1,12 @@
 # pylint: disable=missing-module-docstring
 
-from typing import Iterator
+import heapq
+from functools import reduce
+from operator import and_, attrgetter, or_
+from typing import Callable, Iterable, Iterator, List, Optional
 from .posting import Posting
+from .postinglist import BitmapPostingList
+from .roaringbitmap import RoaringBitmap
 
 
 class PostingsMerger:
@@ -17,12 +22,100 @@ class PostingsMerger:
     Note that the result of merging posting lists is itself a posting list.
     Hence the merging methods can be combined to compute the result of more
     complex Boolean operations over posting lists.
+
+    If a posting list iterator offers an advance_to(document_id) method, e.g.,
+    backed by skip pointers or binary search, then we use it to skip past
+    postings that cannot possibly be part of the result.
+
+    If posting lists are backed by bitmaps, see BitmapPostingList, then we
+    merge them using bitwise operations and the result is again backed by a
+    bitmap. The term frequencies of the resulting postings are then only looked
+    up if they are read. If only one of them is, we use it for fast membership
+    testing.
     """
 
+    class _FilterIterator(Iterator[Posting]):
+        """
+        Yields the postings from the given iterator whose documents are in the given bitmap, or not in
+        it if so specified. If a function for looking up term frequencies is given, the postings we yield
+        look up their term frequencies using it instead. Skips ahead via the given iterator, if it can.
+        """
+
+        def __init__(self, iterator: Iterator[Posting], bitmap: RoaringBitmap, members: bool, term_frequency: Optional[Callable[[int], int]] = None):
+            self.__iterator = iterator
+            self.__advance = PostingsMerger._advancer(iterator)
+            self.__rank = bitmap.get_ranker()
+            self.__members = members  # Do we keep the documents that are in the bitmap, or the ones that aren't?
+            self.__term_frequency = term_frequency
+
+        def __next__(self) -> Posting:
+            rank, members = self.__rank, self.__members
+            for posting in self.__iterator:
+                if (rank(posting.document_id) >= 0) == members:
+                    return posting if self.__term_frequency is None else BitmapPostingList.LazyPosting(posting.document_id, self.__term_frequency)
+            raise StopIteration
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips ahead to the first posting having a document identifier greater than or equal
+            to the given one that we'd yield, and returns it. Returns None if there is no such posting.
+            """
+            posting = self.__advance(document_id)
+            if posting is None:
+                return None
+            if (self.__rank(posting.document_id) >= 0) == self.__members:
+                return posting if self.__term_frequency is None else BitmapPostingList.LazyPosting(posting.document_id, self.__term_frequency)
+            return next(self, None)
+
+    @staticmethod
+    def _advancer(iterator: Iterator[Posting]) -> Callable[[int], Optional[Posting]]:
+        """
+        Returns a function that advances the given iterator to the first posting
+        having a document identifier greater than or equal to the given one, and
+        returns it. Or None, if there is no such posting. Falls back to stepping
+        through the postings one at a time, if the iterator can't skip ahead.
+        """
+        advance_to = getattr(iterator, "advance_to", None)
+        if advance_to:
+            return advance_to
+
+        def advance(document_id: int) -> Optional[Posting]:
+            for posting in iterator:
+                if posting.document_id >= document_id:
+                    return posting
+            return None
+
+        return advance
+
+    @staticmethod
+    def _bitmap(iterator: Iterator[Posting]) -> Optional[RoaringBitmap]:
+        """
+        Returns the bitmap backing the given iterator, if any. See BitmapPostingList.
+        """
+        get_bitmap = getattr(iterator, "get_bitmap", None)
+        return get_bitmap() if get_bitmap else None
+
+    @staticmethod
+    def _first_term_frequency(iterators: List[BitmapPostingList.BitmapPostingListIterator]) -> Callable[[int], int]:
+        """
+        Returns a function that looks up the term frequency of a document in the union of the
+        given bitmap iterators, taking it from the first iterator that contains the document.
+        """
+        lookups = [iterator.get_term_frequencies() for iterator in iterators]
+
+        def term_frequency(document_id: int) -> int:
+            for lookup in lookups:
+                found = lookup(document_id)
+                if found is not None:
+                    return found
+            raise AssertionError("Document not in any bitmap.")
+
+        return term_frequency
+
     @staticmethod
     def intersection(iter1: Iterator[Posting], iter2: Iterator[Posting]) -> Iterator[Posting]:
         """
-        A generator that yields a simple AND(A, B) of two posting
+        Returns an iterator that yields a simple AND(A, B) of two posting
         lists A and B, given iterators over these.
 
         In set notation, this corresponds to computing the intersection
@@ -34,9 +127,25 @@ class PostingsMerger:
         The posting lists are assumed sorted in increasing order according
         to the document identifiers.
         """
+        iter1, iter2 = iter(iter1), iter(iter2)
+        bitmap1, bitmap2 = __class__._bitmap(iter1), __class__._bitmap(iter2)
+        if bitmap1 is not None and bitmap2 is not None:
+            return BitmapPostingList.BitmapPostingListIterator(bitmap1 & bitmap2, iter1.get_term_frequencies())
+        if bitmap2 is not None:
+            return __class__._FilterIterator(iter1, bitmap2, True)
+        if bitmap1 is not None:
+            return __class__._FilterIterator(iter2, bitmap1, True, iter1.get_term_frequencies())
+        return __class__._intersection(iter1, iter2)
+
+    @staticmethod
+    def _intersection(iter1: Iterator[Posting], iter2: Iterator[Posting]) -> Iterator[Posting]:
+        """
+        Merges the postings one by one, see intersection().
+        """
         
         # ensure they're iterators
         iter1, iter2 = iter(iter1), iter(iter2)
+        advance1, advance2 = __class__._advancer(iter1), __class__._advancer(iter2)
         
         a, b = next(iter1, None), next(iter2, None)
         
@@ -45,14 +154,79 @@ class PostingsMerger:
                 yield a
                 a, b = next(iter1, None), next(iter2, None)
             elif a.document_id < b.document_id:
-                a = next(iter1, None)
+                a = advance1(b.document_id)
             else:
-                b = next(iter2, None)
+                b = advance2(a.document_id)
     
+    @staticmethod
+    def intersection_many(iterators: Iterable[Iterator[Posting]]) -> Iterator[Posting]:
+        """
+        Returns an iterator that yields a simple AND(A, B, C, ...) of any number of
+        posting lists, given iterators over these. Equivalent to, but cheaper
+        than, a chain of pairwise intersections: There are no intermediate
+        generators that every posting has to flow through.
+
+        The first posting list drives the evaluation, so the posting lists
+        should preferably be ordered by increasing length. For each candidate
+        document, we advance the other posting lists to it. If one of them
+        overshoots, the first posting list is advanced to where that one
+        landed, and that document becomes the next candidate. I.e., we gallop
+        through all the posting lists as far as the iterators allow us to
+        skip ahead. A chain of pairwise intersections can't do that, since the
+        intermediate results can't skip: When the posting lists are clustered,
+        e.g., when the last one only covers a range of the documents, the
+        chain steps through every document that the first ones have in common.
+
+        The postings yielded are the ones from the first posting list.
+        """
+        iterators = [iter(iterator) for iterator in iterators]
+        bitmaps = [(i, bitmap) for i, bitmap in enumerate(map(__class__._bitmap, iterators)) if bitmap is not None]
+        if len(bitmaps) > 1:
+            first = iterators[bitmaps[0][0]]
+            combined = BitmapPostingList.BitmapPostingListIterator(reduce(and_, (bitmap for _, bitmap in bitmaps)), first.get_term_frequencies())
+            positions = set(i for i, _ in bitmaps[1:])
+            iterators = [combined if iterator is first else iterator for i, iterator in enumerate(iterators) if i not in positions]
+            if len(iterators) == 1:
+                return combined
+        return __class__._intersection_many(iterators)
+
+    @staticmethod
+    def _intersection_many(iterators: Iterable[Iterator[Posting]]) -> Iterator[Posting]:
+        """
+        Merges the postings one by one, see intersection_many().
+        """
+        iterators = [iter(iterator) for iterator in iterators]
+        if not iterators:
+            return
+        first, advance_first = iterators[0], __class__._advancer(iterators[0])
+        others = [(iterator, __class__._advancer(iterator)) for iterator in iterators[1:]]
+        heads = [-1] * len(others)  # The document identifier each of the other iterators currently rests on.
+        previous = -1  # The document identifier we last yielded.
+        candidate = next(first, None)
+        while candidate:
+            target = candidate.document_id
+            for i, (iterator, advance) in enumerate(others):
+                head = heads[i]
+                if head < target:
+                    # Right after a match, the next posting is often the one we want, and stepping is cheaper than skipping.
+                    posting = next(iterator, None) if head == previous else advance(target)
+                    if posting and posting.document_id < target:
+                        posting = advance(target)
+                    if not posting:
+                        return
+                    head = heads[i] = posting.document_id
+                if head > target:
+                    candidate = advance_first(head)
+                    break
+            else:
+                yield candidate
+                previous = target
+                candidate = next(first, None)
+
     @staticmethod
     def union(iter1: Iterator[Posting], iter2: Iterator[Posting]) -> Iterator[Posting]:
         """
-        A generator that yields a simple OR(A, B) of two posting
+        Returns an iterator that yields a simple OR(A, B) of two posting
         lists A and B, given iterators over these.
 
         In set notation, this corresponds to computing the union
@@ -64,6 +238,17 @@ class PostingsMerger:
         The posting lists are assumed sorted in increasing order according
         to the document identifiers.
         """
+        iter1, iter2 = iter(iter1), iter(iter2)
+        bitmap1, bitmap2 = __class__._bitmap(iter1), __class__._bitmap(iter2)
+        if bitmap1 is not None and bitmap2 is not None:
+            return BitmapPostingList.BitmapPostingListIterator(bitmap1 | bitmap2, __class__._first_term_frequency([iter1, iter2]))
+        return __class__._union(iter1, iter2)
+
+    @staticmethod
+    def _union(iter1: Iterator[Posting], iter2: Iterator[Posting]) -> Iterator[Posting]:
+        """
+        Merges the postings one by one, see union().
+        """
         
         # ensure they're iterators
         iter1, iter2 = iter(iter1), iter(iter2)
@@ -81,10 +266,39 @@ class PostingsMerger:
                 yield a
                 a, b = next(iter1, None), next(iter2, None)
     
+    @staticmethod
+    def union_many(iterators: Iterable[Iterator[Posting]]) -> Iterator[Posting]:
+        """
+        Returns an iterator that yields a simple OR(A, B, C, ...) of any number of
+        posting lists, given iterators over these. Uses a k-way merge via a
+        heap, so merging k posting lists with n postings in total costs
+        O(n log k) instead of the O(n k) of a chain of pairwise unions.
+
+        If several posting lists contain the same document, the posting from
+        the first of these posting lists is the one that is yielded. That is
+        the same policy as a chain of pairwise unions ends up with.
+        """
+        iterators = [iter(iterator) for iterator in iterators]
+        bitmaps = [__class__._bitmap(iterator) for iterator in iterators]
+        if len(iterators) > 1 and all(bitmap is not None for bitmap in bitmaps):
+            return BitmapPostingList.BitmapPostingListIterator(reduce(or_, bitmaps), __class__._first_term_frequency(iterators))
+        return __class__._union_many(iterators)
+
+    @staticmethod
+    def _union_many(iterators: Iterable[Iterator[Posting]]) -> Iterator[Posting]:
+        """
+        Merges the postings one by one, see union_many().
+        """
+        previous = None
+        for posting in heapq.merge(*iterators, key=attrgetter("document_id")):
+            if posting.document_id != previous:
+                yield posting
+                previous = posting.document_id
+
     @staticmethod
     def difference(iter1: Iterator[Posting], iter2: Iterator[Posting]) -> Iterator[Posting]:
         """
-        A generator that yields a simple ANDNOT(A, B) of two posting
+        Returns an iterator that yields a simple ANDNOT(A, B) of two posting
         lists A and B, given iterators over these.
 
         In set notation, this corresponds to computing the difference
@@ -96,9 +310,23 @@ class PostingsMerger:
         The posting lists are assumed sorted in increasing order according
         to the document identifiers.
         """
+        iter1, iter2 = iter(iter1), iter(iter2)
+        bitmap1, bitmap2 = __class__._bitmap(iter1), __class__._bitmap(iter2)
+        if bitmap1 is not None and bitmap2 is not None:
+            return BitmapPostingList.BitmapPostingListIterator(bitmap1 - bitmap2, iter1.get_term_frequencies())
+        if bitmap2 is not None:
+            return __class__._FilterIterator(iter1, bitmap2, False)
+        return __class__._difference(iter1, iter2)
+
+    @staticmethod
+    def _difference(iter1: Iterator[Posting], iter2: Iterator[Posting]) -> Iterator[Posting]:
+        """
+        Merges the postings one by one, see difference().
+        """
         
         # ensure they're iterators
         iter1, iter2 = iter(iter1), iter(iter2)
+        advance2 = __class__._advancer(iter2)
         
         a, b = next(iter1, None), next(iter2, None)
         
@@ -107,6 +335,6 @@ class PostingsMerger:
                 yield a
                 a = next(iter1, None)
             elif a.document_id > b.document_id:
-                b = next(iter2, None)
+                b = advance2(a.document_id)
             else:
                 a, b = next(iter1, None), next(iter2, None)
\ No newline at end of file
@@ -0,0 +1,269 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+
+class RoaringBitmap:
+    """
+    A simple implementation of a compressed bitmap over unsigned 32-bit integers, in the spirit of
+    Roaring bitmaps. See https://roaringbitmap.org/ and https://arxiv.org/abs/1603.06549 for details.
+
+    The values are partitioned into chunks of 2^16 values according to their high 16 bits. Each
+    non-empty chunk is represented by a container that holds the low 16 bits of the values in the
+    chunk. Sparse containers are sorted arrays of 16-bit integers. Dense containers are bitmaps with
+    2^16 bits, for which we use Python integers so that bitwise operations happen natively. Containers
+    switch representation when their cardinality crosses 4096, where the two take up the same space.
+
+    Values must be appended in increasing order. Bitmaps can be combined using the &, | and - operators.
+    """
+
+    # Containers with more values than this are represented as bitmaps instead of as arrays.
+    __array_limit = 4096
+
+    # For each possible byte value, the positions of the bits that are set.
+    __bits = [tuple(i for i in range(8) if byte & (1 << i)) for byte in range(256)]
+
+    __slots__ = ("__keys", "__containers", "__cardinalities")
+
+    def __init__(self, values: Iterable[int] = ()):
+        self.__keys: List[int] = []  # The high 16 bits of the values in each container, sorted.
+        self.__containers: List[Union[array, int]] = []  # The low 16 bits of the values, as an array or as a bitmap.
+        self.__cardinalities: List[int] = []  # The number of values in each container.
+        for value in values:
+            self.append(value)
+        self.optimize()
+
+    def __len__(self):
+        return sum(self.__cardinalities)
+
+    def __iter__(self):
+        return self.iterate()
+
+    def __contains__(self, value: int) -> bool:
+        i = bisect_left(self.__keys, value >> 16)
+        if i == len(self.__keys) or self.__keys[i] != value >> 16:
+            return False
+        container, low = self.__containers[i], value & 0xFFFF
+        if isinstance(container, int):
+            return (container >> low) & 1 == 1
+        j = bisect_left(container, low)
+        return j < len(container) and container[j] == low
+
+    def __and__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = __class__()
+        i, j = 0, 0
+        while i < len(self.__keys) and j < len(other.__keys):
+            if self.__keys[i] < other.__keys[j]:
+                i += 1
+            elif self.__keys[i] > other.__keys[j]:
+                j += 1
+            else:
+                result.__add_container(self.__keys[i], __class__.__and_containers(self.__containers[i], other.__containers[j]))
+                i, j = i + 1, j + 1
+        return result
+
+    def __or__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = __class__()
+        i, j = 0, 0
+        while i < len(self.__keys) or j < len(other.__keys):
+            if j == len(other.__keys) or (i < len(self.__keys) and self.__keys[i] < other.__keys[j]):
+                result.__add_container(self.__keys[i], __class__.__copy(self.__containers[i]))
+                i += 1
+            elif i == len(self.__keys) or self.__keys[i] > other.__keys[j]:
+                result.__add_container(other.__keys[j], __class__.__copy(other.__containers[j]))
+                j += 1
+            else:
+                result.__add_container(self.__keys[i], __class__.__or_containers(self.__containers[i], other.__containers[j]))
+                i, j = i + 1, j + 1
+        return result
+
+    def __sub__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = __class__()
+        j = 0
+        for i, key in enumerate(self.__keys):
+            j = bisect_left(other.__keys, key, j)
+            if j < len(other.__keys) and other.__keys[j] == key:
+                result.__add_container(key, __class__.__subtract_containers(self.__containers[i], other.__containers[j]))
+            else:
+                result.__add_container(key, __class__.__copy(self.__containers[i]))
+        return result
+
+    def append(self, value: int) -> None:
+        """
+        Adds the given value to the bitmap. The value must be greater than all values already
+        in the bitmap. Call optimize() when done appending values.
+        """
+        assert 0 <= value < (1 << 32)
+        key, low = value >> 16, value & 0xFFFF
+        if not self.__keys or self.__keys[-1] != key:
+            assert not self.__keys or self.__keys[-1] < key, "Values must be appended in increasing order."
+            self.optimize()
+            self.__keys.append(key)
+            self.__containers.append(array("H"))
+            self.__cardinalities.append(0)
+        container = self.__containers[-1]
+        if isinstance(container, int):
+            assert container.bit_length() <= low, "Values must be appended in increasing order."
+            self.__containers[-1] = container | (1 << low)
+        else:
+            assert len(container) == 0 or container[-1] < low, "Values must be appended in increasing order."
+            container.append(low)
+        self.__cardinalities[-1] += 1
+
+    def optimize(self) -> None:
+        """
+        Makes sure that the last container has the right representation. Containers being appended
+        to are kept as arrays until we move on to the next container.
+        """
+        if self.__containers:
+            self.__containers[-1] = __class__.__normalize(self.__containers[-1])
+
+    def get_ranker(self) -> Callable[[int], int]:
+        """
+        Returns a function that returns the rank of a given value if the value is in the bitmap, and -1
+        otherwise. Unlike rank() and the in operator, which shift or mask a whole dense container for every
+        value, the function converts each dense container to 64-bit words with cumulative bit counts the
+        first time it's needed. Looking up many values is then cheap, in any order. The bitmap must not be
+        appended to while the function is in use.
+        """
+        keys, containers = self.__keys, self.__containers
+        offsets = list(accumulate(self.__cardinalities, initial=0))  # The rank of the first value in each container.
+        dense: Dict[int, Tuple[array, List[int]]] = {}  # The dense containers we have converted so far, by position.
+
+        def rank(value: int) -> int:
+            i = bisect_left(keys, value >> 16)
+            if i == len(keys) or keys[i] != value >> 16:
+                return -1
+            container, low = containers[i], value & 0xFFFF
+            if isinstance(container, int):
+                converted = dense.get(i)
+                if converted is None:
+                    words = array("Q", container.to_bytes(8192, sys.byteorder))
+                    converted = dense[i] = (words, list(accumulate((word.bit_count() for word in words), initial=0)))
+                (words, counts) = converted
+                word = words[low >> 6]
+                if not (word >> (low & 63)) & 1:
+                    return -1
+                return offsets[i] + counts[low >> 6] + (word & ((1 << (low & 63)) - 1)).bit_count()
+            j = bisect_left(container, low)
+            return offsets[i] + j if j < len(container) and container[j] == low else -1
+
+        return rank
+
+    def rank(self, value: int) -> int:
+        """
+        Returns the number of values in the bitmap that are smaller than the given value.
+        """
+        i = bisect_left(self.__keys, value >> 16)
+        rank = sum(self.__cardinalities[:i])
+        if i < len(self.__keys) and self.__keys[i] == value >> 16:
+            container, low = self.__containers[i], value & 0xFFFF
+            rank += (container & ((1 << low) - 1)).bit_count() if isinstance(container, int) else bisect_left(container, low)
+        return rank
+
+    def iterate(self, start: int = 0) -> Iterator[int]:
+        """
+        Yields the values in the bitmap that are greater than or equal to the given value, in
+        increasing order.
+        """
+        for i in range(bisect_left(self.__keys, start >> 16), len(self.__keys)):
+            base, container = self.__keys[i] << 16, self.__containers[i]
+            low = start - base if start > base else 0
+            if isinstance(container, int):
+                # Only convert the part of the bitmap from the start value and up, so that skipping ahead
+                # doesn't cost a scan over all the bytes in front of the start value.
+                container >>= low
+                offset, bits = base + low, __class__.__bits
+                for j, byte in enumerate(container.to_bytes((container.bit_length() + 7) >> 3, "little")):
+                    if byte:
+                        for bit in bits[byte]:
+                            yield offset + 8 * j + bit
+            else:
+                for k in range(bisect_left(container, low) if low else 0, len(container)):
+                    yield base + container[k]
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns an estimate of the number of bytes the bitmap occupies in memory.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self.__keys) + sys.getsizeof(self.__containers) + sys.getsizeof(self.__cardinalities) + \
+            sum(sys.getsizeof(container) for container in self.__containers)
+
+    def __add_container(self, key: int, container: Union[array, int]) -> None:
+        container = __class__.__normalize(container)
+        cardinality = container.bit_count() if isinstance(container, int) else len(container)
+        if cardinality:
+            self.__keys.append(key)
+            self.__containers.append(container)
+            self.__cardinalities.append(cardinality)
+
+    @staticmethod
+    def __copy(container: Union[array, int]) -> Union[array, int]:
+        """
+        Returns a copy of the container, so that appending to one bitmap never affects another one.
+        Bitmap containers are immutable integers, and need not be copied.
+        """
+        return container if isinstance(container, int) else array("H", container)
+
+    @staticmethod
+    def __normalize(container: Union[array, int]) -> Union[array, int]:
+        """
+        Returns the container in the representation that best suits its cardinality.
+        """
+        if isinstance(container, int):
+            if container.bit_count() > __class__.__array_limit:
+                return container
+            lows = array("H")
+            for i, byte in enumerate(container.to_bytes(8192, "little")):
+                if byte:
+                    lows.extend(8 * i + bit for bit in __class__.__bits[byte])
+            return lows
+        if len(container) > __class__.__array_limit:
+            return __class__.__to_bitmap(container)
+        return container
+
+    @staticmethod
+    def __to_bitmap(container: array) -> int:
+        buffer = bytearray(8192)
+        for low in container:
+            buffer[low >> 3] |= 1 << (low & 7)
+        return int.from_bytes(buffer, "little")
+
+    @staticmethod
+    def __and_containers(container1: Union[array, int], container2: Union[array, int]) -> Union[array, int]:
+        match (isinstance(container1, int), isinstance(container2, int)):
+            case (True, True):
+                return container1 & container2
+            case (True, False):
+                return array("H", (low for low in container2 if (container1 >> low) & 1))
+            case (False, True):
+                return array("H", (low for low in container1 if (container2 >> low) & 1))
+            case _:
+                return array("H", sorted(set(container1).intersection(container2)))
+
+    @staticmethod
+    def __or_containers(container1: Union[array, int], container2: Union[array, int]) -> Union[array, int]:
+        match (isinstance(container1, int), isinstance(container2, int)):
+            case (False, False):
+                return array("H", sorted(set(container1).union(container2)))
+            case _:
+                to_bitmap = __class__.__to_bitmap
+                return (container1 if isinstance(container1, int) else to_bitmap(container1)) | (container2 if isinstance(container2, int) else to_bitmap(container2))
+
+    @staticmethod
+    def __subtract_containers(container1: Union[array, int], container2: Union[array, int]) -> Union[array, int]:
+        match (isinstance(container1, int), isinstance(container2, int)):
+            case (True, True):
+                return container1 & ~container2
+            case (True, False):
+                return container1 & ~__class__.__to_bitmap(container2)
+            case (False, True):
+                return array("H", (low for low in container1 if not (container2 >> low) & 1))
+            case _:
+                excluded = set(container2)
+                return array("H", (low for low in container1 if low not in excluded))
@@ -0,0 +1,146 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+import heapq
+import os
+import struct
+import tempfile
+from collections import Counter
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+from .corpus import Corpus
+from .invertedindex import MemoryMappedInvertedIndex
+from .normalizer import Normalizer
+from .tokenizer import Tokenizer
+from .variablebytecodec import VariableByteCodec
+
+
+class SpimiIndexer:
+    """
+    Builds an inverted index for corpora that are too large to index in memory, using single-pass
+    in-memory indexing (SPIMI) as described in https://nlp.stanford.edu/IR-book/html/htmledition/single-pass-in-memory-indexing-1.html.
+
+    Postings are accumulated in memory, compressed, until the estimated size of the current block
+    exceeds the memory budget. The block is then sorted by term and flushed to a temporary file. When
+    all documents have been processed, the blocks are merged into the final index file using a k-way
+    merge, so that at most one record per block needs to be resident in memory at any point in time.
+    The final index file can be opened as a MemoryMappedInvertedIndex.
+
+    A block is a sequence of records sorted by term, where each record has a fixed-size header followed
+    by the UTF-8 encoded term and the term's posting list. The posting list is encoded the same way as in
+    CompressedInMemoryPostingList.
+    """
+
+    # Record header: Term length in bytes, document frequency, last document identifier, and posting data length in bytes.
+    __header = struct.Struct("<IIII")
+
+    # Rough estimate of the per-term overhead of keeping a term in the current in-memory block.
+    __term_overhead = 200
+
+    def __init__(self, normalizer: Normalizer, tokenizer: Tokenizer, memory_budget: int = 64 * 1024 * 1024):
+        assert memory_budget > 0
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__memory_budget = memory_budget  # Approximate number of bytes we allow a block to grow to.
+
+    def build(self, corpus: Corpus, fields: Iterable[str], filename: str) -> int:
+        """
+        Indexes the named fields of all documents in the corpus, and writes the resulting index to
+        the given file, in the format expected by MemoryMappedInvertedIndex. Temporary block files are created next to the final index file and are removed
+        when we're done. Returns the number of blocks that were flushed to disk along the way.
+        """
+        fields = list(fields)
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(filename))) as directory:
+            blocks = []
+            block: Dict[str, Tuple[bytearray, int, int]] = {}  # Maps a term to its (posting data, document frequency, last document identifier).
+            size = 0
+            for document in corpus:
+                document_id = document.get_document_id()
+                content = " ".join(document.get_field(field, "") for field in fields)
+                tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(content))
+                for term, term_frequency in Counter(self.__normalizer.normalize(t) for t in tokens).items():
+                    data, document_frequency, last_document_id = block.get(term) or (bytearray(), 0, 0)
+                    if document_frequency == 0:
+                        size += len(term) + self.__term_overhead
+                    else:
+                        assert document_id > last_document_id
+                    size += VariableByteCodec.encode_many((document_id - last_document_id, term_frequency), data)
+                    block[term] = (data, document_frequency + 1, document_id)
+                if size > self.__memory_budget:
+                    blocks.append(self.__flush(block, directory, len(blocks)))
+                    block, size = {}, 0
+            if block or not blocks:
+                blocks.append(self.__flush(block, directory, len(blocks)))
+            self.__merge(blocks, filename)
+            return len(blocks)
+
+    def __flush(self, block: Dict[str, Tuple[bytearray, int, int]], directory: str, number: int) -> str:
+        """
+        Sorts the given block by term and writes it to a new temporary file. Returns the name of the file.
+        """
+        filename = os.path.join(directory, f"block-{number}.bin")
+        with open(filename, "wb") as file:
+            for term in sorted(block):
+                data, document_frequency, last_document_id = block[term]
+                self.__write(file, term, document_frequency, last_document_id, data)
+        return filename
+
+    def __merge(self, blocks: List[str], filename: str) -> None:
+        """
+        Does a k-way merge of the given sorted block files, and streams the result to the named file.
+        """
+        files = [open(block, "rb") for block in blocks]  # pylint: disable=consider-using-with
+        try:
+            MemoryMappedInvertedIndex.write_records(self.__merged(files), filename)
+        finally:
+            for file in files:
+                file.close()
+
+    def __merged(self, files: List[BinaryIO]) -> Iterator[Tuple[str, int, bytes]]:
+        """
+        Merges the records in the given sorted block files, and yields (term, document frequency, posting
+        data) triples in term order. Posting lists for the same term are concatenated in block order, which
+        is also document order.
+        """
+        # Records are tagged with their block number, so that ties on terms are resolved in block order.
+        records = [self.__records(file, number) for number, file in enumerate(files)]
+        current = None  # The [term, document frequency, last document identifier, posting data] being merged.
+        for term, _, document_frequency, last_document_id, data in heapq.merge(*records):
+            if current and current[0] == term:
+                # The block's first gap is relative to zero, re-encode it relative to where we left off.
+                (document_id, increment) = VariableByteCodec.decode(data, 0)
+                VariableByteCodec.encode(document_id - current[2], current[3])
+                current[3].extend(memoryview(data)[increment:])
+                current[1] += document_frequency
+                current[2] = last_document_id
+            else:
+                if current:
+                    yield (current[0], current[1], current[3])
+                current = [term, document_frequency, last_document_id, bytearray(data)]
+        if current:
+            yield (current[0], current[1], current[3])
+
+    @staticmethod
+    def __write(file: BinaryIO, term: str, document_frequency: int, last_document_id: int, data: bytes) -> None:
+        """
+        Appends a single record to the given block file.
+        """
+        encoded = term.encode("utf-8")
+        file.write(__class__.__header.pack(len(encoded), document_frequency, last_document_id, len(data)))
+        file.write(encoded)
+        file.write(data)
+
+    @staticmethod
+    def __records(file: BinaryIO, number: int = 0) -> Iterator[Tuple[str, int, int, int, bytes]]:
+        """
+        Reads back the records in the given block file, one at a time. Yields (term, file number, document
+        frequency, last document identifier, posting data) tuples. The supplied file number is passed
+        through as-is, and serves as a tie-breaker when merging.
+        """
+        header = __class__.__header
+        while True:
+            buffer = file.read(header.size)
+            if not buffer:
+                break
+            (length, document_frequency, last_document_id, size) = header.unpack(buffer)
+            term = file.read(length).decode("utf-8")
+            yield (term, number, document_frequency, last_document_id, file.read(size))
@@ -2,7 +2,11 @@
 # pylint: disable=line-too-long
 # pylint: disable=too-few-public-methods
 
-from typing import Iterator, Dict, Any, List, Tuple, Optional
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Iterable, Iterator, Dict, Any, List, Tuple, Optional
+from .corpus import Corpus
 from .normalizer import Normalizer
 from .tokenizer import Tokenizer
 from .trie import Trie
@@ -20,32 +24,54 @@ class StringFinder:
 
     The tokenizer we use when scanning the input buffer is assumed to be the same as the one that was used
     when adding strings to the trie.
+
+    Optionally, the trie can be compiled into a proper Aho-Corasick automaton over tokens. We then make
+    exactly one transition per token, instead of advancing every partial match that is in progress. The
+    automaton is compiled lazily as we scan, so the first few scans will be slower. Its size is bounded by
+    the dictionary, not by the text we scan.
+
+    Whole corpora can be scanned in parallel across a pool of worker processes, see scan_corpus().
     """
 
-    def __init__(self, trie: Trie, normalizer: Normalizer, tokenizer: Tokenizer):
+    def __init__(self, trie: Trie, normalizer: Normalizer, tokenizer: Tokenizer, compiled: bool = False):
         self.__trie = trie
         self.__normalizer = normalizer  # The same as was used for trie building.
         self.__tokenizer = tokenizer  # The same as was used for trie building.
+        self.__compiled = compiled  # Scan using an Aho-Corasick automaton instead of a set of live states?
+
+        # The states of the Aho-Corasick automaton, if used. We could enumerate the tokens of the trie's
+        # strings and build the whole automaton up front, but we compile it lazily instead so that we only
+        # pay for the parts of a large dictionary that the scanned text actually exercises. State 0
+        # is the root of the trie, and the other states are trie nodes reachable from the root by consuming
+        # whole tokens. Per state we keep the trie node, the string consumed so far, the number of tokens
+        # consumed so far, the failure link, the output link, the goto transitions, and the cached automaton
+        # transitions. The output link is the state itself if the state is final, otherwise the nearest final
+        # state along the failure links, or 0 if none. We only cache transitions that lead somewhere other
+        # than the root. A token that leads to any other state occurs in some dictionary string, so the caches
+        # can't grow with the number of distinct tokens in the text.
+        self.__nodes: List[Trie] = [trie]
+        self.__consumed: List[str] = [""]
+        self.__depths: List[int] = [0]
+        self.__failures: List[int] = [0]
+        self.__outputs: List[int] = [0]
+        self.__gotos: List[Dict[str, int]] = [{}]
+        self.__transitions: List[Dict[str, int]] = [{}]
+
+    @staticmethod
+    def __consume(state: Trie, token: str, consumed: str) -> Tuple[Optional[Trie], str]:
+        """
+        Internal helper method to reduce complexity in main function logic.
+        Returns a tuple of [next Trie state after consuming token, or None if it doesn't exist],
+        and [the correctly constructed consumed string]
+        """
+        next_state = state.consume(token)
+
+        if next_state is not None:
+            return next_state, consumed + token
+
+        return state.consume(" " + token), consumed + " " + token
 
-    # Tokenize the input buffer
-    # tokens = list(self.__tokenizer.strings(buffer))
-
-    # Initialize the list of live states
-    # Keep a list of "live states". As you iterate once over the tokens in the buffer, 
-    # update and main this list of "live states". List comprehensions are your friend. :)
-    #
-    # The set of currently explored states. We represent a state as a triple consisting of
-    # (a) a node in the trie that represents where in the trie we are after having consumed zero or more characters
-    # (b) an index that represents the position into the original buffer where the state was "born"
-    # (c) a string that represents the symbols consumed so far to get to the current state
-    # 
-    # (a) is what we advance along the way
-    # (b) is needed so that we know where we first started if/when a match is found
-    # (c) is needed so that we can differentiate between the surface
-    #     form of the match and the (possibly heavily normalized) base form of the match.
-    # live_states: List[Tuple[Trie, int, str]] = [(self.__trie, 0, "")]
-    
-    def scan(self, buffer: str) -> Iterator[Dict[str, Any]]:
+    def scan(self, buffer: str, mode: str = "all") -> Iterator[Dict[str, Any]]:
         """
         Scans the given buffer and finds all dictionary entries in the trie that are also present in the
         buffer. We only consider matches that begin and end on token boundaries.
@@ -60,74 +86,246 @@ class StringFinder:
         that require an exact surface form that is not space-normalized can easily reconstruct the desired
         string using the emitted "span" value.
 
+        The mode decides which matches we report:
+
+          * "all" reports all matches, including overlapping ones. Matches are yielded in the order they end,
+            and matches that end at the same token are yielded longest first.
+          * "leftmost_longest" reports non-overlapping matches only. Among overlapping matches, the one that
+            starts first wins, and then the longest one.
+          * "leftmost_first" is like "leftmost_longest", except that among matches that start at the same
+            place the shortest one wins, i.e., the one that is found first.
+
+        For the non-overlapping modes we prune partial matches that can no longer win while scanning, and
+        we only build up the dictionaries for the matches we actually report.
+
         In a serious application we'd add more lookup/evaluation features, e.g., support for prefix matching,
-        support for leftmost-longest matching (instead of reporting all matches), and more.
+        and more.
         """
-        
-        def __consume(state: Trie, token: str, consumed: str) -> Tuple[Optional[Trie], str]:
+        assert mode in ("all", "leftmost_longest", "leftmost_first"), f"Unknown mode '{mode}'."
+        walk = self.__walk_compiled if self.__compiled else self.__walk
+
+        if mode == "all":
+            for _, matches in walk(buffer, None):
+                for match in matches:
+                    yield self.__emit(buffer, match)
+            return
+
+        # The non-overlapping matches that we'd report if the buffer ended here, leftmost first. Every
+        # match in the chain starts at or after where the previous one ends.
+        longest = mode == "leftmost_longest"
+        chain: List[Tuple[int, int, str, Trie]] = []
+        done = 0  # Where the last reported match ends. No later match can start before this.
+
+        def useful(start: int) -> bool:
             """
-            Internal helper method to reduce complexity in main function logic.
-            Returns a tuple of [next Trie state after consuming token, or None if it doesn't exist],
-            and [the correctly constructed consumed string]
+            Returns True iff a match starting at the given position could still make it into the chain.
             """
-            next_state = state.consume(token)
-            
-            if next_state is not None:
-                return next_state, consumed + token
-            
-            return state.consume(" " + token), consumed + " " + token
-        
+            if start < done:
+                return False
+            for match in chain:
+                if start < match[0] or (longest and start == match[0]):
+                    return True
+                if start < match[1]:
+                    return False
+            return True
+
+        for live_start, matches in walk(buffer, useful):
+            for match in matches:
+                if match[0] >= done:
+                    self.__extend(chain, match, longest)
+            # The first match in the chain is final once no partial match can beat it.
+            while chain and (live_start is None or live_start > chain[0][0] or (live_start == chain[0][0] and not longest)):
+                match = chain.pop(0)
+                done = match[1]
+                yield self.__emit(buffer, match)
+
+    def scan_corpus(self, corpus: Corpus, fields: Iterable[str], mode: str = "all", workers: int = 1, batch_size: int = 64) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Scans the named fields of all documents in the corpus, and yields (document identifier, matches)
+        pairs in corpus order, where the matches are as reported by scan(). The fields are joined by a
+        space and scanned as a single buffer, so spans refer to the joined buffer.
+
+        If more than one worker is requested, the documents are scanned in a pool of worker processes.
+        This finder, including the compiled automaton if any, is shipped to each worker only once when
+        the pool starts. The documents are then streamed to the workers in batches, and we keep only a
+        few batches per worker in flight at any point in time so that memory usage stays bounded no
+        matter how large the corpus is. Note that the automaton compiled by the workers is not sent back.
+        """
+        assert workers > 0
+        assert batch_size > 0
+        fields = list(fields)
+        documents = ((d.get_document_id(), " ".join(d.get_field(f, "") for f in fields)) for d in corpus)
+        if workers == 1:
+            for document_id, content in documents:
+                yield (document_id, list(self.scan(content, mode)))
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(self,)) as executor:
+            pending: Deque[Future] = deque()
+            while True:
+                while len(pending) < 2 * workers:
+                    batch = list(islice(documents, batch_size))
+                    if not batch:
+                        break
+                    pending.append(executor.submit(_scan_batch, batch, mode))
+                if not pending:
+                    break
+                yield from pending.popleft().result()
+
+    def __walk(self, buffer: str, useful: Optional[Callable[[int], bool]]) -> Iterator[Tuple[Optional[int], List[Tuple[int, int, str, Trie]]]]:
+        """
+        Walks the trie along with the tokens in the buffer, keeping a set of live states. For each token,
+        yields where the earliest live state was born and the matches that end at the token, as (start, end,
+        consumed, node) tuples. The matches are ordered by where they start. If given, the predicate tells
+        which live states that are worth keeping, based on where they were born. Finally yields (None, []).
+        """
         # [(token, (start, end)), (token, (start, end)), ...]
-        tokens = self.__tokenizer.tokens(buffer)        
+        tokens = self.__tokenizer.tokens(buffer)
+
+        # The partial matches we are currently exploring, ordered by where they were "born". A state is
+        # a triple of a trie node, the position in the buffer where the state was born, and the string
+        # consumed so far. The root is implicitly live at every token, so it's not in the list.
+        live_states: List[Tuple[Trie, int, str]] = []
 
-        # initialize live_states on root Trie node, 0 start index and empty consumed
-        live_states = [(self.__trie, 0, "")]
-        
         for token, (start, end) in tokens:
             token = self.__normalizer.normalize(token)
-            
-            new_live_states = []
-            states_to_remove = set()
-            
-            # iterate through live_states in reverse order, to make sure we prune/yield latest states first
-            for state_index, (state, state_start, state_consumed) in reversed(list(enumerate(live_states))):
-                
+
+            # Every live state either consumes the token or dies. A new state is also born at the root.
+            candidates = live_states + [(self.__trie, start, "")]
+            if useful:
+                candidates = [candidate for candidate in candidates if useful(candidate[1])]
+            live_states = []
+            matches = []
+
+            for state, state_start, state_consumed in candidates:
+
                 # __consume() returns a Tuple of next_state Trie (or None), and the string of consumed
-                next_state, next_consumed = __consume(state, token, state_consumed)
-                
-                # if branching from the current state with the current token is impossible, 
-                # remove this irrelevant state from new_live_states (irrelevant state pruning)
-                # if we're at the root state, don't remove it, just skip to next state (continue)
+                next_state, next_consumed = self.__consume(state, token, state_consumed)
                 if next_state is None:
-                    if state_index == 0: # if at root
-                        continue
-                    
-                    states_to_remove.add(state_index) # add irrelevant state's index to states_to_remove
                     continue
-                
-                # if first token in match, set state_start as the start of the current token
-                if state_consumed == "":
-                    state_start = start
-                
+
                 # found match (current state = ["token"], next state = [""])
                 if next_state.is_final():
-                    surface = " ".join(buffer[state_start:end].split()) # space normalized surface
-                    span = (state_start, end) # start of current live state, end of current token
-                    match = next_consumed
-                    meta = next_state.get_meta()
-                    
-                    yield {
-                        "surface": surface,
-                        "span": span,
-                        "match": match,
-                        "meta": meta
-                    }
-                
-                # don't append the state if it has no transitions (state is dead/already consumed + yielded)
-                if len(next_state.transitions()) == 0:
-                    continue
-                
-                new_live_states.append((next_state, state_start, next_consumed))
-            
-            # live_states = live_states excluding states_to_remove plus new_live_states
-            live_states = [state for i, state in enumerate(live_states) if i not in states_to_remove] + new_live_states 
\ No newline at end of file
+                    matches.append((state_start, end, next_consumed, next_state))
+
+                # states that can't consume more tokens die on the next token.
+                live_states.append((next_state, state_start, next_consumed))
+
+            yield (live_states[0][1] if live_states else None, matches)
+
+        yield (None, [])
+
+    def __walk_compiled(self, buffer: str, useful: Optional[Callable[[int], bool]]) -> Iterator[Tuple[Optional[int], List[Tuple[int, int, str, Trie]]]]:
+        """
+        Same as __walk(), but uses an Aho-Corasick automaton over tokens, see https://doi.org/10.1145/360825.360855
+        for details. Each token gives rise to exactly one transition, no matter how many partial
+        matches are in progress. The state of the automaton implicitly represents all live states, so
+        the predicate is only used to find where the earliest useful live state was born.
+        """
+        state = 0
+        starts = []  # Where each token begins in the buffer.
+        for i, (token, (start, end)) in enumerate(self.__tokenizer.tokens(buffer)):
+            starts.append(start)
+            state = self.__transition(state, self.__normalizer.normalize(token))
+            matches = []
+            match = self.__outputs[state]
+            while match:
+                matches.append((starts[i + 1 - self.__depths[match]], end, self.__consumed[match], self.__nodes[match]))
+                match = self.__outputs[self.__failures[match]]
+            live = state
+            while live and useful and not useful(starts[i + 1 - self.__depths[live]]):
+                live = self.__failures[live]
+            yield (starts[i + 1 - self.__depths[live]] if live else None, matches)
+
+        yield (None, [])
+
+    @staticmethod
+    def __emit(buffer: str, match: Tuple[int, int, str, Trie]) -> Dict[str, Any]:
+        """
+        Creates the dictionary we report for the given (start, end, consumed, node) match.
+        """
+        (start, end, consumed, node) = match
+        return {
+            "surface": " ".join(buffer[start:end].split()),  # space normalized surface
+            "span": (start, end),  # start of the first token, end of the last token
+            "match": consumed,
+            "meta": node.get_meta()
+        }
+
+    @staticmethod
+    def __extend(chain: List[Tuple[int, int, str, Trie]], match: Tuple[int, int, str, Trie], longest: bool) -> None:
+        """
+        Adds a newly found match to the chain of non-overlapping matches, if it belongs there. The match
+        ends at least as late as all the matches in the chain do, so if it beats one of them it also
+        overlaps all the following ones.
+        """
+        for i, other in enumerate(chain):
+            if match[0] < other[0] or (longest and match[0] == other[0] and match[1] > other[1]):
+                del chain[i:]
+                break
+            if match[0] < other[1]:
+                return
+        chain.append(match)
+
+    def __transition(self, state: int, token: str) -> int:
+        """
+        Returns the state that the Aho-Corasick automaton moves to from the given state when consuming the
+        given token, i.e., follows the failure links until some state has a goto transition for the token.
+        The result is cached unless it's the root, so that the next time around we only need a single lookup.
+        """
+        transitions = self.__transitions[state]
+        next_state = transitions.get(token)
+        if next_state is None:
+            next_state = self.__goto(state, token)
+            if next_state is None:
+                next_state = 0 if state == 0 else self.__transition(self.__failures[state], token)
+            if next_state:
+                transitions[token] = next_state
+        return next_state
+
+    def __goto(self, state: int, token: str) -> Optional[int]:
+        """
+        Returns the state that the given state leads to in the trie when consuming the given token, or
+        None if the trie has no such transition. Adds the state to the automaton if we haven't seen it before.
+        Missing transitions aren't cached, the trie can tell us that just as fast.
+        """
+        gotos = self.__gotos[state]
+        child = gotos.get(token)
+        if child is not None:
+            return child
+        (node, consumed) = self.__consume(self.__nodes[state], token, self.__consumed[state])
+        if node is None:
+            return None
+        # The failure link points to the state for the longest proper suffix of the tokens consumed so far.
+        failure = 0 if state == 0 else self.__transition(self.__failures[state], token)
+        child = len(self.__nodes)
+        self.__nodes.append(node)
+        self.__consumed.append(consumed)
+        self.__depths.append(self.__depths[state] + 1)
+        self.__failures.append(failure)
+        self.__outputs.append(child if node.is_final() else self.__outputs[failure])
+        self.__gotos.append({})
+        self.__transitions.append({})
+        gotos[token] = child
+        return child
+
+
+# The finder used by the current worker process, when scanning a corpus in parallel.
+_worker_finder: Optional[StringFinder] = None
+
+
+def _initialize_worker(finder: StringFinder) -> None:
+    """
+    Receives the finder that the current worker process should use, when the process starts. Must be a
+    module-level function so that it can be pickled and shipped to the workers.
+    """
+    global _worker_finder  # pylint: disable=global-statement
+    _worker_finder = finder
+
+
+def _scan_batch(documents: List[Tuple[int, str]], mode: str) -> List[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Scans a single batch of (document identifier, content) pairs, as done by the worker processes when
+    scanning a corpus in parallel. Must be a module-level function so that it can be pickled and shipped
+    to the workers.
+    """
+    return [(document_id, list(_worker_finder.scan(content, mode))) for document_id, content in documents]
@@ -1,13 +1,15 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=line-too-long
 
-import sys
-from bisect import bisect_left
-from itertools import takewhile
-from typing import Any, Dict, Iterator, Iterable, Tuple, List
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, Iterable, List, Tuple
 from collections import Counter
+from itertools import accumulate, compress, repeat
 from .corpus import Corpus
 from .normalizer import Normalizer
+from .suffixsorter import SuffixSorter
 from .tokenizer import Tokenizer
 
 
@@ -17,58 +19,125 @@ class SuffixArray:
     A simple suffix array implementation. Allows us to conduct efficient substring searches.
     The prefix of a suffix is an infix!
 
-    In a serious application we'd make use of least common prefixes (LCPs), pay more attention
-    to memory usage, and add more lookup/evaluation features.
+    The searchable content of all documents is concatenated into a single text, where each document is
+    followed by a separator. A suffix is then just a position in the text, and we only keep the suffixes
+    that start on a token boundary. The suffixes are sorted without ever materializing them, see
+    SuffixSorter, by sorting the text as a sequence of tokens. When sorting, each document gets its own
+    separator that sorts before all other symbols, and separators for earlier documents sort first. Thus,
+    a suffix that ends where its document ends sorts before its extensions, and equal suffixes are
+    ordered by document.
+
+    We also keep the length of the longest common prefix (LCP) of each suffix and the one before it. The
+    LCPs tell us where the suffixes that share a prefix stop sharing it, which is handy for autocompletion.
+
+    In a serious application we'd pay more attention to memory usage, and add more lookup/evaluation
+    features.
     """
 
+    # Separates the documents in the concatenated text. Sorts before all other symbols.
+    __separator = "\0"
+
+    # Matches where a token ends.
+    __boundary = re.compile("[ \0]")
+
     def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer):
         self.__corpus = corpus
         self.__normalizer = normalizer
         self.__tokenizer = tokenizer
-        self.__haystack: List[Tuple[int, str]] = []  # The (<document identifier>, <searchable content>) pairs.
-        self.__suffixes: List[Tuple[int, int]] = []  # The sorted (<haystack index>, <start offset>) pairs.
-        self.__build_suffix_array(fields)  # Construct the haystack and the suffix array itself.
-    
-    def __build_suffix_array(self, fields: Iterable[str]) -> None:
+        self.__text = ""  # The searchable content of all documents, each followed by a separator.
+        self.__document_ids: List[int] = []  # The document identifiers, in the order the documents appear in the text.
+        self.__suffixes = array("I")  # The sorted suffixes, as positions in the text.
+        self.__owners = array("I")  # Per sorted suffix, the index of the document it belongs to.
+        self.__lcps = array("I")  # Per sorted suffix, the length of the longest common prefix with the suffix before it.
+        starts = self.__build_suffix_array(fields)  # Construct the text and the suffix array itself.
+        self.__build_lcp_array(starts)  # Construct the LCP array.
+
+    def __build_suffix_array(self, fields: Iterable[str]) -> array:
         """
         Builds a simple suffix array from the set of named fields in the document collection.
-        The suffix array allows us to search across all named fields in one go.
+        The suffix array allows us to search across all named fields in one go. Returns the
+        positions in the text that the suffixes start at, in text order.
         """
-        
-        documents = iter(self.__corpus) # [document, document, document]
-        doc = next(documents, None) # document_id = 0, fields = {'a': 'This subject is', 'b': 'Great'}
-        
-        for doc in self.__corpus:
-            content: str = " ".join(doc.get_field(field, "") for field in fields) # "This subject is Great"
-            normalized: str = self.__normalize(content) # "this subject is great"
-            
-            self.__haystack.append((doc.get_document_id(), normalized)) # (0, "this subject is great")
-                                                                        # (0, 0), (0, 5) ... (10, 0), (10, 3)
-            
-            doc = next(documents, None)
-
-        # (haystack_index, string offset)
-        # doc1:"abcd" -> (0, 0), (0, 1), (0, 2), ..., (0, 4)
-        # doc2:"dcba" -> (1, 0), (1, 1), (1, 2), ..., (1, 4)
-        
-        suffixes = []
-        for i, (_, content) in enumerate(self.__haystack):
-            for offset in range(len(content)):
-                is_start_of_token = (offset == 0 or content[offset - 1] == " ")
-                
-                if is_start_of_token:
-                    suffixes.append((i, offset))
-        
-        # sorted suffixes: (1, 3), (0, 0), (1, 2), (0, 1), (1, 1), (0, 2), (0, 3), (1, 0)
-        self.__suffixes = sorted(suffixes, 
-                                 key=lambda index_offset: self.__haystack[index_offset[0]][1][index_offset[1]:])
-        
-        if "TEST" in fields:
-            print("\n\nTEST\n")
-            print(f"Haystack: {self.__haystack}")
-            print(f"\nSuffixes: {[(haystack, offset) for haystack, offset in self.__suffixes]}")
-            print()
-            
+        fields = list(fields)
+        contents, offsets, where = [], array("I"), 0
+        for document in self.__corpus:
+            content = self.__normalize(" ".join(document.get_field(field, "") for field in fields))  # "this subject is great"
+            assert __class__.__separator not in content
+            self.__document_ids.append(document.get_document_id())
+            offsets.append(where)
+            contents.append(content)
+            where += len(content) + 1
+        self.__text = __class__.__separator.join(contents) + (__class__.__separator if contents else "")
+
+        # Encode the text as integers, one per token, so that we only sort the suffixes that start on a token
+        # boundary. Each token is encoded together with the symbol that follows it, i.e., a space or a separator.
+        # Then no encoded token is a prefix of another, so comparing the codes compares the same symbols as
+        # comparing the text would. Separators are numbered by document, and the tokens come after them.
+        inner, last = set(), set()
+        for content in contents:
+            tokens = content.split(" ") if content else []
+            inner.update(tokens[:-1])
+            last.update(tokens[-1:])
+        vocabulary = sorted([token + " " for token in inner] + [token + __class__.__separator for token in last])
+        vocabulary = {token: code for code, token in enumerate(vocabulary, len(contents))}
+        del inner, last
+
+        # Also note where in the text each code is, and which document it's in.
+        codes, positions, owners = array("I"), array("I"), array("I")
+        for i, content in enumerate(contents):
+            tokens = content.split(" ") if content else []
+            codes.extend(map(vocabulary.__getitem__, [token + " " for token in tokens[:-1]] + [token + __class__.__separator for token in tokens[-1:]]))
+            codes.append(i)
+            if tokens:
+                positions.extend(accumulate((len(token) + 1 for token in tokens[:-1]), initial=offsets[i]))
+            positions.append(offsets[i] + len(content))
+            owners.extend(repeat(i, len(tokens) + 1))
+        alphabet_size = len(contents) + len(vocabulary)
+        del vocabulary
+
+        # Sort the suffixes, and keep the ones that start with a token.
+        suffixes = SuffixSorter.sort(codes, alphabet_size)
+        tokens = [k for k in suffixes if codes[k] >= len(contents)]
+        self.__suffixes = array("I", map(positions.__getitem__, tokens))
+        self.__owners = array("I", map(owners.__getitem__, tokens))
+        return array("I", compress(positions, map(len(contents).__le__, codes)))
+
+    def __build_lcp_array(self, starts: array) -> None:
+        """
+        Computes the LCP of each suffix and the one before it, using a variant of the algorithm described in
+        https://doi.org/10.1007/3-540-48194-X_17 for when only some of the suffixes are in the array. Separators
+        never match anything, so the LCPs stay within documents.
+
+        We visit the suffixes in text order. If a suffix has an LCP of h with the suffix before it, then the
+        next suffix d symbols later has an LCP of at least h - d with the suffix before it: That suffix is
+        d symbols later than the one before the previous suffix, and it's also in the array since the shared
+        prefix includes the space in front of it. So we compare O(n) symbols in total.
+        """
+        (text, separator, suffixes) = (self.__text, __class__.__separator, self.__suffixes)
+        ranks = array("I", bytes(4 * len(text)))
+        for rank, position in enumerate(suffixes):
+            ranks[position] = rank
+        lcps = array("I", bytes(4 * len(suffixes)))
+        (length, previous) = (0, 0)
+        for position in starts:
+            rank = ranks[position]
+            length = max(0, length - (position - previous))
+            previous = position
+            if rank == 0:
+                length = 0
+                continue
+            other = suffixes[rank - 1]
+            while True:
+                chunk = text[position + length:position + length + 16]
+                if len(chunk) == 16 and separator not in chunk and chunk == text[other + length:other + length + 16]:
+                    length += 16
+                    continue
+                while text[position + length] == text[other + length] != separator:
+                    length += 1
+                break
+            lcps[rank] = length
+        self.__lcps = lcps
+
     def __normalize(self, buffer: str) -> str:
         """
         Produces a normalized version of the given string. Both queries and documents need to be
@@ -81,18 +150,45 @@ class SuffixArray:
         
         return " ".join(normalized)
 
-    def __binary_search(self, needle: str) -> int:
+    def __binary_search(self, needle: str) -> Tuple[int, int]:
         """
         Does a binary search for a given normalized query (the needle) in the suffix array (the haystack).
-        Returns the position in the suffix array where the normalized query is either found, or, if not found,
-        should have been inserted.
+        Returns the range of positions in the suffix array where the suffixes start with the normalized
+        query. If there are no such suffixes, the range is empty and begins where they should have been.
+
+        Only the first len(needle) symbols of each suffix matter when comparing, and the needle never contains
+        a separator, so we don't need to care about where the documents end. Python can't compare strings at
+        an offset, so we do slice, but only len(needle) symbols. Suffixes that start with the needle are equal
+        to it under this comparison, so the first search finds where they begin and the second where they end.
 
-        Kind of silly to roll our own binary search instead of using the bisect module, but seems needed
-        prior to Python 3.10 due to how we represent the suffixes via (index, offset) tuples. Version 3.10
-        added support for specifying a key.
+        Note that the LCPs would let us skip comparing symbols that we know match, see https://doi.org/10.1137/0222058.
+        But then we'd have to compare symbols in a Python loop, and that's slower than comparing slices.
         """
-        
-        return bisect_left(self.__suffixes, needle, key=lambda x: self.__haystack[x[0]][1][x[1]:]) #haystack[id][searchable content][offset:]
+        text, length = self.__text, len(needle)
+        begin = bisect_left(self.__suffixes, needle, key=lambda p: text[p:p + length])
+        end = bisect_right(self.__suffixes, needle, lo=begin, key=lambda p: text[p:p + length])
+        return (begin, end)
+
+    def __continuations(self, needle: str, begin: int, end: int) -> Iterator[Tuple[str, int]]:
+        """
+        Given the range of suffixes that start with the normalized query (the needle), yields the distinct
+        ways that the last token of the needle continues, and how many times each one occurs. E.g., for
+        the needle "to the be" we might get ("to the best", 3) and ("to the behemoth", 1). The continuations
+        are yielded back in lexicographical order.
+
+        Suffixes with the same continuation are adjacent. A group of such suffixes ends where the LCP drops
+        below the length of the continuation, or where the token goes on.
+        """
+        (text, suffixes, lcps, boundary) = (self.__text, self.__suffixes, self.__lcps, __class__.__boundary)
+        i = begin
+        while i < end:
+            position = suffixes[i]
+            length = boundary.search(text, position + len(needle)).start() - position
+            j = i + 1
+            while j < end and lcps[j] >= length and text[suffixes[j] + length] in (" ", __class__.__separator):
+                j += 1
+            yield (text[position:position + length], j - i)
+            i = j
 
     def evaluate(self, query: str, options: dict) -> Iterator[Dict[str, Any]]:
         """
@@ -109,6 +205,11 @@ class SuffixArray:
 
         The results yielded back to the client are dictionaries having the keys "score" (int) and
         "document" (Document).
+
+        If the "group_by_continuation" (bool) option is set, we instead find the distinct ways that the last
+        token of the query phrase continues, e.g., "to the best" and "to the behemoth". This is useful for
+        autocompletion. The continuations are ranked according to how many times they occur, and the
+        results are dictionaries having the keys "score" (int) and "continuation" (str).
         """
         
         normalized_query = self.__normalize(query)
@@ -116,17 +217,17 @@ class SuffixArray:
             return
 
         hit_count = options.get('hit_count', 5)
-        matches = Counter()
+        begin, end = self.__binary_search(normalized_query)
 
-        start_index = self.__binary_search(normalized_query)
-        
-        for haystack_index, start_offset in self.__suffixes[start_index:]:
-            suffix = self.__haystack[haystack_index][1][start_offset:] # suffix = 'subject is great'
-            
-            if not suffix.startswith(normalized_query): # if the suffix does not start with the normalized query, break the loop
-                break
-            
-            matches[self.__haystack[haystack_index][0]] += 1 # {doc_id: score (count of times the query appears in the doc)}
+        # Find the distinct ways the query continues, most frequent first. Ties are resolved lexicographically.
+        if options.get("group_by_continuation", False):
+            continuations = sorted(self.__continuations(normalized_query, begin, end), key=lambda continuation: -continuation[1])
+            for continuation, score in continuations[:hit_count]:
+                yield {"score": score, "continuation": continuation}
+            return
+
+        # The suffixes that start with the query are consecutive, so count occurrences per document in one go.
+        matches = Counter(self.__owners[begin:end])  # {document index: score (count of times the query appears in the doc)}
 
-        for document_id, score in matches.most_common(hit_count):
-            yield {"score": score, "document": self.__corpus.get_document(document_id)}
\ No newline at end of file
+        for owner, score in matches.most_common(hit_count):
+            yield {"score": score, "document": self.__corpus.get_document(self.__document_ids[owner])}
@@ -0,0 +1,163 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+# pylint: disable=too-few-public-methods
+
+from array import array
+from typing import List, Sequence
+
+# NumPy is optional, and is only used to speed up sorting of longer texts.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SuffixSorter:
+    """
+    Sorts all the suffixes of a text in linear time, using the SA-IS algorithm described in
+    https://doi.org/10.1109/DCC.2009.42. The text is given as a sequence of small non-negative
+    integers, i.e., already mapped from symbols to codes.
+
+    Unlike with comparison-based sorting, no suffixes are ever materialized. The suffixes are
+    classified as S-type or L-type depending on whether they are smaller or larger than the next
+    suffix, and the leftmost S-type suffixes (LMS) in each run split the text into substrings. The LMS
+    substrings are sorted by induction, named, and if they aren't all distinct, the problem is reduced
+    to sorting a text of LMS substring names that is at most half as long. The order of the LMS suffixes
+    then induces the order of all the other suffixes.
+
+    A suffix that is a proper prefix of another suffix sorts before it, i.e., as if the text ended with
+    a unique symbol that is smaller than all other symbols.
+
+    SA-IS does a linear amount of work, but in pure Python that's still a lot of interpreted steps per
+    symbol. If NumPy is available, longer texts are instead sorted by prefix doubling as described in
+    https://doi.org/10.1016/j.tcs.2007.07.017, where each of the O(log n) rounds is a vectorized sort.
+    """
+
+    # Sorting a text at least this long makes it worthwhile to use NumPy, if available.
+    __vectorization_threshold = 1024
+
+    @staticmethod
+    def sort(text: Sequence[int], alphabet_size: int) -> array:
+        """
+        Returns the starting positions of all suffixes of the given text, in lexicographical order. All
+        codes in the text must be smaller than the given alphabet size.
+        """
+        assert not text or 0 <= min(text) <= max(text) < alphabet_size
+        if np is not None and len(text) >= __class__.__vectorization_threshold:
+            return array("I", __class__.__sort_vectorized(text).astype(np.uint32, copy=False).tobytes())
+        return array("I", __class__.__sort(text, alphabet_size))
+
+    @staticmethod
+    def __sort_vectorized(text: Sequence[int]) -> "np.ndarray":
+        """
+        Same as __sort(), but uses prefix doubling. After round k, the suffixes are sorted by their first
+        2^k symbols, and suffixes that share these are in the same group. A group is ranked by where it
+        begins in the partially sorted array, so the ranks of the suffixes 2^k positions ahead tell us how
+        to order each group in the next round. Only the groups that aren't sorted yet are revisited.
+        """
+        codes = np.asarray(text)
+        n = len(codes)
+        suffixes = np.argsort(codes, kind="stable").astype(np.int32 if n < 2**31 else np.int64)
+        codes = codes[suffixes]
+        slots = np.arange(n, dtype=suffixes.dtype)
+        boundaries = np.concatenate(([True], codes[1:] != codes[:-1]))
+        del codes
+        ranks = np.empty(n, dtype=suffixes.dtype)
+        ranks[suffixes] = np.maximum.accumulate(np.where(boundaries, slots, 0))
+        unsorted = slots[~(boundaries & np.concatenate((boundaries[1:], [True])))]  # The slots of the groups that aren't singletons.
+        length = 1
+        while len(unsorted):
+            # Order each unsorted group by the rank of the suffix further ahead. Falling off the end sorts first.
+            group = suffixes[unsorted]
+            heads = ranks[group]
+            ahead = group + length
+            keys = np.where(ahead < n, ranks[np.minimum(ahead, n - 1)], -1)
+            order = np.argsort(heads.astype(np.int64) * (n + 1) + keys)
+            (group, heads, keys) = (group[order], heads[order], keys[order])
+            suffixes[unsorted] = group
+            # Split the groups, and rank the new groups by where they begin.
+            boundaries = np.concatenate(([True], (heads[1:] != heads[:-1]) | (keys[1:] != keys[:-1])))
+            ranks[group] = np.maximum.accumulate(np.where(boundaries, unsorted, 0))
+            unsorted = unsorted[~(boundaries & np.concatenate((boundaries[1:], [True])))]
+            length *= 2
+        return suffixes
+
+    @staticmethod
+    def __sort(text: Sequence[int], alphabet_size: int) -> List[int]:
+        """
+        Recursive helper for sort(). Returns a list, for speed.
+        """
+        n = len(text)
+        if n < 3:
+            return sorted(range(n), key=lambda i: text[i:])
+
+        # Classify the suffixes, i.e., is the suffix at i smaller than the suffix at i + 1?
+        smaller = [False] * n
+        for i in range(n - 2, -1, -1):
+            smaller[i] = smaller[i + 1] if text[i] == text[i + 1] else text[i] < text[i + 1]
+
+        # Within the bucket for a symbol, L-type suffixes come before S-type suffixes. We need to know
+        # where the L-type suffixes and the S-type suffixes begin, per bucket.
+        l_starts, s_starts = [0] * (alphabet_size + 1), [0] * (alphabet_size + 1)
+        for i in range(n):
+            if smaller[i]:
+                l_starts[text[i] + 1] += 1
+            else:
+                s_starts[text[i]] += 1
+        for code in range(alphabet_size):
+            s_starts[code] += l_starts[code]
+            l_starts[code + 1] += s_starts[code]
+        suffixes = [-1] * n
+
+        def induce(lms: List[int]) -> None:
+            # Given the sorted LMS suffixes, sort the L-type suffixes left to right, and then the S-type
+            # suffixes right to left.
+            for i in range(n):
+                suffixes[i] = -1
+            heads = s_starts[:]
+            for i in lms:
+                suffixes[heads[text[i]]] = i
+                heads[text[i]] += 1
+            heads = l_starts[:]
+            suffixes[heads[text[n - 1]]] = n - 1
+            heads[text[n - 1]] += 1
+            for i in suffixes:
+                if i > 0 and not smaller[i - 1]:
+                    code = text[i - 1]
+                    suffixes[heads[code]] = i - 1
+                    heads[code] += 1
+            heads = l_starts[:]
+            for k in range(n - 1, -1, -1):
+                i = suffixes[k]
+                if i > 0 and smaller[i - 1]:
+                    code = text[i - 1] + 1
+                    heads[code] -= 1
+                    suffixes[heads[code]] = i - 1
+
+        # Sort the LMS substrings by induction.
+        lms = [i for i in range(1, n) if smaller[i] and not smaller[i - 1]]
+        if not lms:
+            induce(lms)
+            return suffixes
+        names = [-1] * n  # Maps the position of an LMS suffix to its rank among the LMS suffixes, by position.
+        for rank, i in enumerate(lms):
+            names[i] = rank
+        induce(lms)
+
+        # Name the LMS substrings, so that equal substrings get the same name. Names are assigned in order.
+        ordered = [i for i in suffixes if names[i] >= 0]
+        reduced = [0] * len(lms)
+        name = 0
+        for k in range(1, len(ordered)):
+            left, right = ordered[k - 1], ordered[k]
+            left_end = lms[names[left] + 1] if names[left] + 1 < len(lms) else n
+            right_end = lms[names[right] + 1] if names[right] + 1 < len(lms) else n
+            if left_end - left != right_end - right or left_end == n or right_end == n or text[left:left_end + 1] != text[right:right_end + 1]:
+                name += 1
+            reduced[names[right]] = name
+
+        # If the names aren't unique, recurse on the reduced text to sort the LMS suffixes.
+        if name + 1 < len(lms):
+            ordered = [lms[i] for i in __class__.__sort(reduced, name + 1)]
+        induce(ordered)
+        return suffixes
@@ -1,16 +1,31 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=consider-using-f-string
 
+from itertools import accumulate
 from struct import pack
-from typing import Tuple
+from typing import Iterable, List, Optional, Tuple
+
+# NumPy is optional, and is only used to speed up decoding of larger buffers.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class VariableByteCodec:
     """
     A simple encoder/decoder for variable-byte codes. See Figure 5.8 in
     https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    Besides encoding and decoding numbers one at a time, whole sequences of numbers can be
+    processed in one go. That's considerably faster, and what compressed structures should use
+    whenever they know up front how many numbers they need. If NumPy is available, larger
+    buffers are decoded using vectorized operations.
     """
 
+    # Decoding this many numbers or more in one go makes it worthwhile to use NumPy, if available.
+    __vectorization_threshold = 256
+
     @staticmethod
     def encode(number: int, destination: bytearray) -> int:
         """
@@ -50,3 +65,109 @@ class VariableByteCodec:
             else:
                 number = 128 * number + (byte - 128)
                 return (number, where - start)
+
+    @staticmethod
+    def encode_many(numbers: Iterable[int], destination: bytearray) -> int:
+        """
+        Encodes the given numbers, and appends the resulting bytes to the given destination
+        buffer. Returns the number of bytes that were appended.
+        """
+        assert destination is not None
+        start = len(destination)
+        append = destination.append
+        for number in numbers:
+            if number < 128:
+                assert number >= 0
+                append(number + 128)
+            else:
+                values = []
+                while number >= 128:
+                    values.append(number & 127)
+                    number >>= 7
+                values.append(number)
+                values.reverse()
+                values[-1] += 128
+                destination.extend(values)
+        return len(destination) - start
+
+    @staticmethod
+    def decode_many(source: bytes, start: int, count: Optional[int] = None) -> Tuple[List[int], int]:
+        """
+        Starting at the given position in the source buffer, decodes the given number of numbers,
+        or all numbers up to the end of the buffer if no count is given. Returns a pair comprised
+        of the decoded numbers, and the number of bytes read from the source buffer.
+        """
+        assert source is not None
+        assert start >= 0
+        assert start == 0 or source[start - 1] >= 128
+        assert count is None or count >= 0
+        if np is not None and (len(source) - start if count is None else count) >= __class__.__vectorization_threshold:
+            decoded = __class__.__decode_vectorized(source, start, count)
+            if decoded is not None:
+                return decoded
+        numbers = []
+        if count == 0:
+            return (numbers, 0)
+        number, where = 0, start
+        for byte in memoryview(source)[start:]:
+            where += 1
+            if byte < 128:
+                number = 128 * number + byte
+            else:
+                numbers.append(128 * number + byte - 128)
+                if len(numbers) == count:
+                    break
+                number = 0
+        assert len(numbers) == count if count is not None else where == start or source[where - 1] >= 128, "Buffer ended prematurely."
+        return (numbers, where - start)
+
+    @staticmethod
+    def decode_gaps(source: bytes, start: int, count: Optional[int] = None, previous: int = 0) -> Tuple[List[int], int]:
+        """
+        As decode_many(), but treats the decoded numbers as gaps and returns their prefix sums,
+        i.e., the original numbers that the gaps were computed from. The given previous number
+        is what the first gap is relative to.
+        """
+        (gaps, size) = __class__.decode_many(source, start, count)
+        return (list(accumulate(gaps, initial=previous))[1:], size)
+
+    @staticmethod
+    def __decode_vectorized(source: bytes, start: int, count: Optional[int]) -> Optional[Tuple[List[int], int]]:
+        """
+        Does what decode_many() does, but using NumPy. Each number's bytes are found by locating
+        the terminating bytes, and the numbers are then assembled one byte position at a time.
+        Returns None if some number might not fit in 64 bits.
+
+        If a count is given, we only look at as many bytes as the numbers can occupy, so that decoding
+        a short run of numbers from a large buffer doesn't cost time proportional to the buffer size.
+        We first assume that the numbers fit in 32 bits, i.e., 5 bytes each.
+        """
+        available = len(source) - start
+        for width in ((5, 9) if count is not None else (None,)):
+            size = available if width is None else min(available, width * count)
+            data = np.frombuffer(source, dtype=np.uint8, count=size, offset=start)
+            ends = np.flatnonzero(data >= 128)
+            if count is None or len(ends) >= count or size == available:
+                break
+        if count is not None:
+            if len(ends) < count and size < available:
+                return None  # Some number needs 10 bytes or more.
+            assert len(ends) >= count, "Buffer ended prematurely."
+            ends = ends[:count]
+        else:
+            assert (ends[-1] if len(ends) else -1) == len(data) - 1, "Buffer ended prematurely."
+        if len(ends) == 0:
+            return ([], 0)
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        longest = int((ends - starts).max()) + 1
+        if longest > 9:
+            return None
+        lows = (data[:ends[-1] + 1] & 127).astype(np.uint64)
+        numbers = lows[ends]
+        for shift in range(1, longest):
+            positions = ends - shift
+            valid = positions >= starts
+            numbers[valid] += lows[positions[valid]] << np.uint64(7 * shift)
+        return (numbers.tolist(), int(ends[-1]) + 1)
@@ -0,0 +1,94 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=line-too-long
+
+from array import array
+from typing import List, Sequence, Tuple
+from .bitvector import BitVector
+
+
+class WaveletMatrix:
+    """
+    A succinct representation of a sequence of small non-negative integers, i.e., symbols, that
+    supports rank, select and access queries in time proportional to the number of bits per symbol. This is a
+    variant of the wavelet tree that is simpler to build and query, see https://doi.org/10.1016/j.is.2014.06.002.
+
+    There is one bit vector per bit in the symbols, most significant bit first. The bit vector for a
+    level holds that bit for each symbol, with the symbols stably reordered so that those with a zero
+    bit on the level above come first. A symbol's position on one level therefore tells us where it is
+    on the next, via a rank query. On the last level, all occurrences of a symbol are consecutive.
+    """
+
+    __slots__ = ("__levels", "__zeros", "__starts", "__length")
+
+    def __init__(self, symbols: Sequence[int], alphabet_size: int):
+        assert not symbols or 0 <= min(symbols) <= max(symbols) < alphabet_size
+        self.__length = len(symbols)
+        self.__levels: List[BitVector] = []  # One bit vector per level, most significant bit first.
+        self.__zeros = array("I")  # Per level, the number of unset bits.
+        current = array("I", symbols)
+        for level in range(max(1, (alphabet_size - 1).bit_length()) - 1, -1, -1):
+            bits = BitVector((symbol >> level) & 1 for symbol in current)
+            self.__levels.append(bits)
+            self.__zeros.append(bits.rank0(len(bits)))
+            current = array("I", [symbol for symbol in current if not (symbol >> level) & 1] + [symbol for symbol in current if (symbol >> level) & 1])
+
+        # Per symbol, where its occurrences begin on the last level. That level is ordered by the bits of
+        # the symbols in reverse, least significant bit first. Absent symbols get where they would have begun.
+        depth = len(self.__levels)
+        counts = [0] * alphabet_size
+        for symbol in current:
+            counts[symbol] += 1
+        self.__starts = array("I", [0] * alphabet_size)
+        where = 0
+        for symbol in sorted(range(alphabet_size), key=lambda s: int(f"{s:0{depth}b}"[::-1], 2)):
+            self.__starts[symbol] = where
+            where += counts[symbol]
+
+    def __len__(self):
+        return self.__length
+
+    def __getitem__(self, i: int) -> int:
+        return self.access(i)[0]
+
+    def rank(self, symbol: int, i: int) -> int:
+        """
+        Returns the number of occurrences of the given symbol in front of position i, i.e., among the
+        first i symbols.
+        """
+        assert 0 <= i <= self.__length
+        depth = len(self.__levels)
+        for level, (bits, zeros) in enumerate(zip(self.__levels, self.__zeros)):
+            if (symbol >> (depth - level - 1)) & 1:
+                i = zeros + bits.rank1(i)
+            else:
+                i = bits.rank0(i)
+        return i - self.__starts[symbol]
+
+    def access(self, i: int) -> Tuple[int, int]:
+        """
+        Returns the symbol at position i, and the number of occurrences of that symbol in front of
+        position i. Both fall out of the same walk down the levels.
+        """
+        assert 0 <= i < self.__length
+        symbol = 0
+        for bits, zeros in zip(self.__levels, self.__zeros):
+            bit, ones = bits.access(i)
+            symbol = (symbol << 1) | bit
+            i = zeros + ones if bit else i - ones
+        return (symbol, i - self.__starts[symbol])
+
+    def select(self, symbol: int, k: int) -> int:
+        """
+        Returns the position of the k-th occurrence of the given symbol, counting from zero. This is
+        the inverse of rank(), so we walk the levels in reverse, from where the symbol's occurrences
+        are on the last level.
+        """
+        i = self.__starts[symbol] + k
+        assert 0 <= k and i < self.__length
+        depth = len(self.__levels)
+        for level in range(depth - 1, -1, -1):
+            if (symbol >> (depth - level - 1)) & 1:
+                i = self.__levels[level].select1(i - self.__zeros[level])
+            else:
+                i = self.__levels[level].select0(i)
+        return i
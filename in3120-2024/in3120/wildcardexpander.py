@@ -2,9 +2,7 @@
 # pylint: disable=line-too-long
 
 from typing import Iterable, Tuple, Set, List
-from .trie import Trie
-from .normalizer import DummyNormalizer
-from .tokenizer import DummyTokenizer
+from .doublearraytrie import DoubleArrayTrie
 
 
 class WildcardExpander:
@@ -18,23 +16,21 @@ class WildcardExpander:
     """
 
     def __init__(self, terms: Iterable[str]):
-        # We're going to need prefix lookups, so store the permuterm rotations in a trie.
-        # We could have used other prefix-friendly data structures here, too, such as a
-        # B-tree or even just a simple sorted array with binary search on top.
-        self._rotations = Trie()
-
-        # Assume that the provided terms are already properly normalized tokens.
-        normalizer = DummyNormalizer()
-        tokenizer = DummyTokenizer()
-
         # Add all rotations. E.g., the term 'hello' would give rise to the rotations
         # ['hello$', 'ello$h', 'llo$he', 'lo$hel', 'o$hell', '$hello'] where '$' is
         # a magic sentinel symbol. Associate each rotation with the original term
-        # that gave rise to the rotation.
+        # that gave rise to the rotation. Assume that the provided terms are already
+        # properly normalized tokens.
+        rotations = []
         for term in terms:
             padded = term + self.get_sentinel()
-            rotations = (padded[i:] + padded[:i] for i in range(len(padded)))
-            self._rotations.add2(((rotation, term) for rotation in rotations), normalizer, tokenizer)
+            rotations.extend((padded[i:] + padded[:i], term) for i in range(len(padded)))
+
+        # We're going to need prefix lookups, so store the permuterm rotations in a trie.
+        # We could have used other prefix-friendly data structures here, too, such as a
+        # B-tree or even just a simple sorted array with binary search on top. There are
+        # lots of rotations, so we use a compact trie that we build from the sorted rotations.
+        self._rotations = DoubleArrayTrie.from_sorted_strings2(sorted(rotations))
 
     def _lookup(self, key: str, is_prefix: bool) -> Set[str]:
         """
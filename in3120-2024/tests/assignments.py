@@ -56,7 +56,10 @@ def assignment_x_suite() -> unittest.TestSuite:
                              "TestEliasGammaCodec", "TestBloomFilter", "TestVectorizer",
                              "TestDummyInMemoryInvertedIndex", "TestRocchioClassifier",
                              "TestWindowFinder", "TestNearestNeighborClassifier", "TestUnigramTokenizer",
-                             "TestBinaryLogisticRegressionClassifier", "TestEvaluationMetrics", "TestPageRank"])
+                             "TestBinaryLogisticRegressionClassifier", "TestEvaluationMetrics", "TestPageRank",
+                             "TestSpimiIndexer", "TestMemoryMappedInvertedIndex", "TestArrayPostingList",
+                             "TestRoaringBitmap", "TestBitmapPostingList", "TestPForDeltaCodec", "TestPForDeltaPostingList",
+                             "TestBitStream", "TestEliasGammaPostingList", "TestFrontCodedDictionary", "TestPerfectHashDictionary", "TestDoubleArrayTrie", "TestDawg", "TestSuffixSorter", "TestBitVector", "TestWaveletMatrix", "TestFMIndex"])
 
 
 def main():
@@ -4,12 +4,14 @@
 # pylint: disable=line-too-long
 # pylint: disable=broad-exception-caught
 
+import hashlib
 import json
 import os
 import pprint
 import sys
+import tempfile
 from timeit import default_timer as timer
-from typing import Callable, Any
+from typing import Callable, Any, List
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import unquote
 from context import in3120
@@ -39,6 +41,29 @@ def data_path(filename: str) -> str:
     return full
 
 
+# Define a small helper so that we only build an inverted index from scratch the first time around. The
+# index is written to a file that subsequent sessions memory-map, unless the data file has changed since.
+# The file is written under a temporary name and then renamed, so that an interrupted build never leaves
+# a partial file behind. If the cached file can't be opened anyway, we just rebuild it.
+def cached_index(corpus: in3120.Corpus, filename: str, fields: List[str], normalizer: in3120.Normalizer, tokenizer: in3120.Tokenizer) -> in3120.InvertedIndex:
+    key = repr((os.path.abspath(filename), in3120.MemoryMappedInvertedIndex.format_version, fields, normalizer.__class__.__name__, tokenizer.__class__.__name__, sorted(vars(tokenizer).items())))
+    cached = os.path.join(tempfile.gettempdir(), f"in3120-{hashlib.sha1(key.encode()).hexdigest()}.index")
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(filename):
+        try:
+            return in3120.MemoryMappedInvertedIndex(cached, normalizer, tokenizer)
+        except (IOError, ValueError):
+            pass
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(cached), prefix="in3120-", suffix=".tmp")
+    os.close(descriptor)
+    try:
+        in3120.MemoryMappedInvertedIndex.write(in3120.InMemoryInvertedIndex(corpus, fields, normalizer, tokenizer), temporary)
+        os.replace(temporary, cached)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return in3120.MemoryMappedInvertedIndex(cached, normalizer, tokenizer)
+
+
 # Define a simple REPL to query from the terminal.
 def simple_repl(prompt: str, evaluator: Callable[[str], Any]):
     printer = pprint.PrettyPrinter()
@@ -106,7 +131,7 @@ def repl_a_1():
     normalizer = in3120.SimpleNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("cran.xml"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("cran.xml"), ["body"], normalizer, tokenizer)
     print("Enter one or more index terms and inspect their posting lists.")
     simple_repl("terms", lambda ts: {t: list(index.get_postings_iterator(t)) for t in index.get_terms(ts)})
 
@@ -116,7 +141,7 @@ def repl_a_2():
     normalizer = in3120.SimpleNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("names.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("names.txt"), ["body"], normalizer, tokenizer)
     engine = in3120.BooleanSearchEngine(corpus, index)
     options = {"optimize": True}
     print("Enter a complex Boolean query expression and find matching documents.")
@@ -196,7 +221,7 @@ def repl_c_1():
     normalizer = in3120.SimpleNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("en.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("en.txt"), ["body"], normalizer, tokenizer)
     ranker = in3120.SimpleRanker()
     engine = in3120.SimpleSearchEngine(corpus, index)
     options = {"debug": False, "hit_count": 5, "match_threshold": 0.5}
@@ -212,7 +237,7 @@ def repl_c_2():
     normalizer = in3120.SimpleNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("names.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("names.txt"), ["body"], normalizer, tokenizer)
     equivalences = ["aleksander", "alexander"]
     synonyms = in3120.Trie.from_strings2(((s, equivalences) for s in equivalences), normalizer, tokenizer)
     engine = in3120.ExtendedBooleanSearchEngine(corpus, index, synonyms)
@@ -227,7 +252,7 @@ def repl_d_1():
     normalizer = in3120.SimpleNormalizer()
     tokenizer = in3120.ShingleGenerator(3)
     corpus = in3120.InMemoryCorpus(data_path("mesh.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("mesh.txt"), ["body"], normalizer, tokenizer)
     ranker = in3120.SimpleRanker()
     engine = in3120.SimpleSearchEngine(corpus, index)
     options = {"debug": False, "hit_count": 5, "match_threshold": 0.5}
@@ -244,7 +269,7 @@ def repl_d_2():
     normalizer = in3120.SimpleNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("en.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("en.txt"), ["body"], normalizer, tokenizer)
     ranker = in3120.BetterRanker(corpus, index)
     engine = in3120.SimpleSearchEngine(corpus, index)
     options = {"debug": False, "hit_count": 5, "match_threshold": 0.5}
@@ -261,7 +286,7 @@ def repl_d_3():
     normalizer = in3120.PorterNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("en.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("en.txt"), ["body"], normalizer, tokenizer)
     ranker = in3120.BetterRanker(corpus, index)
     engine = in3120.SimpleSearchEngine(corpus, index)
     options = {"debug": False, "hit_count": 5, "match_threshold": 0.5}
@@ -278,7 +303,7 @@ def repl_d_4():
     normalizer = in3120.SoundexNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("names.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("names.txt"), ["body"], normalizer, tokenizer)
     ranker = in3120.BetterRanker(corpus, index)
     engine = in3120.SimpleSearchEngine(corpus, index)
     options = {"debug": False, "hit_count": 5, "match_threshold": 0.2}
@@ -291,7 +316,7 @@ def repl_d_5():
     normalizer = in3120.SimpleNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("airports.csv"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["id", "type", "name", "iata_code"], normalizer, tokenizer)
+    index = cached_index(corpus, data_path("airports.csv"), ["id", "type", "name", "iata_code"], normalizer, tokenizer)
     ranker = in3120.BetterRanker(corpus, index)
     engine = in3120.SimpleSearchEngine(corpus, index)
     options = {"debug": False, "hit_count": 5, "match_threshold": 0.5}
@@ -376,7 +401,7 @@ def repl_x_5():
     normalizer = in3120.SimpleNormalizer()
     tokenizer = in3120.SimpleTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("en.txt"))
-    inverted_index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    inverted_index = cached_index(corpus, data_path("en.txt"), ["body"], normalizer, tokenizer)
     stopwords = in3120.Trie.from_strings((d["body"] for d in in3120.InMemoryCorpus(data_path("stopwords-en.txt"))), normalizer, tokenizer)
     vectorizer = in3120.Vectorizer(corpus, inverted_index, stopwords)
     print(f"Enter a document identifier between 0 and {corpus.size()} to inspect its document vector.")
@@ -0,0 +1,51 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=protected-access
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestArrayPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+
+    def test_append_and_iterate(self):
+        self._tester._test_append_and_iterate(in3120.ArrayPostingList())
+
+    def test_invalid_append(self):
+        self._tester._test_invalid_append(in3120.ArrayPostingList())
+
+    def test_advance_to(self):
+        self._tester._test_advance_to(in3120.ArrayPostingList())
+
+    def test_bulk_accessors(self):
+        posting_list = in3120.ArrayPostingList()
+        posting_list.append_posting(in3120.Posting(3, 1))
+        posting_list.append_posting(in3120.Posting(7, 4))
+        posting_list.finalize_postings()
+        self.assertListEqual(posting_list.get_document_ids().tolist(), [3, 7])
+        self.assertListEqual(posting_list.get_term_frequencies().tolist(), [1, 4])
+        self.assertTrue(posting_list.get_document_ids().readonly)
+
+    def test_index_equivalence(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, posting_list_factory=in3120.ArrayPostingList)
+        for term in ["of", "flow", "boundary", "wing", "xyzzy"]:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+        statistics1 = index1.get_memory_statistics()
+        statistics2 = index2.get_memory_statistics()
+        self.assertEqual(statistics1["postings"], statistics2["postings"])
+        self.assertGreater(statistics1["bytes_per_posting"], 2 * statistics2["bytes_per_posting"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
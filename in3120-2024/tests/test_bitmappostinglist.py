@@ -0,0 +1,108 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=protected-access
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestBitmapPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+
+    @staticmethod
+    def _build(factory, postings):
+        posting_list = factory()
+        for document_id, term_frequency in postings:
+            posting_list.append_posting(in3120.Posting(document_id, term_frequency))
+        posting_list.finalize_postings()
+        return posting_list
+
+    def test_append_and_iterate(self):
+        self._tester._test_append_and_iterate(in3120.BitmapPostingList())
+
+    def test_invalid_append(self):
+        self._tester._test_invalid_append(in3120.BitmapPostingList())
+
+    def test_advance_to(self):
+        self._tester._test_advance_to(in3120.BitmapPostingList())
+
+    def test_merging(self):
+        postings1 = [(d, 1 + d % 5) for d in range(0, 20000, 3)]
+        postings2 = [(d, 1 + d % 7) for d in range(0, 20000, 2)]
+        postings3 = [(d, 1 + d % 3) for d in range(5, 20000, 5)]
+        merger = in3120.PostingsMerger
+        for operation in (merger.intersection, merger.union, merger.difference):
+            for factory1, factory2 in ((in3120.BitmapPostingList, in3120.BitmapPostingList),
+                                       (in3120.BitmapPostingList, in3120.InMemoryPostingList),
+                                       (in3120.InMemoryPostingList, in3120.BitmapPostingList)):
+                expected = list(operation(iter(self._build(in3120.InMemoryPostingList, postings1)), iter(self._build(in3120.InMemoryPostingList, postings2))))
+                actual = list(operation(iter(self._build(factory1, postings1)), iter(self._build(factory2, postings2))))
+                self.assertListEqual([(p.document_id, p.term_frequency) for p in expected], [(p.document_id, p.term_frequency) for p in actual])
+        for operation in (merger.intersection_many, merger.union_many):
+            for factories in ((in3120.BitmapPostingList,) * 3, (in3120.BitmapPostingList, in3120.InMemoryPostingList, in3120.BitmapPostingList)):
+                expected = list(operation([iter(self._build(in3120.InMemoryPostingList, p)) for p in (postings1, postings2, postings3)]))
+                actual = list(operation([iter(self._build(f, p)) for f, p in zip(factories, (postings1, postings2, postings3))]))
+                self.assertListEqual([(p.document_id, p.term_frequency) for p in expected], [(p.document_id, p.term_frequency) for p in actual])
+
+    def test_nested_merging(self):
+        postings1 = [(d, 1 + d % 5) for d in range(0, 20000, 3)]
+        postings2 = [(d, 1 + d % 7) for d in range(0, 20000, 2)]
+        postings3 = [(d, 1 + d % 3) for d in range(5, 20000, 5)]
+        merger = in3120.PostingsMerger
+        lists = [self._build(in3120.BitmapPostingList, p) for p in (postings1, postings2, postings3)]
+        references = [self._build(in3120.InMemoryPostingList, p) for p in (postings1, postings2, postings3)]
+        expected = list(merger.difference(merger.union(iter(references[0]), iter(references[1])), iter(references[2])))
+        actual = list(merger.difference(merger.union(iter(lists[0]), iter(lists[1])), iter(lists[2])))
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in expected], [(p.document_id, p.term_frequency) for p in actual])
+
+    def test_term_frequencies_are_looked_up_lazily(self):
+        lookups = []
+        iterator = in3120.BitmapPostingList.BitmapPostingListIterator(in3120.RoaringBitmap([3, 5, 8]), lambda d: lookups.append(d) or d + 1)
+        postings = list(iterator)
+        self.assertListEqual([p.document_id for p in postings], [3, 5, 8])
+        self.assertListEqual(lookups, [])
+        self.assertEqual(postings[1].term_frequency, 6)
+        self.assertListEqual(lookups, [5])
+
+    def test_advance_to_when_merging_with_lists(self):
+        postings1 = [(d, 1 + d % 5) for d in range(0, 20000, 3)]
+        postings2 = [(d, 1 + d % 7) for d in range(0, 20000, 2)]
+        merger = in3120.PostingsMerger
+        for operation, factory1, factory2 in ((merger.intersection, in3120.BitmapPostingList, in3120.InMemoryPostingList),
+                                              (merger.intersection, in3120.InMemoryPostingList, in3120.BitmapPostingList),
+                                              (merger.difference, in3120.InMemoryPostingList, in3120.BitmapPostingList)):
+            expected = list(operation(iter(self._build(in3120.InMemoryPostingList, postings1)), iter(self._build(in3120.InMemoryPostingList, postings2))))
+            iterator = operation(iter(self._build(factory1, postings1)), iter(self._build(factory2, postings2)))
+            for target in (0, 1, 5000, 5001, 12345, 19999, 20000):
+                posting = iterator.advance_to(target)
+                remaining = [p for p in expected if p.document_id >= target]
+                self.assertEqual(posting.document_id if posting else None, remaining[0].document_id if remaining else None)
+                if posting:
+                    self.assertEqual(posting.term_frequency, remaining[0].term_frequency)
+                expected = remaining[1:]
+
+    def test_index_equivalence(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, bitmap_threshold=0.3)
+        self.assertIsInstance(index2._posting_lists[index2._dictionary.get_term_id("of")], in3120.BitmapPostingList)
+        self.assertNotIsInstance(index2._posting_lists[index2._dictionary.get_term_id("wing")], in3120.BitmapPostingList)
+        for term in ["of", "the", "flow", "boundary", "wing", "xyzzy"]:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+        engine1 = in3120.BooleanSearchEngine(corpus, index1, 0)
+        engine2 = in3120.BooleanSearchEngine(corpus, index2, 0)
+        for query in ["AND(of, the)", "OR(of, wing)", "AND(the, of, flow)", "ANDNOT(of, the)", "ANDNOT(the, wing)", "OR(AND(of, flow), ANDNOT(the, of))"]:
+            self.assertListEqual([r["document"].document_id for r in engine1.evaluate(query, {})],
+                                 [r["document"].document_id for r in engine2.evaluate(query, {})])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
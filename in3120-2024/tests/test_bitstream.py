@@ -0,0 +1,87 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import random
+import unittest
+from context import in3120
+
+
+class TestBitStream(unittest.TestCase):
+
+    def test_write_and_read(self):
+        rng = random.Random(1234)
+        fields = [(width, rng.randrange(1 << width)) for width in (rng.randint(0, 80) for _ in range(2000))]
+        writer = in3120.BitWriter()
+        for width, value in fields:
+            writer.write(value, width)
+        self.assertEqual(len(writer), sum(width for width, _ in fields))
+        data = writer.get_bytes()
+        writer.flush()
+        self.assertEqual(data, bytes(writer.get_buffer()))
+        self.assertEqual(len(data), (len(writer) + 7) // 8)
+        reader = in3120.BitReader(data)
+        for width, value in fields:
+            self.assertEqual(reader.read(width), value)
+
+    def test_bit_order(self):
+        writer = in3120.BitWriter()
+        writer.write(0b101, 3)
+        writer.write(0b1, 1)
+        writer.flush()
+        self.assertEqual(writer.get_buffer(), bytearray([0b10110000]))
+
+    def test_read_unary(self):
+        writer = in3120.BitWriter()
+        for run in (0, 1, 7, 8, 9, 100, 3):
+            writer.write((1 << run) - 1, run)
+            writer.write(0, 1)
+        reader = in3120.BitReader(writer.get_bytes())
+        self.assertListEqual([reader.read_unary() for _ in range(7)], [0, 1, 7, 8, 9, 100, 3])
+
+    def test_align(self):
+        writer = in3120.BitWriter(bytearray(b"x"))
+        writer.write(1, 1)
+        writer.flush()
+        writer.write(0b11, 2)
+        writer.flush()
+        reader = in3120.BitReader(bytes(writer.get_buffer()), 1)
+        self.assertEqual(reader.read(1), 1)
+        reader.align()
+        self.assertEqual(reader.read(2), 0b11)
+
+    def test_premature_end(self):
+        reader = in3120.BitReader(b"\xff")
+        self.assertEqual(reader.read(4), 15)
+        with self.assertRaises(AssertionError):
+            reader.read(5)
+        with self.assertRaises(AssertionError):
+            in3120.BitReader(b"\xff").read_unary()
+
+    def test_invalid_writes(self):
+        writer = in3120.BitWriter()
+        with self.assertRaises(AssertionError):
+            writer.write(4, 2)
+        with self.assertRaises(AssertionError):
+            writer.write(-1, 2)
+
+    def test_delta_and_golomb_rice_codes(self):
+        numbers = list(range(1, 2000)) + [1 << 40, 1, 12345678]
+        writer = in3120.BitWriter()
+        in3120.EliasDeltaCodec.write_many(numbers, writer)
+        in3120.GolombRiceCodec.write_many([number - 1 for number in numbers[:1000]], 5, writer)
+        reader = in3120.BitReader(writer.get_bytes())
+        self.assertListEqual(in3120.EliasDeltaCodec.read_many(reader, len(numbers)), numbers)
+        self.assertListEqual(in3120.GolombRiceCodec.read_many(5, reader, 1000), [number - 1 for number in numbers[:1000]])
+        writer = in3120.BitWriter()
+        in3120.EliasDeltaCodec.write(1 << 40, writer)
+        self.assertLess(len(writer), 2 * 40 + 1)  # Shorter than the gamma code.
+        writer = in3120.BitWriter()
+        in3120.GolombRiceCodec.write(37, 3, writer)
+        self.assertEqual(len(writer), 4 + 1 + 3)
+        self.assertEqual(in3120.GolombRiceCodec.get_parameter(100), 6)
+        self.assertEqual(in3120.GolombRiceCodec.get_parameter(0.5), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,47 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import random
+import unittest
+from context import in3120
+
+
+class TestBitVector(unittest.TestCase):
+
+    def test_rank_and_access(self):
+        rng = random.Random(1234)
+        for length in (0, 1, 7, 8, 9, 511, 512, 513, 3000):
+            bits = [rng.randrange(2) for _ in range(length)]
+            vector = in3120.BitVector(bits)
+            self.assertEqual(len(vector), length)
+            self.assertEqual(vector.count(), sum(bits))
+            self.assertListEqual([vector[i] for i in range(length)], bits)
+            for i in range(length + 1):
+                self.assertEqual(vector.rank1(i), sum(bits[:i]))
+                self.assertEqual(vector.rank0(i), i - sum(bits[:i]))
+            for i in range(length):
+                self.assertEqual(vector.access(i), (bits[i], sum(bits[:i])))
+
+    def test_select(self):
+        rng = random.Random(4321)
+        for density in (0.001, 0.1, 0.5, 0.99):
+            bits = [rng.random() < density for _ in range(5000)]
+            vector = in3120.BitVector(bits)
+            ones = [i for i, bit in enumerate(bits) if bit]
+            self.assertListEqual([vector.select1(k) for k in range(len(ones))], ones)
+            zeros = [i for i, bit in enumerate(bits) if not bit]
+            self.assertListEqual([vector.select0(k) for k in range(len(zeros))], zeros)
+        with self.assertRaises(AssertionError):
+            in3120.BitVector([0, 1, 0]).select1(1)
+        with self.assertRaises(AssertionError):
+            in3120.BitVector([0, 1, 0]).select0(2)
+
+    def test_bit_order(self):
+        vector = in3120.BitVector([1, 0, 0, 0, 0, 0, 0, 0, 1])
+        self.assertListEqual([vector.rank1(i) for i in range(10)], [0, 1, 1, 1, 1, 1, 1, 1, 1, 2])
+        self.assertListEqual([vector.select1(0), vector.select1(1)], [0, 8])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
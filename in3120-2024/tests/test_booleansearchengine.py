@@ -68,6 +68,43 @@ class TestBooleanSearchEngine(unittest.TestCase):
                 counts[optimize] = len(index.get_history())
             self.assertGreater(counts[False], counts[True])
 
+    def test_simplification(self):
+        redundant = "OR(AND('mary', smith), mary, OR(AND(lee, OR(lee, james)), 'mary'))"
+        self._verify_matches(redundant, [m["document"].document_id for m in self._engine.evaluate("OR(mary, lee)", {"optimize": False})], {"optimize": True})
+        self._verify_matches(redundant, [m["document"].document_id for m in self._engine.evaluate("OR(mary, lee)", {"optimize": True})], {"optimize": False})
+        statistics = self._engine.get_statistics()
+        self.assertGreater(statistics["flattened"], 0)
+        self.assertGreater(statistics["deduplicated"], 0)
+        self.assertGreater(statistics["absorbed"], 0)
+        self.assertGreater(statistics["postings_avoided"], 0)
+        engine = in3120.BooleanSearchEngine(self._corpus, self._index, 0)
+        list(engine.evaluate("AND(AND(mary, smith), AND('smith mary'))", {"optimize": False}))
+        self.assertDictEqual(engine.get_statistics(), {})
+        list(engine.evaluate("AND(AND(mary, smith), AND('smith mary'))", {"optimize": True}))
+        statistics = engine.get_statistics()
+        self.assertEqual(statistics["flattened"], 2)
+        self.assertEqual(statistics["deduplicated"], 2)
+        self.assertEqual(statistics["postings_avoided"], self._index.get_document_frequency("mary") + self._index.get_document_frequency("smith"))
+
+    def test_cache(self):
+        engine = in3120.BooleanSearchEngine(self._corpus, self._index, 2)
+        for expression in ("AND(mary, smith)", "AND(mary, smith)", "OR(lee, james)", "AND(mary, smith)", "'robert'", "OR(lee, james)"):
+            self.assertListEqual([m["document"].document_id for m in engine.evaluate(expression, {})],
+                                 [m["document"].document_id for m in self._engine.evaluate(expression, {"optimize": False})])
+        statistics = engine.get_statistics()
+        self.assertEqual(statistics["cache_hits"], 2)
+        self.assertEqual(statistics["cache_misses"], 4)  # The last query was evicted before it came back.
+        list(engine.evaluate("AND(mary, smith)", {"optimize": False}))
+        self.assertEqual(engine.get_statistics()["cache_misses"], 5)  # Optimized or not makes for different cache entries.
+        list(engine.evaluate("OR(", {}))
+        list(engine.evaluate("OR(", {}))
+        self.assertEqual(engine.get_statistics()["cache_misses"], 7)  # Errors are not cached.
+        engine = in3120.BooleanSearchEngine(self._corpus, self._index, 0)
+        list(engine.evaluate("AND(mary, smith)", {}))
+        list(engine.evaluate("AND(mary, smith)", {}))
+        self.assertNotIn("cache_hits", engine.get_statistics())
+        self.assertNotIn("cache_misses", engine.get_statistics())
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
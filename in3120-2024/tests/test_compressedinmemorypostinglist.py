@@ -23,6 +23,22 @@ class TestCompressedInMemoryPostingList(unittest.TestCase):
     def test_invalid_append(self):
         self._tester1._test_invalid_append(in3120.CompressedInMemoryPostingList())
 
+    def test_advance_to(self):
+        self._tester1._test_advance_to(in3120.CompressedInMemoryPostingList())
+
+    def test_unblocked_lists_are_decoded_in_chunks(self):
+        # The trailing byte doesn't end a number, so decoding the whole buffer in one go would fail.
+        data = bytearray()
+        in3120.VariableByteCodec.encode_many([1, 1] * 100000, data)
+        data.append(1)
+        iterator = in3120.CompressedInMemoryPostingList.CompressedInMemoryPostingListIterator(data, 100000)
+        self.assertEqual(next(iterator).document_id, 1)
+        self.assertEqual(iterator.advance_to(500).document_id, 500)
+        posting_list = in3120.CompressedInMemoryPostingList()
+        for document_id in range(1000):
+            posting_list.append_posting(in3120.Posting(document_id, 1))
+        self.assertListEqual([posting.document_id for posting in posting_list], list(range(1000)))
+
     def test_mesh_corpus(self):
         self._tester2._test_mesh_corpus(True)
 
@@ -0,0 +1,98 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=line-too-long
+
+import unittest
+from context import in3120
+
+
+class TestDawg(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+        self.__root = in3120.Dawg.from_sorted_strings(["abb", "abba", "abbab", "abbor", "ørret"])
+
+    def test_consume_and_final(self):
+        root = self.__root
+        self.assertTrue(not root.is_final())
+        self.assertIsNone(root.consume("snegle"))
+        node = root["ab"]
+        self.assertTrue(not node.is_final())
+        node = node.consume("b")
+        node = node.consume("")
+        self.assertTrue(node.is_final())
+        self.assertEqual(node, root.consume("abb"))
+
+    def test_containment(self):
+        self.assertTrue("ørret" in self.__root)
+        self.assertFalse("ørr" in self.__root)
+        self.assertTrue("abbor" in self.__root)
+        self.assertFalse("abborrrr" in self.__root)
+        child = self.__root.child("a")
+        self.assertTrue("bbor" in child)
+
+    def test_transitions_and_child(self):
+        root = self.__root
+        self.assertListEqual(root.transitions(), ["a", "ø"])
+        self.assertListEqual(root.consume("abb").transitions(), ["a", "o"])
+        self.assertListEqual(root.consume("abbor").transitions(), [])
+        self.assertIsNone(root.child("ab"))
+        self.assertIsNone(root.child(""))
+        self.assertIsNotNone(root.child("a"))
+
+    def test_suffixes_are_shared(self):
+        strings = sorted(prefix + suffix for prefix in ["", "re", "un", "pre", "over"] for suffix in ["do", "doing", "done", "did"])
+        root = in3120.Dawg.from_sorted_strings(strings)
+        self.assertListEqual(list(root), strings)
+        self.assertEqual(root.get_state_count(), 15)
+        self.assertListEqual(list(root.consume("un")), ["did", "do", "doing", "done"])
+
+    def test_same_as_trie(self):
+        strings = [line.strip() for line in open("../data/mesh.txt", "r", encoding="utf-8") if line.strip()]
+        trie = in3120.Trie.from_strings(strings, self.__normalizer, self.__tokenizer)
+        root = in3120.Dawg.from_trie(trie)
+        self.assertListEqual(list(root), list(trie))
+        for prefix in ["", "a", "ab", "acid", "1,2-", "zz", "日本"]:
+            node1, node2 = trie.consume(prefix), root.consume(prefix)
+            self.assertEqual(node1 is None, node2 is None)
+            if node1:
+                self.assertListEqual(node1.transitions(), node2.transitions())
+                self.assertEqual(node1.is_final(), node2.is_final())
+
+    def test_with_meta_data(self):
+        strings = [("aleksander", 2104), ("alexander", 1), ("julaften", 2412), ("nei", None), ("sander", "s")]
+        root = in3120.Dawg.from_sorted_strings2(strings)
+        for string, meta in strings:
+            self.assertTrue(root.consume(string).is_final())
+            self.assertEqual(root.consume(string).get_meta(), meta)
+            self.assertEqual(root.consume(string[:2]).consume(string[2:]).get_meta(), meta)
+        self.assertFalse(root.has_meta())
+        self.assertIsNone(root.consume("aleks").get_meta())
+        self.assertFalse(root.consume("nei").has_meta())
+        with self.assertRaises(AssertionError):
+            in3120.Dawg.from_sorted_strings2([("abba", 74), ("abba", 99)])
+        with self.assertRaises(AssertionError):
+            in3120.Dawg.from_sorted_strings(["b", "a"])
+
+    def test_empty(self):
+        root = in3120.Dawg.from_sorted_strings([])
+        self.assertListEqual(list(root), [])
+        self.assertListEqual(root.transitions(), [])
+        self.assertIsNone(root.consume("a"))
+
+    def test_engines_run_unchanged(self):
+        strings = [("abba", None), ("abbor", None), ("aleksander", "rednaskela"), ("aleksanderrrr", None), ("allekander", None), ("ørret", None)]
+        trie = in3120.Trie.from_strings2(strings, self.__normalizer, self.__tokenizer)
+        dawg = in3120.Dawg.from_sorted_strings2(strings)
+        finders = [in3120.StringFinder(root, self.__normalizer, self.__tokenizer) for root in (trie, dawg)]
+        text = "abba og aleksander fisket ørret og abbor"
+        self.assertListEqual(list(finders[0].scan(text)), list(finders[1].scan(text)))
+        engines = [in3120.EditSearchEngine(root, self.__normalizer, self.__tokenizer) for root in (trie, dawg)]
+        options = {"upper_bound": 3}
+        self.assertListEqual(list(engines[0].evaluate("aleksander", options)), list(engines[1].evaluate("aleksander", options)))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
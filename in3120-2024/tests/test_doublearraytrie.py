@@ -0,0 +1,118 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=line-too-long
+
+import os
+import tempfile
+import unittest
+from context import in3120
+
+
+class TestDoubleArrayTrie(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+        trie = in3120.Trie()
+        trie.add(["abba", "ØRRET", "abb", "abbab", "abbor"], self.__normalizer, self.__tokenizer)
+        self.__root = in3120.DoubleArrayTrie.from_trie(trie)
+
+    def test_consume_and_final(self):
+        root = self.__root
+        self.assertTrue(not root.is_final())
+        self.assertIsNone(root.consume("snegle"))
+        node = root["ab"]
+        self.assertTrue(not node.is_final())
+        node = node.consume("b")
+        node = node.consume("")
+        self.assertTrue(node.is_final())
+        self.assertEqual(node, root.consume("abb"))
+
+    def test_containment(self):
+        self.assertTrue("ørret" in self.__root)
+        self.assertFalse("ørr" in self.__root)
+        self.assertTrue("abbor" in self.__root)
+        self.assertFalse("abborrrr" in self.__root)
+        self.assertFalse("xyz" in self.__root)
+        child = self.__root.child("a")
+        self.assertTrue("bbor" in child)
+
+    def test_transitions(self):
+        root = self.__root
+        self.assertListEqual(root.transitions(), ["a", "ø"])
+        node = root.consume("abb")
+        self.assertListEqual(node.transitions(), ["a", "o"])
+        node = node.consume("o")
+        self.assertListEqual(node.transitions(), ["r"])
+        node = node.consume("r")
+        self.assertListEqual(node.transitions(), [])
+
+    def test_child(self):
+        root = self.__root
+        self.assertIsNotNone(root.child("a"))
+        self.assertIsNone(root.child("ab"))
+        self.assertIsNone(root.child("x"))
+        child = root.child("a")
+        child = child.child("b")
+        child = child.child("b")
+        self.assertIsNone(child.child(""))
+
+    def test_same_as_trie(self):
+        strings = [line.strip() for line in open("../data/mesh.txt", "r", encoding="utf-8") if line.strip()]
+        trie = in3120.Trie.from_strings(strings, self.__normalizer, self.__tokenizer)
+        root = in3120.DoubleArrayTrie.from_trie(trie)
+        self.assertListEqual(list(root), list(trie))
+        for prefix in ["", "a", "ab", "acid", "1,2-", "zz", "日本"]:
+            node1, node2 = trie.consume(prefix), root.consume(prefix)
+            self.assertEqual(node1 is None, node2 is None)
+            if node1:
+                self.assertListEqual(node1.transitions(), node2.transitions())
+                self.assertEqual(node1.is_final(), node2.is_final())
+
+    def test_from_sorted_strings(self):
+        root = in3120.DoubleArrayTrie.from_sorted_strings(["elle", "ellen", "eller", "eller", "hurra for deg"])
+        self.assertListEqual(list(root.strings()), ["elle", "ellen", "eller", "hurra for deg"])
+        node = root.consume("el")
+        self.assertListEqual(list(node), ["le", "len", "ler"])
+        with self.assertRaises(AssertionError):
+            in3120.DoubleArrayTrie.from_sorted_strings(["b", "a"])
+        empty = in3120.DoubleArrayTrie.from_sorted_strings([])
+        self.assertListEqual(list(empty), [])
+        self.assertListEqual(empty.transitions(), [])
+        self.assertIsNone(empty.consume("a"))
+
+    def test_with_meta_data(self):
+        root = in3120.DoubleArrayTrie.from_sorted_strings2([("aleksander", 2104), ("julaften", (24, 12)), ("nei", None)])
+        self.assertFalse(root.has_meta())
+        self.assertFalse(root.consume("aleks").is_final())
+        self.assertIsNone(root.consume("aleks").get_meta())
+        self.assertEqual(root.consume("aleksander").get_meta(), 2104)
+        self.assertEqual(root.consume("julaften").get_meta(), (24, 12))
+        self.assertTrue(root.consume("nei").is_final())
+        self.assertFalse(root.consume("nei").has_meta())
+        with self.assertRaises(AssertionError):
+            in3120.DoubleArrayTrie.from_sorted_strings2([("abba", 74), ("abba", 99)])
+
+    def test_meta_data_must_be_literals(self):
+        metas = [2104, -1.5, "fisk", "", (24, 12), [1, "to"], {"a": (1, 2)}, True]
+        root = in3120.DoubleArrayTrie.from_sorted_strings2((str(i), meta) for i, meta in enumerate(metas))
+        for i, meta in enumerate(metas):
+            self.assertEqual(root[str(i)].get_meta(), meta)
+            self.assertIs(type(root[str(i)].get_meta()), type(meta))
+        with self.assertRaises(ValueError):
+            in3120.DoubleArrayTrie.from_sorted_strings2([("abba", object())])
+
+    def test_write_and_open(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "trie.bin")
+            in3120.DoubleArrayTrie.from_sorted_strings2([("abba", 1), ("abbor", "fisk"), ("ørret", None)]).write(filename)
+            root = in3120.DoubleArrayTrie.open(filename)
+            self.assertListEqual(list(root), ["abba", "abbor", "ørret"])
+            self.assertEqual(root["abbor"].get_meta(), "fisk")
+            self.assertListEqual(root["abb"].transitions(), ["a", "o"])
+            del root
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -49,6 +49,28 @@ class TestEliasGammaCodec(unittest.TestCase):
             with self.assertRaises(ValueError):
                 in3120.EliasGammaCodec.decode(bits)
 
+    def test_write_and_read(self):
+        writer = in3120.BitWriter()
+        for decoded in self._pairs:
+            in3120.EliasGammaCodec.write(decoded, writer)
+        self.assertEqual(len(writer), sum(len(encoded) for encoded in self._pairs.values()))
+        writer.flush()
+        bits = "".join(f"{byte:08b}" for byte in writer.get_buffer())
+        self.assertTrue(bits.startswith("".join(self._pairs.values())))
+        reader = in3120.BitReader(bytes(writer.get_buffer()))
+        for decoded in self._pairs:
+            self.assertEqual(decoded, in3120.EliasGammaCodec.read(reader))
+
+    def test_write_and_read_many(self):
+        numbers = list(range(1, 3000)) + [1 << 40, 1, 1 << 100]
+        writer = in3120.BitWriter()
+        in3120.EliasGammaCodec.write_many(numbers, writer)
+        reader = in3120.BitReader(writer.get_bytes())
+        self.assertListEqual(in3120.EliasGammaCodec.read_many(reader, len(numbers)), numbers)
+        with self.assertRaises(AssertionError):
+            in3120.EliasGammaCodec.write(0, writer)
+
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,121 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=line-too-long
+
+import unittest
+import tracemalloc
+import types
+from context import in3120
+
+
+class TestFMIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+
+    def __process_query_and_verify_winner(self, engine, query, winners, score):
+        options = {"debug": False, "hit_count": 5}
+        matches = list(engine.evaluate(query, options))
+        if winners:
+            self.assertGreaterEqual(len(matches), 1)
+            self.assertLessEqual(len(matches), 5)
+            self.assertIn(matches[0]["document"].document_id, winners)
+            if score:
+                self.assertEqual(matches[0]["score"], score)
+        else:
+            self.assertEqual(len(matches), 0)
+
+    def test_canonicalized_corpus(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"a": "Japanese リンク"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"a": "Cedilla \u0043\u0327 and \u00C7 foo"}))
+        engine = in3120.FMIndex(corpus, ["a"], self.__normalizer, self.__tokenizer)
+        self.__process_query_and_verify_winner(engine, "ﾘﾝｸ", [0], 1)  # Should match "リンク".
+        self.__process_query_and_verify_winner(engine, "\u00C7", [1], 2)  # Should match "\u0043\u0327".
+
+    def test_cran_corpus(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        engine = in3120.FMIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        self.__process_query_and_verify_winner(engine, "visc", [328], 11)
+        self.__process_query_and_verify_winner(engine, "Of  A", [946], 10)
+        self.__process_query_and_verify_winner(engine, "", [], None)
+        self.__process_query_and_verify_winner(engine, "approximate solution", [159, 1374], 3)
+
+    def test_multiple_fields(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"field1": "a b c", "field2": "b c d"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"field1": "x", "field2": "y"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"field1": "y", "field2": "z"}))
+        engine0 = in3120.FMIndex(corpus, ["field1", "field2"], self.__normalizer, self.__tokenizer)
+        engine1 = in3120.FMIndex(corpus, ["field1"], self.__normalizer, self.__tokenizer)
+        engine2 = in3120.FMIndex(corpus, ["field2"], self.__normalizer, self.__tokenizer)
+        self.__process_query_and_verify_winner(engine0, "b c", [0], 2)
+        self.__process_query_and_verify_winner(engine0, "y", [1, 2], 1)
+        self.__process_query_and_verify_winner(engine1, "x", [1], 1)
+        self.__process_query_and_verify_winner(engine1, "y", [2], 1)
+        self.__process_query_and_verify_winner(engine1, "z", [], None)
+        self.__process_query_and_verify_winner(engine2, "z", [2], 1)
+
+    def test_uses_yield(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": "the foo bar"}))
+        engine = in3120.FMIndex(corpus, ["a"], self.__normalizer, self.__tokenizer)
+        matches = engine.evaluate("foo", {})
+        self.assertIsInstance(matches, types.GeneratorType, "Are you using yield?")
+
+    def test_empty_and_identical_documents(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": ""}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"a": "ab ab"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"a": ""}))
+        corpus.add_document(in3120.InMemoryDocument(3, {"a": "ab ab abc"}))
+        corpus.add_document(in3120.InMemoryDocument(4, {"a": "ab ab"}))
+        engine = in3120.FMIndex(corpus, ["a"], self.__normalizer, self.__tokenizer)
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in engine.evaluate("ab", {})], [(3, 3), (1, 2), (4, 2)])
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in engine.evaluate("ab ab", {})], [(3, 2), (1, 1), (4, 1)])
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in engine.evaluate("b", {})], [])
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in engine.evaluate("ab ab ab", {})], [(3, 1)])
+        self.assertListEqual(list(engine.evaluate("ab ab ab ab", {})), [])
+        self.assertListEqual(list(engine.evaluate("x", {})), [])
+        self.assertListEqual(list(in3120.FMIndex(in3120.InMemoryCorpus(), ["a"], self.__normalizer, self.__tokenizer).evaluate("ab", {})), [])
+
+    def test_same_as_suffix_array(self):
+        corpus = in3120.InMemoryCorpus("../data/pantheon.tsv")
+        suffix_array = in3120.SuffixArray(corpus, ["name"], self.__normalizer, self.__tokenizer)
+        engine = in3120.FMIndex(corpus, ["name"], self.__normalizer, self.__tokenizer)
+        for query in ["a", "jo", "john", "of the", "ma", "van d", "zz"]:
+            expected = sorted((m["document"].document_id, m["score"]) for m in suffix_array.evaluate(query, {"hit_count": 100000}))
+            actual = sorted((m["document"].document_id, m["score"]) for m in engine.evaluate(query, {"hit_count": 100000}))
+            self.assertListEqual(actual, expected)
+            options = {"hit_count": 100000, "group_by_continuation": True}
+            self.assertListEqual(list(engine.evaluate(query, options)), list(suffix_array.evaluate(query, options)))
+
+    def test_uses_less_memory_than_suffix_array(self):
+        corpus = in3120.InMemoryCorpus("../data/pantheon.tsv")
+        sizes = []
+        for factory in (in3120.SuffixArray, in3120.FMIndex):
+            tracemalloc.start()
+            engine = factory(corpus, ["name"], self.__normalizer, self.__tokenizer)
+            sizes.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            self.assertIsNotNone(engine)
+        self.assertLess(sizes[1], sizes[0] * 0.6, "Memory usage seems excessive.")
+
+    def test_group_by_continuation(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": "to the best of to the behemoth"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"a": "up to the best"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"a": "to the be"}))
+        corpus.add_document(in3120.InMemoryDocument(3, {"a": "onto the bestiary"}))
+        engine = in3120.FMIndex(corpus, ["a"], self.__normalizer, self.__tokenizer)
+        options = {"group_by_continuation": True}
+        self.assertListEqual(list(engine.evaluate("to the be", options)),
+                             [{"score": 2, "continuation": "to the best"}, {"score": 1, "continuation": "to the be"}, {"score": 1, "continuation": "to the behemoth"}])
+        self.assertListEqual(list(engine.evaluate("the best", options)), [{"score": 2, "continuation": "the best"}, {"score": 1, "continuation": "the bestiary"}])
+        self.assertListEqual(list(engine.evaluate("to the be", {"group_by_continuation": True, "hit_count": 1})), [{"score": 2, "continuation": "to the best"}])
+        self.assertListEqual(list(engine.evaluate("xyz", options)), [])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
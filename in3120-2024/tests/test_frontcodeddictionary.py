@@ -0,0 +1,61 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+from context import in3120
+
+
+class TestFrontCodedDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self._terms = ["automata", "automate", "automatic", "automation", "auto", "autonomy", "bar", "foo",
+                       "foobar", "æøå", "æøåæøå", "日本", "日本語", "x" * 300, "x" * 299 + "y", ""]
+
+    def test_access_vocabulary(self):
+        vocabulary = in3120.FrontCodedDictionary([("foo", 0), ("bar", 1)])
+        self.assertEqual(len(vocabulary), 2)
+        self.assertEqual(vocabulary.size(), 2)
+        self.assertEqual(vocabulary.get_term_id("foo"), 0)
+        self.assertEqual(vocabulary.get_term_id("bar"), 1)
+        self.assertEqual(vocabulary["bar"], 1)
+        self.assertIn("bar", vocabulary)
+        self.assertNotIn("wtf", vocabulary)
+        self.assertIsNone(vocabulary.get_term_id("wtf"))
+        self.assertListEqual(list(vocabulary), [("bar", 1), ("foo", 0)])
+
+    def test_same_as_in_memory_dictionary(self):
+        dictionary = in3120.InMemoryDictionary()
+        for term in self._terms:
+            dictionary.add_if_absent(term)
+        for block_size in (1, 2, 3, 16):
+            vocabulary = in3120.FrontCodedDictionary(dictionary, block_size)
+            self.assertEqual(len(vocabulary), len(dictionary))
+            self.assertListEqual(list(vocabulary), sorted(dictionary))
+            for term in self._terms + ["a", "autom", "automatix", "zzz", "日", "x" * 301]:
+                self.assertEqual(vocabulary.get_term_id(term), dictionary.get_term_id(term))
+
+    def test_add_in_sorted_order(self):
+        vocabulary = in3120.FrontCodedDictionary(block_size=4)
+        for i, term in enumerate(sorted(self._terms)):
+            self.assertEqual(vocabulary.add_if_absent(term), i)
+        self.assertEqual(vocabulary.add_if_absent("foo"), sorted(self._terms).index("foo"))
+        with self.assertRaises(AssertionError):
+            vocabulary.add_if_absent("abc")
+        self.assertListEqual([term for term, _ in vocabulary], sorted(self._terms))
+
+    def test_index_with_front_coded_dictionary(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, dictionary_factory=in3120.FrontCodedDictionary)
+        self.assertIsInstance(index2._dictionary, in3120.FrontCodedDictionary)  # pylint: disable=protected-access
+        self.assertListEqual(sorted(index1.get_indexed_terms()), list(index2.get_indexed_terms()))
+        for term in ["of", "flow", "boundary", "wing", "xyzzy"]:
+            self.assertListEqual([p.document_id for p in index1[term]], [p.document_id for p in index2[term]])
+        self.assertLess(index2._dictionary.get_memory_usage(), len(index2._dictionary) * 20)  # pylint: disable=protected-access
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -30,6 +30,9 @@ class TestInMemoryInvertedIndexWithCompression(unittest.TestCase):
     def test_multiple_fields(self):
         self._tester.test_multiple_fields()
 
+    def test_parallel_build(self):
+        self._tester.test_parallel_build()
+
     def test_memory_usage(self):
         corpus = in3120.InMemoryCorpus("../data/cran.xml")
         tracemalloc.start()
@@ -48,7 +51,17 @@ class TestInMemoryInvertedIndexWithCompression(unittest.TestCase):
             if statistic.traceback[0].filename == inspect.getfile(in3120.InMemoryInvertedIndex):
                 size_compressed = statistic.size_diff
         compression_ratio = size_uncompressed / size_compressed
-        self.assertGreater(compression_ratio, 13)
+        self.assertGreater(compression_ratio, 12)  # Postings use slots, so the uncompressed index is leaner than it once was.
+
+    def test_memory_statistics(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index_uncompressed = in3120.InMemoryInvertedIndex(corpus, ["body"], self._tester._normalizer, self._tester._tokenizer, False)
+        index_compressed = in3120.InMemoryInvertedIndex(corpus, ["body"], self._tester._normalizer, self._tester._tokenizer, True)
+        statistics_uncompressed = index_uncompressed.get_memory_statistics()
+        statistics_compressed = index_compressed.get_memory_statistics()
+        self.assertEqual(statistics_uncompressed["terms"], statistics_compressed["terms"])
+        self.assertEqual(statistics_uncompressed["postings"], statistics_compressed["postings"])
+        self.assertGreater(statistics_uncompressed["bytes_per_posting"], 5 * statistics_compressed["bytes_per_posting"])
 
 
 if __name__ == '__main__':
@@ -58,6 +58,17 @@ class TestInMemoryInvertedIndexWithoutCompression(unittest.TestCase):
         self.assertEqual(posting.document_id, 0)
         self.assertEqual(posting.term_frequency, 5)
 
+    def test_parallel_build(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed, 3)
+        terms = list(index1.get_indexed_terms())
+        self.assertListEqual(terms, list(index2.get_indexed_terms()))
+        for term in terms:
+            postings1 = [(p.document_id, p.term_frequency) for p in index1[term]]
+            postings2 = [(p.document_id, p.term_frequency) for p in index2[term]]
+            self.assertListEqual(postings1, postings2)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
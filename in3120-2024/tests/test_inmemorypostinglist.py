@@ -43,9 +43,34 @@ class TestInMemoryPostingList(unittest.TestCase):
             with self.assertRaises(AssertionError):
                 postings.append_posting(in3120.Posting(21 - i, 2))
 
+    def _test_advance_to(self, postings: in3120.PostingList):
+        document_ids = list(range(3, 3000, 3))
+        for document_id in document_ids:
+            postings.append_posting(in3120.Posting(document_id, document_id % 5 + 1))
+        postings.finalize_postings()
+        iterator = iter(postings)
+        posting = iterator.advance_to(0)
+        self.assertEqual(posting.document_id, 3)
+        posting = iterator.advance_to(3)
+        self.assertEqual(posting.document_id, 6)  # Never goes backwards.
+        posting = iterator.advance_to(1000)
+        self.assertEqual(posting.document_id, 1002)
+        self.assertEqual(posting.term_frequency, 1002 % 5 + 1)
+        self.assertEqual(next(iterator).document_id, 1005)
+        posting = iterator.advance_to(2997)
+        self.assertEqual(posting.document_id, 2997)
+        self.assertIsNone(iterator.advance_to(2998))
+        self.assertIsNone(next(iterator, None))
+        for target in (1, 500, 1501, 2996):
+            self.assertEqual(iter(postings).advance_to(target).document_id, (target + 2) // 3 * 3)
+        self.assertListEqual([p.document_id for p in postings], document_ids)
+
     def test_append_and_iterate(self):
         self._test_append_and_iterate(in3120.InMemoryPostingList())
 
+    def test_advance_to(self):
+        self._test_advance_to(in3120.InMemoryPostingList())
+
     def test_invalid_append(self):
         self._test_invalid_append(in3120.InMemoryPostingList())
 
@@ -0,0 +1,107 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=line-too-long
+
+import os
+import tempfile
+import unittest
+from context import in3120
+
+
+class TestMemoryMappedInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._normalizer = in3120.SimpleNormalizer()
+        self._tokenizer = in3120.SimpleTokenizer()
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._filename = os.path.join(self._directory.name, "index.bin")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _round_trip(self, corpus, fields):
+        index = in3120.InMemoryInvertedIndex(corpus, fields, self._normalizer, self._tokenizer)
+        in3120.MemoryMappedInvertedIndex.write(index, self._filename)
+        return index, in3120.MemoryMappedInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+
+    def test_access_postings(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test TEST prØve"}))
+        _, index = self._round_trip(corpus, ["body"])
+        self.assertListEqual(list(index.get_terms("PRøvE wtf tesT")), ["prøve", "wtf", "test"])
+        self.assertListEqual(list(index.get_indexed_terms()), ["a", "is", "prøve", "test", "this"])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["prøve"]], [(1, 1)])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["this"]], [(0, 1)])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index.get_postings_iterator("wtf")], [])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["test"]], [(0, 1), (1, 2)])
+        self.assertEqual(index.get_document_frequency("wtf"), 0)
+        self.assertEqual(index.get_document_frequency("prøve"), 1)
+        self.assertEqual(index.get_document_frequency("test"), 2)
+        self.assertEqual(index.get_collection_frequency("test"), 3)
+        self.assertTrue("test" in index)
+        self.assertFalse("tes" in index)
+
+    def test_empty_index(self):
+        _, index = self._round_trip(in3120.InMemoryCorpus(), ["body"])
+        self.assertListEqual(list(index.get_indexed_terms()), [])
+        self.assertEqual(index.get_document_frequency("foo"), 0)
+        self.assertListEqual(list(index["foo"]), [])
+
+    def test_not_an_index(self):
+        with open(self._filename, "wb") as file:
+            file.write(b"\0" * 100)
+        with self.assertRaises(IOError):
+            in3120.MemoryMappedInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+
+    def test_empty_and_outdated_files(self):
+        with open(self._filename, "wb") as file:
+            pass
+        with self.assertRaises(IOError):
+            in3120.MemoryMappedInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+        with open(self._filename, "wb") as file:
+            file.write(b"IN3120I\0" + b"\0" * 100)
+        with self.assertRaises(IOError):
+            in3120.MemoryMappedInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+
+    def test_close(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a test"}))
+        in3120.MemoryMappedInvertedIndex.write(in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer), self._filename)
+        with in3120.MemoryMappedInvertedIndex(self._filename, self._normalizer, self._tokenizer) as index:
+            self.assertListEqual([p.document_id for p in index["test"]], [0])
+        with self.assertRaises(ValueError):
+            index.get_document_frequency("test")
+        os.remove(self._filename)
+
+    def test_cran_corpus_round_trip(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        original, index = self._round_trip(corpus, ["body"])
+        terms = sorted(original.get_indexed_terms())
+        self.assertListEqual(list(index.get_indexed_terms()), terms)
+        for term in terms:
+            self.assertEqual(index.get_document_frequency(term), original.get_document_frequency(term))
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index[term]],
+                                 [(p.document_id, p.term_frequency) for p in original[term]])
+
+    def test_long_posting_lists_are_blocked(self):
+        corpus = in3120.InMemoryCorpus()
+        for document_id in range(5000):
+            corpus.add_document(in3120.InMemoryDocument(document_id, {"body": "common" + (" rare" if document_id % 1000 == 7 else "")}))
+        _, index = self._round_trip(corpus, ["body"])
+        iterator = index.get_postings_iterator("common")
+        self.assertEqual(iterator.advance_to(4321).document_id, 4321)
+        self.assertListEqual([p.document_id for p in iterator], list(range(4322, 5000)))
+        self.assertListEqual([p.document_id for p in index["rare"]], [7, 1007, 2007, 3007, 4007])
+
+    def test_boolean_search_engine(self):
+        corpus = in3120.InMemoryCorpus("../data/names.txt")
+        _, index = self._round_trip(corpus, ["body"])
+        engine = in3120.BooleanSearchEngine(corpus, index)
+        results = list(engine.evaluate("OR(AND(mary, smith), AND(OR(peter, xzyds), lee))", {}))
+        self.assertListEqual([m["document"].document_id for m in results], [849, 1356, 2452, 4543])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,76 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import pickle
+import unittest
+from context import in3120
+
+
+class TestPerfectHashDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self._terms = ["automata", "automate", "automatic", "automation", "auto", "autonomy", "bar", "foo",
+                       "foobar", "æøå", "æøåæøå", "日本", "日本語", "x" * 300, "x" * 299 + "y", ""]
+
+    def test_access_vocabulary(self):
+        vocabulary = in3120.PerfectHashDictionary([("foo", 0), ("bar", 1)])
+        self.assertEqual(len(vocabulary), 2)
+        self.assertEqual(vocabulary.size(), 2)
+        self.assertEqual(vocabulary.get_term_id("foo"), 0)
+        self.assertEqual(vocabulary.get_term_id("bar"), 1)
+        self.assertEqual(vocabulary["bar"], 1)
+        self.assertIn("bar", vocabulary)
+        self.assertEqual(vocabulary.add_if_absent("foo"), 0)
+
+    def test_empty_vocabulary(self):
+        vocabulary = in3120.PerfectHashDictionary([])
+        self.assertEqual(len(vocabulary), 0)
+        self.assertIsNone(vocabulary.get_term_id("foo"))
+
+    def test_same_as_in_memory_dictionary(self):
+        dictionary = in3120.InMemoryDictionary()
+        for term in self._terms + [f"term{i}" for i in range(5000)]:
+            dictionary.add_if_absent(term)
+        vocabulary = in3120.PerfectHashDictionary(dictionary)
+        self.assertEqual(len(vocabulary), len(dictionary))
+        for term, term_id in dictionary:
+            self.assertEqual(vocabulary.get_term_id(term), term_id)
+        self.assertListEqual(list(vocabulary), sorted(dictionary))
+        unknown = [f"unknown{i}" for i in range(5000)]
+        self.assertLess(sum(vocabulary.get_term_id(term) is not None for term in unknown), 5)
+        self.assertLess(vocabulary.get_memory_usage(), sum(len(term.encode("utf-8")) + 10 for term, _ in dictionary))
+
+    def test_tiny_vocabularies(self):
+        for size in range(1, 50):
+            vocabulary = in3120.PerfectHashDictionary((f"t{size}-{i}", i) for i in range(size))
+            for i in range(size):
+                self.assertEqual(vocabulary.get_term_id(f"t{size}-{i}"), i)
+
+    def test_frozen_vocabulary(self):
+        vocabulary = in3120.PerfectHashDictionary([("foo", 0), ("bar", 1)])
+        with self.assertRaises(AssertionError):
+            vocabulary.add_if_absent("wtf")
+        with self.assertRaises(TypeError):
+            pickle.dumps(vocabulary)
+
+    def test_duplicate_terms(self):
+        with self.assertRaises(AssertionError):
+            in3120.PerfectHashDictionary([("foo", 0), ("bar", 1), ("foo", 2)])
+
+    def test_index_with_perfect_hash_dictionary(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, dictionary_factory=in3120.PerfectHashDictionary)
+        self.assertIsInstance(index2._dictionary, in3120.PerfectHashDictionary)  # pylint: disable=protected-access
+        for term in ["of", "flow", "boundary", "wing", "xyzzy"]:
+            self.assertEqual(index1.get_document_frequency(term), index2.get_document_frequency(term))
+            self.assertListEqual([p.document_id for p in index1[term]], [p.document_id for p in index2[term]])
+        self.assertListEqual(sorted(index1.get_indexed_terms()), sorted(index2.get_indexed_terms()))
+        self.assertEqual(len(repr(index1)), len(repr(index2)))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,47 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import random
+import unittest
+from context import in3120
+
+
+class TestPForDeltaCodec(unittest.TestCase):
+
+    def _test_round_trip(self, numbers):
+        data = bytearray(b"\xff")  # Make sure we respect the start offset.
+        size = in3120.PForDeltaCodec.encode(numbers, data)
+        self.assertEqual(len(data), size + 1)
+        self.assertEqual(in3120.PForDeltaCodec.decode(bytes(data), 1), (list(numbers), size))
+        return size
+
+    def test_encode_and_decode(self):
+        self._test_round_trip([21, 4, 70, 0, 127, 128, 512, 999, 214577, 134217728])
+        self._test_round_trip([0])
+        self._test_round_trip([7] * 256)
+        self._test_round_trip([(1 << 32) - 1, 0])
+        rng = random.Random(1234)
+        for _ in range(100):
+            numbers = [rng.randrange(1 << rng.randint(1, 20)) for _ in range(rng.randint(1, 256))]
+            self._test_round_trip(numbers)
+
+    def test_exceptions(self):
+        # The outliers shouldn't force wide slots onto everything else.
+        numbers = [1, 2, 3] * 42 + [100000, 3]
+        self.assertLess(self._test_round_trip(numbers), 64)
+        self.assertEqual(self._test_round_trip([5] * 128), 8)
+
+    def test_invalid_blocks(self):
+        with self.assertRaises(AssertionError):
+            in3120.PForDeltaCodec.encode([], bytearray())
+        with self.assertRaises(AssertionError):
+            in3120.PForDeltaCodec.encode([1] * 257, bytearray())
+        with self.assertRaises(AssertionError):
+            in3120.PForDeltaCodec.encode([3, -1], bytearray())
+        with self.assertRaises(AssertionError):
+            in3120.PForDeltaCodec.encode([3], None)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,54 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=protected-access
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestPForDeltaPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+
+    def test_append_and_iterate(self):
+        self._tester._test_append_and_iterate(in3120.PForDeltaPostingList())
+
+    def test_invalid_append(self):
+        self._tester._test_invalid_append(in3120.PForDeltaPostingList())
+
+    def test_advance_to(self):
+        self._tester._test_advance_to(in3120.PForDeltaPostingList())
+
+    def test_iterate_before_finalizing(self):
+        posting_list = in3120.PForDeltaPostingList()
+        postings = [(document_id, document_id % 7 + 1) for document_id in range(1, 1000, 3)]
+        for document_id, term_frequency in postings:
+            posting_list.append_posting(in3120.Posting(document_id, term_frequency))
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in posting_list], postings)
+        posting_list.finalize_postings()
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in posting_list], postings)
+        with self.assertRaises(AssertionError):
+            posting_list.append_posting(in3120.Posting(2000, 1))
+
+    def test_index_equivalence(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, posting_list_factory=in3120.PForDeltaPostingList)
+        for term in ["of", "flow", "boundary", "wing", "xyzzy"]:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+        self.assertEqual(index1.get_memory_statistics()["postings"], index2.get_memory_statistics()["postings"])
+        for term in ["of", "flow", "boundary"]:
+            posting_list1 = index1._posting_lists[index1._dictionary.get_term_id(term)]
+            posting_list2 = index2._posting_lists[index2._dictionary.get_term_id(term)]
+            self.assertGreater(posting_list1.get_memory_usage(), posting_list2.get_memory_usage())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
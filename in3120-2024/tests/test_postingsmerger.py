@@ -57,13 +57,70 @@ class TestPostingsMerger(unittest.TestCase):
         self.assertListEqual(result1, [2, 6])
         self.assertListEqual(result2, [1, 2, 3, 6])
 
+    def test_intersection_many(self):
+        postings1 = [in3120.Posting(1, 1), in3120.Posting(2, 1), in3120.Posting(3, 1), in3120.Posting(9, 1)]
+        postings2 = [in3120.Posting(2, 2), in3120.Posting(3, 2), in3120.Posting(6, 2), in3120.Posting(9, 2)]
+        postings3 = [in3120.Posting(3, 3), in3120.Posting(4, 3), in3120.Posting(9, 3)]
+        result = list(self._merger.intersection_many([iter(postings1), iter(postings2), iter(postings3)]))
+        self.assertListEqual([p.document_id for p in result], [3, 9])
+        self.assertListEqual([p.term_frequency for p in result], [1, 1])
+        self.assertListEqual([p.document_id for p in self._merger.intersection_many([iter(postings2)])], [2, 3, 6, 9])
+        self.assertListEqual(list(self._merger.intersection_many([iter(postings1), iter([]), iter(postings3)])), [])
+        self.assertListEqual(list(self._merger.intersection_many([])), [])
+
+    def test_intersection_many_matches_chained_intersections(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        for compressed in (False, True):
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, compressed)
+            for terms in (["transonic", "flow", "of"], ["wing", "body", "the", "a"], ["boundary", "layer", "flow", "xyzzy"]):
+                terms = sorted(terms, key=index.get_document_frequency)
+                chained = index[terms[0]]
+                for term in terms[1:]:
+                    chained = self._merger.intersection(chained, index[term])
+                expected = [p.document_id for p in chained]
+                logged = in3120.AccessLoggedInvertedIndex(index)
+                result = [p.document_id for p in self._merger.intersection_many([logged[term] for term in terms])]
+                self.assertListEqual(result, expected)
+                self.assertLess(len(logged.get_history()), sum(index.get_document_frequency(term) for term in terms))
+
+    def test_intersection_many_skips_clustered_lists(self):
+        lists = []
+        for document_ids in (range(0, 20000, 2), range(0, 30000, 3), range(9000, 9100)):
+            posting_list = in3120.ArrayPostingList()
+            for document_id in document_ids:
+                posting_list.append_posting(in3120.Posting(document_id, 1))
+            posting_list.finalize_postings()
+            lists.append(posting_list)
+        history = []
+        iterators = [in3120.AccessLoggedInvertedIndex.AccessLoggedIterator(str(i), history, posting_list.get_iterator()) for i, posting_list in enumerate(lists)]
+        result = [p.document_id for p in self._merger.intersection_many(iterators)]
+        self.assertListEqual(result, list(range(9000, 9100, 6)))
+        self.assertLess(len(history), 200)  # A chain of pairwise intersections would step through 1500 documents.
+
+    def test_union_many(self):
+        postings1 = [in3120.Posting(1, 1), in3120.Posting(3, 1), in3120.Posting(9, 1)]
+        postings2 = [in3120.Posting(2, 2), in3120.Posting(3, 2), in3120.Posting(6, 2)]
+        postings3 = [in3120.Posting(3, 3), in3120.Posting(6, 3), in3120.Posting(10, 3)]
+        result = list(self._merger.union_many([iter(postings1), iter(postings2), iter(postings3)]))
+        self.assertListEqual([p.document_id for p in result], [1, 2, 3, 6, 9, 10])
+        self.assertListEqual([p.term_frequency for p in result], [1, 2, 1, 2, 1, 3])  # The first posting list wins.
+        chained = self._merger.union(self._merger.union(iter(postings1), iter(postings2)), iter(postings3))
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in result],
+                             [(p.document_id, p.term_frequency) for p in chained])
+        self.assertListEqual([p.document_id for p in self._merger.union_many([iter([]), iter(postings2), iter([])])], [2, 3, 6])
+        self.assertListEqual(list(self._merger.union_many([])), [])
+
     def test_uses_yield(self):
         postings1 = [in3120.Posting(1, 0), in3120.Posting(2, 0), in3120.Posting(3, 0)]
         postings2 = [in3120.Posting(2, 0), in3120.Posting(3, 0), in3120.Posting(6, 0)]
         result1 = self._merger.intersection(iter(postings1), iter(postings2))
         result2 = self._merger.union(iter(postings1), iter(postings2))
         result3 = self._merger.difference(iter(postings1), iter(postings2))
-        for result in (result1, result2, result3):
+        result4 = self._merger.intersection_many([iter(postings1), iter(postings2)])
+        result5 = self._merger.union_many([iter(postings1), iter(postings2)])
+        for result in (result1, result2, result3, result4, result5):
             self.assertIsInstance(result, types.GeneratorType, "Are you using yield?")
 
     def _process_query_with_two_terms(self, corpus, index, query, operator, expected):
@@ -89,6 +146,22 @@ class TestPostingsMerger(unittest.TestCase):
     def test_uncompressed_mesh_corpus(self):
         self._test_mesh_corpus(False)
 
+    def test_skips_ahead(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        for compressed in (False, True):
+            inner = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, compressed)
+            index = in3120.AccessLoggedInvertedIndex(inner)
+            rare, common = index["transonic"], index["of"]
+            result1 = [p.document_id for p in self._merger.intersection(rare, common)]
+            result2 = [p.document_id for p in self._merger.intersection(iter(list(inner["transonic"])), iter(list(inner["of"])))]
+            result3 = [p.document_id for p in self._merger.difference(index["transonic"], index["of"])]
+            self.assertListEqual(result1, result2)
+            self.assertListEqual(sorted(result1 + result3), [p.document_id for p in inner["transonic"]])
+            accesses = sum(1 for term, _ in index.get_history() if term == "of")
+            self.assertLess(accesses, inner.get_document_frequency("of") // 4)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
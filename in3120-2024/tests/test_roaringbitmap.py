@@ -0,0 +1,85 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import random
+import unittest
+from context import in3120
+
+
+class TestRoaringBitmap(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1234)
+        # Mix sparse and dense chunks, so that both container representations get exercised.
+        self._values1 = sorted(set(rng.sample(range(200000), 3000) + list(range(70000, 80000, 2))))
+        self._values2 = sorted(set(rng.sample(range(200000), 3000) + list(range(65536, 131072, 3))))
+
+    def test_append_and_iterate(self):
+        bitmap = in3120.RoaringBitmap(self._values1)
+        self.assertEqual(len(bitmap), len(self._values1))
+        self.assertListEqual(list(bitmap), self._values1)
+        self.assertListEqual(list(bitmap.iterate(75001)), [v for v in self._values1 if v >= 75001])
+        self.assertListEqual(list(bitmap.iterate(1 << 20)), [])
+        self.assertListEqual(list(in3120.RoaringBitmap()), [])
+
+    def test_invalid_append(self):
+        bitmap = in3120.RoaringBitmap()
+        bitmap.append(7)
+        with self.assertRaises(AssertionError):
+            bitmap.append(7)
+        with self.assertRaises(AssertionError):
+            bitmap.append(3)
+        with self.assertRaises(AssertionError):
+            bitmap.append(-1)
+
+    def test_contains_and_rank(self):
+        bitmap = in3120.RoaringBitmap(self._values1)
+        values = set(self._values1)
+        for value in list(range(0, 200000, 997)) + self._values1[::101]:
+            self.assertEqual(value in bitmap, value in values)
+            self.assertEqual(bitmap.rank(value), sum(1 for v in self._values1 if v < value))
+
+    def test_ranker(self):
+        bitmap = in3120.RoaringBitmap(self._values1)
+        rank = bitmap.get_ranker()
+        values = set(self._values1)
+        for value in list(range(200000, 0, -997)) + self._values1[::101] + list(range(70000, 70200)):
+            self.assertEqual(rank(value), bitmap.rank(value) if value in values else -1)
+        self.assertEqual(in3120.RoaringBitmap().get_ranker()(5), -1)
+
+    def test_set_operations(self):
+        bitmap1 = in3120.RoaringBitmap(self._values1)
+        bitmap2 = in3120.RoaringBitmap(self._values2)
+        set1, set2 = set(self._values1), set(self._values2)
+        self.assertListEqual(list(bitmap1 & bitmap2), sorted(set1 & set2))
+        self.assertListEqual(list(bitmap1 | bitmap2), sorted(set1 | set2))
+        self.assertListEqual(list(bitmap1 - bitmap2), sorted(set1 - set2))
+        self.assertListEqual(list(bitmap2 - bitmap1), sorted(set2 - set1))
+        self.assertEqual(len(bitmap1 | bitmap2), len(set1 | set2))
+
+    def test_results_do_not_share_containers(self):
+        bitmap1 = in3120.RoaringBitmap([1])
+        bitmap2 = in3120.RoaringBitmap([70000])
+        union = bitmap1 | bitmap2
+        union.append(70001)
+        difference = bitmap2 - bitmap1
+        difference.append(70005)
+        self.assertListEqual(list(bitmap1), [1])
+        self.assertListEqual(list(bitmap2), [70000])
+        self.assertListEqual(list(union), [1, 70000, 70001])
+        self.assertListEqual(list(difference), [70000, 70005])
+
+    def test_iterate_dense_containers(self):
+        values = [v for v in range(0, 3 << 16) if v % 7 and v % 11] + [(3 << 16) + 65535]
+        bitmap = in3120.RoaringBitmap(values)
+        for start in (0, 1, 63, 64, 65, 65535, 65536, 100000, 3 << 16, (3 << 16) + 65535, 1 << 20):
+            self.assertListEqual(list(bitmap.iterate(start)), [v for v in values if v >= start])
+
+    def test_memory_usage(self):
+        dense = in3120.RoaringBitmap(range(0, 1 << 16))
+        self.assertLess(dense.get_memory_usage(), 10000)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
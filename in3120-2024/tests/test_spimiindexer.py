@@ -0,0 +1,52 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=line-too-long
+
+import os
+import tempfile
+import unittest
+from context import in3120
+
+
+class TestSpimiIndexer(unittest.TestCase):
+
+    def setUp(self):
+        self._normalizer = in3120.SimpleNormalizer()
+        self._tokenizer = in3120.SimpleTokenizer()
+
+    def _build(self, corpus, memory_budget):
+        indexer = in3120.SpimiIndexer(self._normalizer, self._tokenizer, memory_budget)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "index.bin")
+            blocks = indexer.build(corpus, ["body"], filename)
+            self.assertListEqual(os.listdir(directory), ["index.bin"])
+            index = in3120.MemoryMappedInvertedIndex(filename, self._normalizer, self._tokenizer)
+            records = [(term, [(p.document_id, p.term_frequency) for p in index[term]]) for term in index.get_indexed_terms()]
+        return blocks, records
+
+    def test_single_block(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test TEST prØve"}))
+        blocks, records = self._build(corpus, 1000000)
+        self.assertEqual(blocks, 1)
+        self.assertListEqual(records, [("a", [(0, 1)]), ("is", [(0, 1)]), ("prøve", [(1, 1)]), ("test", [(0, 1), (1, 2)]), ("this", [(0, 1)])])
+
+    def test_empty_corpus(self):
+        blocks, records = self._build(in3120.InMemoryCorpus(), 1000)
+        self.assertEqual(blocks, 1)
+        self.assertListEqual(records, [])
+
+    def test_multiple_blocks_match_in_memory_index(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        blocks, records = self._build(corpus, 100000)
+        self.assertGreater(blocks, 10)
+        self.assertListEqual([term for term, _ in records], sorted(index.get_indexed_terms()))
+        for term, postings in records:
+            self.assertListEqual(postings, [(p.document_id, p.term_frequency) for p in index[term]])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -181,6 +181,82 @@ class TestStringFinder(unittest.TestCase):
         self.assertListEqual(results, [{'surface': 'neEdle', 'span': (8, 14), 'match': 'needle', 'meta': None},
                                        {'surface': 'banana', 'span': (53, 59), 'match': 'banana', 'meta': None}])
 
+    def test_partial_matches_do_not_skip_tokens(self):
+        trie = in3120.Trie.from_strings(["a b", "a c", "health services"], self.__normalizer, self.__tokenizer)
+        for compiled in [False, True]:
+            finder = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer, compiled)
+            self.__simple_verify(finder, "a b c", [("a b", "a b")])
+            self.__simple_verify(finder, "health care services", [])
+
+    def test_compiled_automaton_gives_same_matches(self):
+        strings = ["romerike", "apple computer", "norsk", "norsk ørret", "sverige", "ørret", "banan", "a", "a b", "b", "a b c", "b c d"]
+        trie = in3120.Trie.from_strings2(((s, s.upper()) for s in strings), self.__normalizer, self.__tokenizer)
+        finder1 = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer)
+        finder2 = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer, compiled=True)
+        for buffer in ["en Norsk     ØRRET fra romerike likte abba fra Sverige", "a a b", "a b c d e", "", "a b a b c d", "b c a b c d"]:
+            for _ in range(2):
+                self.assertListEqual(list(finder1.scan(buffer)), list(finder2.scan(buffer)))
+        self.__simple_verify(finder2, "a b c d", [("a", "a"), ("a b", "a b"), ("b", "b"), ("a b c", "a b c"), ("b c d", "b c d")])
+        mesh = in3120.InMemoryCorpus("../data/mesh.txt")
+        cran = in3120.InMemoryCorpus("../data/cran.xml")
+        trie = in3120.Trie.from_strings((d["body"] or "" for d in mesh), self.__normalizer, self.__tokenizer)
+        finder1 = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer)
+        finder2 = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer, compiled=True)
+        for document in cran:
+            self.assertListEqual(list(finder1.scan(document["body"])), list(finder2.scan(document["body"])))
+
+    def test_compiled_automaton_does_not_grow_with_text(self):
+        trie = in3120.Trie.from_strings(["a b", "b c", "c"], self.__normalizer, self.__tokenizer)
+        finder = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer, compiled=True)
+        self.assertEqual(len(list(finder.scan("x a x b a b c c"))), 4)
+        sizes = [len(cache) for cache in finder._StringFinder__transitions + finder._StringFinder__gotos]  # pylint: disable=protected-access
+        self.assertEqual(len(list(finder.scan(" ".join(f"x{i} a x{i} b a b c c{i}" for i in range(1000))))), 3000)
+        self.assertListEqual([len(cache) for cache in finder._StringFinder__transitions + finder._StringFinder__gotos], sizes)  # pylint: disable=protected-access
+
+    def test_leftmost_match_modes(self):
+        strings = ["a", "a b", "a b c", "b c d", "c", "c d e f", "d e"]
+        trie = in3120.Trie.from_strings(strings, self.__normalizer, self.__tokenizer)
+        for compiled in [False, True]:
+            finder = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer, compiled)
+            self.assertListEqual([m["match"] for m in finder.scan("a b c d e f", "leftmost_longest")], ["a b c", "d e"])
+            self.assertListEqual([m["match"] for m in finder.scan("a b c d e f", "leftmost_first")], ["a", "b c d"])
+            self.assertListEqual([m["match"] for m in finder.scan("x b c d e f c", "leftmost_longest")], ["b c d", "c"])
+            self.assertListEqual([m["match"] for m in finder.scan("c d e x", "leftmost_longest")], ["c", "d e"])
+            self.assertListEqual([m["span"] for m in finder.scan("A  b C", "leftmost_longest")], [(0, 6)])
+            self.assertListEqual(list(finder.scan("", "leftmost_first")), [])
+            with self.assertRaises(AssertionError):
+                list(finder.scan("a b c", "rightmost"))
+
+    def test_scan_corpus(self):
+        corpus = in3120.InMemoryCorpus()
+        for i in range(50):
+            corpus.add_document(in3120.InMemoryDocument(i, {"a": f"Norsk ørret {i}", "b": "fra sverige" if i % 3 else ""}))
+        trie = in3120.Trie.from_strings2([("norsk ørret", 1), ("ørret fra", 2), ("sverige", 3), ("7", 4)], self.__normalizer, self.__tokenizer)
+        for compiled in [False, True]:
+            finder = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer, compiled)
+            for mode in ["all", "leftmost_longest"]:
+                expected = [(d.document_id, list(finder.scan(d["a"] + " " + d["b"], mode))) for d in corpus]
+                self.assertListEqual(list(finder.scan_corpus(corpus, ["a", "b"], mode)), expected)
+                self.assertListEqual(list(finder.scan_corpus(corpus, ["a", "b"], mode, workers=2, batch_size=3)), expected)
+        self.assertListEqual(list(finder.scan_corpus(in3120.InMemoryCorpus(), ["a"], workers=2)), [])
+        self.assertListEqual(list(finder.scan_corpus(corpus, ["c"]))[:2], [(0, []), (1, [])])
+
+    def test_leftmost_match_modes_same_as_filtering(self):
+        mesh = in3120.InMemoryCorpus("../data/mesh.txt")
+        cran = in3120.InMemoryCorpus("../data/cran.xml")
+        trie = in3120.Trie.from_strings((d["body"] or "" for d in mesh), self.__normalizer, self.__tokenizer)
+        for compiled in [False, True]:
+            finder = in3120.StringFinder(trie, self.__normalizer, self.__tokenizer, compiled)
+            for document in list(cran)[:200]:
+                matches = list(finder.scan(document["body"]))
+                for mode, longest in [("leftmost_longest", True), ("leftmost_first", False)]:
+                    expected, done = [], 0
+                    for match in sorted(matches, key=lambda m, longest=longest: (m["span"][0], -m["span"][1] if longest else m["span"][1])):
+                        if match["span"][0] >= done:
+                            expected.append(match)
+                            done = match["span"][1]
+                    self.assertListEqual(list(finder.scan(document["body"], mode)), expected)
+
     def test_relative_insensitivity_to_dictionary_size(self):
         mesh = in3120.InMemoryCorpus("../data/mesh.txt")  # Contains more than 25K strings, including "medulla oblongata".
         trie1 = in3120.Trie.from_strings(["medulla oblongata"], self.__normalizer, self.__tokenizer)
@@ -83,6 +83,63 @@ class TestSuffixArray(unittest.TestCase):
         matches = engine.evaluate("foo", {})
         self.assertIsInstance(matches, types.GeneratorType, "Are you using yield?")
 
+    def test_empty_and_identical_documents(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": ""}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"a": "ab ab"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"a": ""}))
+        corpus.add_document(in3120.InMemoryDocument(3, {"a": "ab ab abc"}))
+        corpus.add_document(in3120.InMemoryDocument(4, {"a": "ab ab"}))
+        engine = in3120.SuffixArray(corpus, ["a"], self.__normalizer, self.__tokenizer)
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in engine.evaluate("ab", {})], [(3, 3), (1, 2), (4, 2)])
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in engine.evaluate("ab ab", {})], [(3, 2), (1, 1), (4, 1)])
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in engine.evaluate("b", {})], [])
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in engine.evaluate("ab ab ab", {})], [(3, 1)])
+        self.assertListEqual(list(engine.evaluate("ab ab ab ab", {})), [])
+        self.assertListEqual(list(in3120.SuffixArray(in3120.InMemoryCorpus(), ["a"], self.__normalizer, self.__tokenizer).evaluate("ab", {})), [])
+
+    def test_scores_are_occurrence_counts(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        engine = in3120.SuffixArray(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        contents = {d.document_id: " " + " ".join(self.__tokenizer.strings(self.__normalizer.canonicalize(d["body"]))).lower() for d in corpus}
+        for query in ["a", "th", "of the", "visc", "zz", "flow o"]:
+            counts = {document_id: content.count(" " + query) for document_id, content in contents.items()}
+            matches = list(engine.evaluate(query, {"hit_count": 10}))
+            self.assertEqual(len(matches), min(10, sum(1 for count in counts.values() if count)))
+            for match in matches:
+                self.assertEqual(match["score"], counts[match["document"].document_id])
+            if matches:
+                self.assertEqual(matches[0]["score"], max(counts.values()))
+
+    def test_group_by_continuation(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": "to the best of my knowledge", "b": "to the be"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"a": "to the behemoth, to the best", "b": "to the"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"a": "", "b": "To The Best"}))
+        engine = in3120.SuffixArray(corpus, ["a", "b"], self.__normalizer, self.__tokenizer)
+        options = {"group_by_continuation": True, "hit_count": 10}
+        self.assertListEqual(list(engine.evaluate("to the be", options)),
+                             [{"score": 3, "continuation": "to the best"}, {"score": 1, "continuation": "to the be"}, {"score": 1, "continuation": "to the behemoth"}])
+        self.assertListEqual(list(engine.evaluate("the", options)), [{"score": 6, "continuation": "the"}])
+        self.assertListEqual(list(engine.evaluate("to the", {"group_by_continuation": True, "hit_count": 1})), [{"score": 6, "continuation": "to the"}])
+        self.assertListEqual(list(engine.evaluate("x", options)), [])
+
+    def test_group_by_continuation_same_as_brute_force(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        engine = in3120.SuffixArray(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        documents = [[t.lower() for t in self.__tokenizer.strings(self.__normalizer.canonicalize(d["body"]))] for d in corpus]
+        for query in ["a", "vis", "the bound", "of the", "zz"]:
+            counts = {}
+            words = query.split()
+            for tokens in documents:
+                for i in range(len(tokens) - len(words) + 1):
+                    if tokens[i:i + len(words) - 1] == words[:-1] and tokens[i + len(words) - 1].startswith(words[-1]):
+                        continuation = " ".join(tokens[i:i + len(words)])
+                        counts[continuation] = counts.get(continuation, 0) + 1
+            expected = sorted(sorted(counts.items()), key=lambda item: -item[1])[:7]
+            results = list(engine.evaluate(query, {"group_by_continuation": True, "hit_count": 7}))
+            self.assertListEqual([(r["continuation"], r["score"]) for r in results], expected)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,47 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=line-too-long
+
+import unittest
+import random
+from context import in3120
+
+
+class TestSuffixSorter(unittest.TestCase):
+
+    def __verify(self, text, alphabet_size):
+        suffixes = in3120.SuffixSorter.sort(text, alphabet_size)
+        self.assertEqual(suffixes.typecode, "I")
+        self.assertListEqual(list(suffixes), sorted(range(len(text)), key=lambda i: text[i:]))
+
+    def test_tiny_texts(self):
+        self.__verify([], 1)
+        self.__verify([0], 1)
+        self.__verify([1, 0], 2)
+        self.__verify([0, 0, 0], 1)
+
+    def test_banana(self):
+        text = [ord(c) for c in "banana"]
+        self.assertListEqual(list(in3120.SuffixSorter.sort(text, 128)), [5, 3, 1, 0, 4, 2])
+
+    def test_random_texts(self):
+        rng = random.Random(1234)
+        for _ in range(200):
+            alphabet_size = rng.randint(1, 6)
+            self.__verify([rng.randrange(alphabet_size) for _ in range(rng.randint(0, 50))], alphabet_size)
+
+    def test_long_texts(self):
+        rng = random.Random(4321)
+        for alphabet_size in [1, 2, 4, 100]:
+            self.__verify([rng.randrange(alphabet_size) for _ in range(3000)], alphabet_size)
+        self.__verify([0, 1] * 2000, 2)
+        self.__verify([2, 1, 0] * 1000 + [2], 3)
+
+    def test_codes_outside_alphabet(self):
+        with self.assertRaises(AssertionError):
+            in3120.SuffixSorter.sort([0, 1, 2], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
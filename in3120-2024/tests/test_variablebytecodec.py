@@ -49,6 +49,48 @@ class TestVariableByteCodec(unittest.TestCase):
         with self.assertRaises(IndexError):
             in3120.VariableByteCodec.decode(data, 4)
 
+    def test_encode_and_decode_many(self):
+        numbers = [21, 4, 70, 0, 127, 128, 512, 999, 214577, 134217728]
+        data = bytearray()
+        self.assertEqual(in3120.VariableByteCodec.encode_many(numbers, data), 18)
+        expected = bytearray()
+        for number in numbers:
+            in3120.VariableByteCodec.encode(number, expected)
+        self.assertEqual(data, expected)
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data, 0), (numbers, 18))
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data, 0, 6), (numbers[:6], 7))
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data, 7, 2), (numbers[6:8], 4))
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data, 3, 0), ([], 0))
+        self.assertEqual(in3120.VariableByteCodec.decode_gaps(data, 0, 4, 100), ([121, 125, 195, 195], 4))
+
+    def test_decode_many_large_buffers(self):
+        numbers = [(i * 7919) % (1 << (i % 30)) for i in range(5000)] + [1 << 70]
+        data = bytearray()
+        in3120.VariableByteCodec.encode_many(numbers, data)
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data, 0), (numbers, len(data)))
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data, 0, 4000)[0], numbers[:4000])
+        self.assertEqual(in3120.VariableByteCodec.decode_gaps(bytes(data), 0, 3000)[0][-1], sum(numbers[:3000]))
+
+    def test_decode_many_wide_numbers_with_count(self):
+        for numbers in ([1 << 40] * 300 + [1] * 1000, [3] * 299 + [1 << 70] + [5] * 1000):
+            data = bytearray()
+            in3120.VariableByteCodec.encode_many(numbers, data)
+            self.assertEqual(in3120.VariableByteCodec.decode_many(data, 0, 300)[0], numbers[:300])
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.decode_many(bytes(10000), 0, 300)
+
+    def test_decode_many_premature_end(self):
+        data = bytearray()
+        in3120.VariableByteCodec.encode_many([1, 2, 300], data)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.decode_many(data, 0, 4)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.decode_many(data[:-1], 0)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.decode_many(bytes(1000), 0)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.encode_many([1, -1], data)
+
     def test_missing_buffer(self):
         with self.assertRaises(AssertionError):
             in3120.VariableByteCodec.encode(210470, None)
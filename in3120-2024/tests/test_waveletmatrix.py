@@ -0,0 +1,45 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import random
+import unittest
+from context import in3120
+
+
+class TestWaveletMatrix(unittest.TestCase):
+
+    def __verify(self, symbols, alphabet_size):
+        matrix = in3120.WaveletMatrix(symbols, alphabet_size)
+        self.assertEqual(len(matrix), len(symbols))
+        self.assertListEqual([matrix[i] for i in range(len(symbols))], symbols)
+        for i in range(len(symbols)):
+            self.assertEqual(matrix.access(i), (symbols[i], symbols[:i].count(symbols[i])))
+        for symbol in range(alphabet_size):
+            for i in range(0, len(symbols) + 1, 7):
+                self.assertEqual(matrix.rank(symbol, i), symbols[:i].count(symbol))
+            positions = [i for i, other in enumerate(symbols) if other == symbol]
+            self.assertListEqual([matrix.select(symbol, k) for k in range(len(positions))], positions)
+
+    def test_small_alphabets(self):
+        self.__verify([], 1)
+        self.__verify([0, 0, 0], 1)
+        self.__verify([1, 0, 1, 1], 2)
+        self.__verify([2, 0, 1, 2, 0], 3)
+
+    def test_random_sequences(self):
+        rng = random.Random(1234)
+        for alphabet_size in (2, 5, 16, 17, 100):
+            self.__verify([rng.randrange(alphabet_size) for _ in range(rng.randint(0, 700))], alphabet_size)
+
+    def test_absent_symbols(self):
+        matrix = in3120.WaveletMatrix([5, 1, 5, 1], 8)
+        self.assertListEqual([matrix.rank(symbol, 4) for symbol in range(8)], [0, 2, 0, 0, 0, 2, 0, 0])
+
+    def test_symbols_outside_alphabet(self):
+        with self.assertRaises(AssertionError):
+            in3120.WaveletMatrix([0, 1, 2], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
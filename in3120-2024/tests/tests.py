@@ -47,3 +47,20 @@ from test_unigramtokenizer import TestUnigramTokenizer
 from test_binarylogisticregressionclassifier import TestBinaryLogisticRegressionClassifier
 from test_evaluationmetrics import TestEvaluationMetrics
 from test_pagerank import TestPageRank
+from test_spimiindexer import TestSpimiIndexer
+from test_memorymappedinvertedindex import TestMemoryMappedInvertedIndex
+from test_arraypostinglist import TestArrayPostingList
+from test_roaringbitmap import TestRoaringBitmap
+from test_bitmappostinglist import TestBitmapPostingList
+from test_pfordeltacodec import TestPForDeltaCodec
+from test_pfordeltapostinglist import TestPForDeltaPostingList
+from test_bitstream import TestBitStream
+from test_eliasgammapostinglist import TestEliasGammaPostingList
+from test_frontcodeddictionary import TestFrontCodedDictionary
+from test_perfecthashdictionary import TestPerfectHashDictionary
+from test_doublearraytrie import TestDoubleArrayTrie
+from test_dawg import TestDawg
+from test_suffixsorter import TestSuffixSorter
+from test_bitvector import TestBitVector
+from test_waveletmatrix import TestWaveletMatrix
+from test_fmindex import TestFMIndex